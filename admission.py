@@ -0,0 +1,185 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+DEFAULT_MAX_CONCURRENT = 8
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_QUEUE_TIMEOUT = 0.5     # seconds a request may wait for a pipeline slot
+DEFAULT_MAX_KEYS = 100000       # rate-limit buckets kept (LRU)
+
+# Reasons a request was shed
+SHED_QUEUE_FULL = "queueFull"
+SHED_TIMEOUT = "timeout"
+SHED_RATE_LIMITED = "rateLimited"
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens per second up to `burst`.
+    Not thread-safe on its own (RateLimiter locks around it).
+    """
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def try_acquire(self, now: float, tokens: float = 1.0) -> bool:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+
+class RateLimiter:
+    """
+    One TokenBucket per key (API key, sessionId, ...), created on first use.
+
+    Why LRU-bounded? Keys come from untrusted input; an attacker rotating
+    sessionIds must not grow the table without limit. A key that falls out
+    simply starts again with a full bucket.
+    """
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[Hashable, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: Hashable) -> bool:
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst, now)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.try_acquire(now)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class AdmissionController:
+    """
+    Concurrency limit for the message pipeline with a short, bounded wait.
+
+    Up to `max_concurrent` requests run at once; up to `max_queue` more wait
+    at most `queue_timeout` seconds for a slot. Anything beyond that is shed
+    immediately, so latency stays bounded under a flood instead of growing
+    with the backlog. Use from a single event loop:
+
+        if not await admission.acquire():
+            return busy reply
+        try: ... finally: admission.release()
+    """
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {SHED_QUEUE_FULL: 0, SHED_TIMEOUT: 0, SHED_RATE_LIMITED: 0}
+
+    async def acquire(self) -> bool:
+        """Returns True once a slot is held, False if the request was shed."""
+        if self._slots is None:
+            # Created lazily so it binds to the serving loop
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        if self._slots.locked():
+            if self.waiting >= self.max_queue:
+                self.shed[SHED_QUEUE_FULL] += 1
+                return False
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.shed[SHED_TIMEOUT] += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    def record_rate_limited(self) -> None:
+        self.shed[SHED_RATE_LIMITED] += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": sum(self.shed.values()),
+            "shedReasons": dict(self.shed)
+        }
+
+
+class ConnectionLimiter:
+    """
+    Cap on long-lived connections (WebSocket streams) held by one worker.
+
+    Each open stream pins a receive loop and its session state, and unlike
+    requests they don't finish on their own, so they are capped separately
+    from the pipeline's AdmissionController. Use from a single event loop.
+    """
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.open = 0
+        self.opened = 0
+        self.rejected = 0
+        self.idle_closed = 0
+
+    def try_open(self) -> bool:
+        if self.open >= self.max_connections:
+            self.rejected += 1
+            return False
+        self.open += 1
+        self.opened += 1
+        return True
+
+    def close(self) -> None:
+        self.open -= 1
+
+    def record_idle_close(self) -> None:
+        self.idle_closed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open": self.open,
+            "max": self.max_connections,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "idleClosed": self.idle_closed
+        }
@@ -1,6 +1,72 @@
 import random
-from typing import Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import lru_cache
+from math import gcd
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zlib import crc32
 
+# Time a reply engine gets per request before the templates answer instead
+DEFAULT_REPLY_BUDGET = 0.05
+# Engine replies cached per (phase, context cue); at least as many as the
+# longest phase has turns, so a session never gets the same one twice in a phase
+REPLY_VARIANTS = 6
+# (phase, last turn of the phase); the exit phase runs to the end
+PHASES = (("concern", 3), ("hesitation", 7), ("suspicion", 12), ("exit", None))
+
+
+def phase_for(turn_number: int) -> Tuple[str, int]:
+    """(phase name, 0-based turn within the phase) of a 1-indexed turn."""
+    first = 1
+    for name, last in PHASES:
+        if last is None or turn_number <= last:
+            break
+        first = last + 1
+    return name, max(0, turn_number - first)
+
+
+@lru_cache(maxsize=None)
+def _steps(n: int) -> Tuple[int, ...]:
+    # Strides coprime to n: each gives a full cycle over n positions
+    return tuple(a for a in range(1, max(n, 2)) if gcd(a, n) == 1) or (1,)
+
+
+def permuted(items: Sequence[Any], seed: int, k: int) -> Any:
+    """
+    The k-th item of a seed-dependent permutation of `items`.
+
+    Why an affine permutation? (stride * k + offset) mod n with a stride
+    coprime to n visits every position once per n steps, so nothing repeats
+    until all items are used, and it needs no per-session state: the seed
+    comes from the session id and k from the turn number.
+    """
+    n = len(items)
+    steps = _steps(n)
+    return items[(steps[seed % len(steps)] * k + seed // len(steps)) % n]
+
+
+class ReplyEngine:
+    """
+    Interface for a reply generator the agent can try before its templates
+    (e.g. a local language model).
+
+    generate() runs in the agent's worker threads under a deadline; it may
+    be slow and may raise. Returning None (or an empty string) lets the
+    templates answer.
+    """
+    name = "engine"
+
+    def generate(self, phase: str, cue: Optional[str], last_message: str, variant: int) -> Optional[str]:
+        """
+        Args:
+            phase: The conversation phase ("concern", "hesitation", ...).
+            cue: The context cue found in the scammer's message ("otp",
+                 "link") or None.
+            last_message: The scammer's message.
+            variant: Which of the REPLY_VARIANTS cached replies for
+                     (phase, cue) this is; different variants should differ.
+        """
+        raise NotImplementedError
 
 
 class HoneypotAgent:
@@ -12,8 +78,20 @@ class HoneypotAgent:
     - Designed to waste scammer's time (time-sink) rather than hack back.
     - Collects intelligence passively through conversation.
     - Exits gracefully to avoid escalation.
+
+    Replies come from an optional ReplyEngine, run under a per-request
+    latency budget, with the phase templates as the fallback. Engine
+    replies are cached by (phase, context cue), and a generation that misses
+    its deadline still finishes in the background and fills the cache.
+    Templates are drawn from a per-session permutation (see permuted()).
+    Thread-safe; shared by all sessions.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        engine: Optional[ReplyEngine] = None,
+        budget: float = DEFAULT_REPLY_BUDGET,
+        engine_workers: int = 2
+    ):
         # 1. Concern Phase (Turns 1-3) - Express worry, ask basic questions.
         self.concern_templates = [
             "Oh no! My account is blocked? What happened?",
@@ -52,50 +130,155 @@ class HoneypotAgent:
             "I'm calling the official number to double check. Hanging up now."
         ]
 
-    def generate_reply(self, turn_number: int, last_message: str) -> str:
+        self.templates = {
+            "concern": self.concern_templates,
+            "hesitation": self.hesitation_templates,
+            "suspicion": self.suspicion_templates,
+            "exit": self.exit_templates
+        }
+        # Openers reflecting a cue in the scammer's message
+        self.cue_prefixes = {
+            "otp": [
+                "I didn't receive an OTP yet. ",
+                "You need the OTP? ",
+                "Wait, looking for the SMS... "
+            ],
+            "link": [
+                "I'm trying to click it but nothing happens. ",
+                "The link isn't opening. ",
+                "Is it the blue link? "
+            ]
+        }
+
+        self.engine = engine
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(engine_workers, thread_name_prefix="reply-engine") if engine else None
+        # (phase, cue) -> REPLY_VARIANTS slots of engine replies
+        self._cache: Dict[Tuple[str, Optional[str]], List[Optional[str]]] = {}
+        self._in_flight: Dict[Tuple[str, Optional[str], int], Future] = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.cache_hits = 0
+        self.engine_replies = 0
+        self.deadline_misses = 0
+        self.engine_errors = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def context_cue(turn_number: int, last_message: str) -> Optional[str]:
+        """The cue in the scammer's message worth reflecting, if any."""
+        lower_msg = last_message.lower()
+        if "otp" in lower_msg and turn_number < 8:
+            return "otp"
+        if "click" in lower_msg or "link" in lower_msg:
+            return "link"
+        return None
+
+    def generate_reply(
+        self,
+        turn_number: int,
+        last_message: str,
+        session_id: Optional[str] = None,
+        budget: Optional[float] = None
+    ) -> str:
         """
         Generates a human-like reply based on the conversation turn count.
-        
+
         Args:
             turn_number (int): The current turn number in the conversation (1-indexed).
             last_message (str): The last message received from the scammer (for context).
-            
+            session_id (str): Seeds the session's template permutation (random
+                              choices without it).
+            budget (float): Seconds the engine may take for this reply
+                            (defaults to the agent's budget).
+
         Returns:
             str: The agent's response.
         """
-        response = ""
-        
-        # Contextual reflection (simple mechanism to feel natural)
-        # If scammer mentions specific keywords, we can optionally reflect them.
-        lower_msg = last_message.lower()
-        context_prefix = ""
-        
-        if "otp" in lower_msg and turn_number < 8:
-            context_prefix = random.choice([
-                "I didn't receive an OTP yet. ",
-                "You need the OTP? ",
-                "Wait, looking for the SMS... "
-            ])
-        elif "click" in lower_msg or "link" in lower_msg:
-             context_prefix = random.choice([
-                "I'm trying to click it but nothing happens. ",
-                "The link isn't opening. ",
-                "Is it the blue link? "
-            ])
-        
-        # Select base template based on phase
-        if turn_number <= 3:
-            response = random.choice(self.concern_templates)
-        elif turn_number <= 7:
-            response = random.choice(self.hesitation_templates)
-        elif turn_number <= 12:
-            response = random.choice(self.suspicion_templates)
-        else:
-            response = random.choice(self.exit_templates)
-            
+        with self._lock:
+            self.requests += 1
+        phase, k = phase_for(turn_number)
+        cue = self.context_cue(turn_number, last_message)
+        seed = crc32(f"{session_id}\x00{phase}".encode("utf-8")) if session_id is not None else random.getrandbits(32)
+
+        if self.engine is not None:
+            reply = self._engine_reply(phase, cue, last_message, permuted(range(REPLY_VARIANTS), seed, k), budget)
+            if reply:
+                return reply
+        with self._lock:
+            self.fallbacks += 1
+        return self._template_reply(phase, cue, seed, k)
+
+    def _template_reply(self, phase: str, cue: Optional[str], seed: int, k: int) -> str:
+        response = permuted(self.templates[phase], seed, k)
         # Combine context (rarely, to avoid repetition) with template
         # Only add context 30% of the time to keep it subtle, or if it's very relevant.
-        if context_prefix and random.random() < 0.3:
-            return context_prefix + response
-            
+        if cue is not None and random.random() < 0.3:
+            return permuted(self.cue_prefixes[cue], seed, k) + response
         return response
+
+    def _engine_reply(
+        self,
+        phase: str,
+        cue: Optional[str],
+        last_message: str,
+        variant: int,
+        budget: Optional[float]
+    ) -> Optional[str]:
+        key = (phase, cue)
+        with self._lock:
+            slots = self._cache.get(key)
+            if slots is not None and slots[variant] is not None:
+                self.cache_hits += 1
+                return slots[variant]
+            # One generation per slot at a time; later requests wait on it
+            future = self._in_flight.get(key + (variant,))
+            submitted = future is None
+            if submitted:
+                future = self._executor.submit(self.engine.generate, phase, cue, last_message, variant)
+                self._in_flight[key + (variant,)] = future
+        if submitted:
+            # Outside the lock: a future that is already done runs the callback here
+            future.add_done_callback(lambda done: self._store(key, variant, done))
+
+        try:
+            reply = future.result(timeout=self.budget if budget is None else budget)
+        except FutureTimeout:
+            with self._lock:
+                self.deadline_misses += 1
+            return None
+        except Exception:
+            with self._lock:
+                self.engine_errors += 1
+            return None
+        if reply:
+            with self._lock:
+                self.engine_replies += 1
+        return reply
+
+    def _store(self, key: Tuple[str, Optional[str]], variant: int, future: Future) -> None:
+        # Done callback: cache the reply, even if its request gave up on it
+        with self._lock:
+            self._in_flight.pop(key + (variant,), None)
+            if future.cancelled() or future.exception() is not None or not future.result():
+                return
+            self._cache.setdefault(key, [None] * REPLY_VARIANTS)[variant] = future.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """How replies were produced: engine (within the deadline or cached) vs templates."""
+        with self._lock:
+            requests, cache_hits, engine_replies = self.requests, self.cache_hits, self.engine_replies
+            deadline_misses, engine_errors, fallbacks = self.deadline_misses, self.engine_errors, self.fallbacks
+        return {
+            "engine": self.engine.name if self.engine else None,
+            "requests": requests,
+            "cacheHits": cache_hits,
+            "engineReplies": engine_replies,
+            "deadlineMisses": deadline_misses,
+            "engineErrors": engine_errors,
+            "fallbacks": fallbacks,
+            "deadlineHitRate": round(
+                (cache_hits + engine_replies) / requests, 4
+            ) if self.engine and requests else None
+        }
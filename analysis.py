@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional
+
+from scam_detector import ScamDetector
+from intelligence import extract_intelligence
+from detection_cache import DetectionCache
+from normalization import prepare
+
+
+class MessageAnalysis:
+    """
+    Compact result of analyzing one message: the risk assessment (or None if
+    detection was skipped) and the entities extracted from the raw text.
+    """
+    __slots__ = ("assessment", "intelligence")
+
+    def __init__(self, assessment: Optional[Dict[str, Any]], intelligence: Dict[str, List[str]]):
+        self.assessment = assessment
+        self.intelligence = intelligence
+
+    @property
+    def scam_detected(self) -> bool:
+        return bool(self.assessment and self.assessment["scamDetected"])
+
+
+def analyze_message(
+    text: str,
+    detector: ScamDetector,
+    detect: bool = True,
+    cache: Optional[DetectionCache] = None,
+    language: Optional[str] = None,
+    locale: Optional[str] = None
+) -> MessageAnalysis:
+    """
+    Single analysis stage shared by detection and intelligence extraction.
+
+    The message is normalized once (NFKC, script digits to ASCII; a no-op
+    for ASCII text); the detector scans the case-folded copy with the
+    matcher of the locale's rule set, and the extractor runs the rule pack's
+    precompiled patterns on the normalized text (evidence keeps its casing).
+
+    Args:
+        text (str): The incoming message.
+        detector (ScamDetector): Detector holding the compiled rules.
+        detect (bool): Set to False when the session is already a confirmed
+                       scam and only intelligence is still needed.
+        cache (DetectionCache): Optional detection cache for `detector`; the
+                       extracted links and UPI handles are masked out of its key.
+        language, locale (str): The request's metadata; they select which
+                       locale keyword sets run (see CompiledRules.select).
+
+    Borderline scores go through the detector's classifier, if any, and
+    extracted entities are checked against its blocklist.
+    """
+    rules = detector.rules_for(language, locale)
+    normalized, folded = prepare(text)
+    intelligence = extract_intelligence(normalized, rules=rules.extraction)
+    assessment = None
+    if detect:
+        if cache is not None:
+            assessment = cache.assess(folded, intelligence["phishingLinks"] + intelligence["upiIds"], rules)
+        else:
+            assessment = detector.assess(folded, rules)
+        assessment = detector.refine(assessment, folded, rules)
+        if detector.blocklist is not None:
+            assessment = detector.check_blocklist(assessment, intelligence)
+    return MessageAnalysis(assessment, intelligence)
@@ -0,0 +1,155 @@
+"""
+Micro-benchmark: per-message cost of the analysis stage.
+
+"before" reproduces the original pipeline (one substring check per keyword,
+a separate URL search, then four regexes looked up through the `re` cache);
+"after" is analysis.analyze_message. The last section measures detection
+with and without the DetectionCache on campaign-style template copies.
+
+Usage:
+    python bench_analysis.py [--iterations N]
+"""
+import argparse
+import random
+import re
+import time
+from typing import List, Optional
+
+from scam_detector import ScamDetector
+from matcher import SUBSTRING_MAX_KEYWORDS, KeywordMatcher
+from analysis import analyze_message
+from detection_cache import DetectionCache
+
+MESSAGES = [
+    "Hello, how are you?",
+    "Your account is BLOCKED! Verify immediately.",
+    "Click this link: http://scam-bank.com/verify?id=123 to avoid penalty",
+    "Send OTP now. Pay 500 to scam@ybl or call +91 9876543210",
+    "Transfer to Account 123456789012 before it will expire, last chance",
+    "I am from head office. Just do it.",
+]
+
+LEGACY_PATTERNS = {
+    "bankAccounts": r"\b\d{9,18}\b",
+    "upiIds": r"[\w\.-]+@[\w\.-]+",
+    "phoneNumbers": r"(?:\+?91[-\s]?)?[6-9]\d{9}",
+    "phishingLinks": r"https?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
+}
+
+
+def legacy_pipeline(detector, text):
+    text_lower = text.lower()
+    found = []
+    for keywords in (detector.scam_keywords, detector.urgency_patterns,
+                     detector.threat_patterns, detector.sensitive_patterns):
+        found.append([kw for kw in keywords if kw in text_lower])
+    has_url = re.search(detector.url_pattern, text_lower) is not None
+
+    results = {key: set() for key in LEGACY_PATTERNS}
+    for key, pattern in LEGACY_PATTERNS.items():
+        for match in re.finditer(pattern, text):
+            results[key].add(match.group().strip())
+    return found, has_url, {key: list(v) for key, v in results.items()}
+
+
+def bench(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in MESSAGES:
+            fn(text)
+    elapsed = time.perf_counter() - start
+    per_message_us = elapsed / (iterations * len(MESSAGES)) * 1e6
+    print(f"{label:<8} {per_message_us:8.2f} us/message")
+    return per_message_us
+
+
+def bench_rule_scaling(iterations):
+    """
+    Keyword scan cost per message as the rule list grows: substring checks,
+    the matcher as configured (substring path up to SUBSTRING_MAX_KEYWORDS)
+    and the matcher forced onto its trie regex, to show where the two cross.
+    """
+    rng = random.Random(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    texts = [text.lower() for text in MESSAGES]
+
+    def per_message_us(fn):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for text in texts:
+                fn(text)
+        return (time.perf_counter() - start) / (iterations * len(texts)) * 1e6
+
+    print(f"\n--- Keyword Scan vs Rule List Size (substring path up to {SUBSTRING_MAX_KEYWORDS}) ---\n")
+    for size in (16, 32, 48, 64, 128, 1024):
+        keywords = sorted({
+            "".join(rng.choice(letters) for _ in range(rng.randint(4, 10)))
+            for _ in range(size)
+        })
+        matcher = KeywordMatcher({"rules": keywords})
+        trie = KeywordMatcher({"rules": keywords}, substring_max=0)
+
+        substring_us = per_message_us(lambda text: [kw for kw in keywords if kw in text])
+        matcher_us = per_message_us(matcher.scan)
+        trie_us = per_message_us(trie.scan)
+        print(
+            f"{len(keywords):>5} keywords: substring {substring_us:8.2f} us, "
+            f"matcher {matcher_us:8.2f} us, trie only {trie_us:8.2f} us"
+        )
+
+
+def bench_detection_cache(iterations):
+    """Detection cost on campaign copies (template + varying name/number/link)."""
+    detector = ScamDetector()
+    cache = DetectionCache(detector)
+    templates = {
+        "short + link": "Dear {name}, your account xx{n} will be blocked today. Verify immediately at http://kyc-update.in/r/{n} or pay to {name}.kyc@ybl",
+        "no link": "Dear customer, your account xx{n} will be blocked today. Call our helpline 98765{n:05d} immediately to update KYC, ref {n}",
+        "long + link": ("Dear customer, as per RBI guidelines your account must be re-verified. " * 8
+                        + "Visit http://kyc-update.in/{n} or call 98765{n:05d}. Failure to comply leads to suspension and legal action. "),
+    }
+    names = ["rahul", "priya", "amit", "sneha"]
+
+    print("\n--- Detection Cache on Campaign Copies ---\n")
+    for label, template in templates.items():
+        copies = []
+        for n in range(500):
+            text = template.format(name=names[n % len(names)], n=n)
+            intel = analyze_message(text, detector, detect=False).intelligence
+            copies.append((text.lower(), intel["phishingLinks"] + intel["upiIds"]))
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            detector.assess(copies[i % len(copies)][0])
+        plain_us = (time.perf_counter() - start) / iterations * 1e6
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            cache.assess(*copies[i % len(copies)])
+        cached_us = (time.perf_counter() - start) / iterations * 1e6
+
+        print(f"{label:<13} ({len(copies[0][0]):>4} chars): detector {plain_us:7.2f} us, cached {cached_us:7.2f} us")
+    stats = cache.stats()
+    print(f"\nCache: {stats['hits']} hits, {stats['misses']} misses, {stats['bypassed']} bypassed")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Per-message cost of the analysis stage, before vs after.")
+    parser.add_argument(
+        "--iterations", type=int, default=20000, metavar="N",
+        help="passes over the sample messages (the rule-scaling section runs a tenth of them)"
+    )
+    iterations = parser.parse_args(argv).iterations
+    detector = ScamDetector()
+
+    print(f"\n--- Analysis Stage Benchmark ({iterations} x {len(MESSAGES)} messages) ---\n")
+    before = bench("before", lambda text: legacy_pipeline(detector, text), iterations)
+    after = bench("after", lambda text: analyze_message(text, detector), iterations)
+    print(f"\nSpeedup: {before / after:.2f}x")
+
+    bench_rule_scaling(max(iterations // 10, 100))
+    bench_detection_cache(iterations)
+
+
+if __name__ == "__main__":
+    main()
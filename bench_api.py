@@ -0,0 +1,158 @@
+"""
+Benchmark: per-request latency of POST /api/honeypot, today's pipeline
+handler vs the original echo handler (json.loads + json.dumps reply).
+
+Requests are driven straight through the ASGI apps (no sockets), so the
+numbers are handler + framework cost. The new handler also runs detection,
+extraction and the agent, which the original never did; the codec-only rows
+isolate the decode/encode cost.
+
+Usage:
+    python bench_api.py [--requests N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import time
+
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse
+from typing import List, Optional
+
+# One session replays every request; don't let its rate limit shed them
+os.environ.setdefault("HONEYPOT_SESSION_RATE", "1000000")
+os.environ.setdefault("HONEYPOT_SESSION_BURST", "1000000")
+
+import main
+from codec import FastJSONResponse, decode_input
+from models import OutputFormat
+
+main.use_callback_outbox()
+
+BODY = json.dumps({
+    "sessionId": "bench-session",
+    "message": {
+        "sender": "scammer",
+        "text": "Your account is BLOCKED! Verify immediately at http://scam-bank.com/verify or call 9876543210",
+        "timestamp": 1770005528731
+    },
+    "conversationHistory": [
+        {"sender": "scammer", "text": "Dear customer, this is your bank calling.", "timestamp": 1770005500000},
+        {"sender": "user", "text": "Which bank is this?", "timestamp": 1770005510000}
+    ] * 5,
+    "metadata": {"channel": "SMS", "language": "en", "locale": "IN"}
+}).encode("utf-8")
+
+legacy_app = FastAPI()
+
+
+@legacy_app.post("/api/honeypot")
+async def legacy_honeypot(request: Request, x_api_key: Optional[str] = Header(None)):
+    """The original handler, kept here for comparison."""
+    if x_api_key != "secret-hackathon-key":
+        return JSONResponse(status_code=401, content={"status": "error", "reply": "Invalid or missing API key"})
+    body_bytes = await request.body()
+    body_data = json.loads(body_bytes)
+    return JSONResponse(
+        status_code=200,
+        content={
+            "status": "success",
+            "reply": f"Request processed successfully with data: {json.dumps(body_data)}"
+        }
+    )
+
+
+async def call(app, body: bytes) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/honeypot",
+        "raw_path": b"/api/honeypot",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"x-api-key", main.EXPECTED_API_KEY.encode()),
+            (b"content-length", str(len(body)).encode())
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    assert status == [200], status
+
+
+async def time_app(app, n: int) -> list:
+    for _ in range(200):
+        await call(app, BODY)
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await call(app, BODY)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def time_codec(fn, n: int) -> list:
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def legacy_codec():
+    data = json.loads(BODY)
+    JSONResponse(content={"status": "success", "reply": f"Request processed successfully with data: {json.dumps(data)}"})
+
+
+def fast_codec():
+    payload, _ = decode_input(BODY)
+    FastJSONResponse(content=OutputFormat(status="success", reply=payload.message.text).model_dump())
+
+
+def report(name: str, latencies: list) -> None:
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{name:<22} {p50:>9.1f} {p99:>9.1f}")
+
+
+def main_bench(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="POST /api/honeypot latency: pipeline handler vs the original echo handler.")
+    parser.add_argument("--requests", type=int, default=5000, metavar="N", help="requests timed per row")
+    n = parser.parse_args(argv).requests
+    logging.disable(logging.WARNING)
+
+    print(f"\n--- /api/honeypot Latency ({n} requests, {len(BODY)} byte body) ---\n")
+    print(f"{'':<22} {'p50 us':>9} {'p99 us':>9}")
+    report("codec: original", time_codec(legacy_codec, n))
+    report("codec: typed + fast", time_codec(fast_codec, n))
+    report("handler: original", asyncio.run(time_app(legacy_app, n)))
+    report("handler: pipeline", asyncio.run(time_app(main.app, n)))
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,101 @@
+"""
+Memory benchmark: bytes per live session.
+
+Builds N sessions that each went through a 15-turn scam conversation and
+measures the allocated memory with tracemalloc, for the compact SessionState
+and for the original pydantic model (full transcript, duplicate reasons).
+
+Usage:
+    python bench_session_memory.py [--sizes N [N ...]]     # default: 1000 10000 100000
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from session_manager import SessionState
+
+TURNS = 15
+REASONS = ["Urgency language detected: now", "Multiple scam keywords detected: verify, blocked"]
+
+
+class LegacySessionState(BaseModel):
+    """The pydantic session model this replaced, for comparison."""
+    sessionId: str
+    messages: List[str] = Field(default_factory=list)
+    totalTurns: int = 0
+    scamDetected: bool = False
+    riskScore: float = 0.0
+    scamReasons: List[str] = Field(default_factory=list)
+    extractedIntelligence: Dict[str, List[str]] = Field(default_factory=lambda: {
+        "bankAccounts": [],
+        "upiIds": [],
+        "phoneNumbers": [],
+        "phishingLinks": []
+    })
+    callbackSent: bool = False
+    startTime: int = Field(default_factory=lambda: int(datetime.now().timestamp()))
+
+
+def message(i: int, turn: int) -> str:
+    return f"Session {i} turn {turn}: your account is blocked, verify now or pay to user{i}@ybl"
+
+
+def build_compact(n: int) -> list:
+    sessions = []
+    for i in range(n):
+        session = SessionState(sessionId=f"session-{i}")
+        for turn in range(TURNS):
+            session.add_message(message(i, turn))
+            session.add_reasons(REASONS)
+            session.totalTurns += 1
+        session.add_intelligence("upiIds", [f"user{i}@ybl"], TURNS, 0)
+        sessions.append(session)
+    return sessions
+
+
+def build_legacy(n: int) -> list:
+    sessions = []
+    for i in range(n):
+        session = LegacySessionState(sessionId=f"session-{i}")
+        for turn in range(TURNS):
+            session.messages.append(message(i, turn))
+            session.scamReasons.extend(REASONS)
+            session.totalTurns += 1
+        session.extractedIntelligence["upiIds"].append(f"user{i}@ybl")
+        sessions.append(session)
+    return sessions
+
+
+def measure(build, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    sessions = build(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sessions
+    gc.collect()
+    return current / n
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Memory per session: compact SessionState vs the pydantic model.")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000], metavar="N",
+        help="session counts to measure, one row each"
+    )
+    sizes = parser.parse_args(argv).sizes
+
+    print("\n--- Session Memory Benchmark (bytes per session) ---\n")
+    print(f"{'sessions':>10} {'compact':>10} {'pydantic':>10} {'saving':>8}")
+    for n in sizes:
+        compact = measure(build_compact, n)
+        legacy = measure(build_legacy, n)
+        print(f"{n:>10} {compact:>10.0f} {legacy:>10.0f} {1 - compact / legacy:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
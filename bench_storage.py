@@ -0,0 +1,87 @@
+"""
+Benchmark: SessionManager turn latency with the in-memory store vs the
+SQLite write-behind store, at fixed request rates.
+
+Requests are paced at each target rate for a few seconds across a pool of
+sessions while the flusher runs in the background, so the SQLite numbers
+include contention with batched writes.
+
+Usage:
+    python bench_storage.py [--seconds S]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import List, Optional
+
+from session_manager import SessionManager
+from session_store import SessionStore
+from storage import SQLiteBackend, WriteBehindSessionStore
+
+RATES = [200, 1000, 5000]
+SESSIONS = 1000
+MESSAGES = [
+    "Your account is BLOCKED! Verify immediately.",
+    "Send OTP now or pay to scam@ybl",
+    "Call 9876543210 for help",
+    "Click http://scam-bank.com/verify",
+]
+
+
+def run_at_rate(manager, rate, seconds):
+    interval = 1.0 / rate
+    latencies = []
+    start = time.perf_counter()
+    next_at = start
+    i = 0
+    while time.perf_counter() - start < seconds:
+        now = time.perf_counter()
+        if now < next_at:
+            time.sleep(next_at - now)
+        t0 = time.perf_counter()
+        manager.process_message(f"bench-{i % SESSIONS}", MESSAGES[i % len(MESSAGES)])
+        latencies.append(time.perf_counter() - t0)
+        next_at += interval
+        i += 1
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "achieved": len(latencies) / elapsed,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Turn latency with the in-memory vs SQLite write-behind session store.")
+    parser.add_argument("--seconds", type=float, default=3.0, metavar="S", help="seconds to run at each target rate")
+    seconds = parser.parse_args(argv).seconds
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = WriteBehindSessionStore(SQLiteBackend(os.path.join(tmp, "bench.db")), flush_interval=0.5)
+        backends = [
+            ("memory", SessionManager(store=SessionStore())),
+            ("sqlite", SessionManager(store=sqlite_store)),
+        ]
+        sqlite_store.start()
+
+        print(f"\n--- Session Store Benchmark ({SESSIONS} sessions, {seconds:.0f}s per rate) ---\n")
+        print(f"{'backend':<8} {'target/s':>9} {'achieved/s':>11} {'p50 us':>8} {'p99 us':>8}")
+        for rate in RATES:
+            for name, manager in backends:
+                result = run_at_rate(manager, rate, seconds)
+                print(f"{name:<8} {rate:>9} {result['achieved']:>11.0f} {result['p50_us']:>8.1f} {result['p99_us']:>8.1f}")
+
+        sqlite_store.stop()
+        stats = sqlite_store.stats()
+        print(f"\nSQLite flushes: {stats['flushes']}, records written: {stats['recordsWritten']}")
+        sqlite_store.backend.close()
+
+
+if __name__ == "__main__":
+    main()
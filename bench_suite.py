@@ -0,0 +1,213 @@
+"""
+Benchmark suite over a seeded synthetic corpus (corpus.py).
+
+Measures, per function: throughput (calls/s) and p50/p99 latency of
+ScamDetector.analyze, extract_intelligence, analysis.analyze_message and
+SessionManager.process_message (whole conversations, language metadata
+included), plus memory per session after the replay. Results go to a
+JSON file; compare mode checks them against a saved baseline and exits
+non-zero when anything regressed by more than the threshold.
+
+Usage:
+    python bench_suite.py run --out results.json [--conversations 500 --seed 0 ...]
+    python bench_suite.py run --out new.json --baseline baseline.json
+    python bench_suite.py compare baseline.json new.json [--threshold 0.15]
+
+Timings depend on the machine: compare results from the same one.
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from analysis import analyze_message
+from corpus import DEFAULT_LANGUAGES, CorpusGenerator, parse_languages
+from intelligence import extract_intelligence
+from scam_detector import ScamDetector
+from session_manager import SessionManager
+
+DEFAULT_CONVERSATIONS = 500
+DEFAULT_THRESHOLD = 0.15
+# Metrics compared against a baseline, and whether higher is better
+METRICS = {"opsPerSec": True, "p50Us": False, "p99Us": False, "bytesPerSession": False}
+
+
+def measure(fn: Callable[..., Any], calls: Sequence[Tuple], repeat: int = 1, warmup: int = 200) -> Dict[str, float]:
+    """Times fn(*args) for every args in `calls`, `repeat` times, after `warmup` untimed calls."""
+    for args in calls[:warmup]:
+        fn(*args)
+    latencies = []
+    clock = time.perf_counter
+    for _ in range(repeat):
+        for args in calls:
+            t0 = clock()
+            fn(*args)
+            latencies.append(clock() - t0)
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "opsPerSec": round(len(latencies) / total, 1) if total else 0.0,
+        "p50Us": round(statistics.median(latencies) * 1e6, 2),
+        "p99Us": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6, 2)
+    }
+
+
+def replay_sessions(conversations) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Every conversation through a fresh SessionManager, turn by turn.
+    Returns (process_message timings, memory per live session). Memory is
+    traced in a second, untimed replay: tracemalloc slows every allocation.
+    """
+    calls = [
+        (c.sessionId, text, turn, "scammer", None, c.language)
+        for c in conversations
+        for turn, text in enumerate(c.messages, 1)
+    ]
+    # Turns of different sessions interleave as they would in production
+    calls.sort(key=lambda call: (call[2], call[0]))
+    # No warm-up: replayed turns would change the sessions' state
+    timings = measure(SessionManager().process_message, calls, repeat=1, warmup=0)
+
+    gc.collect()
+    tracemalloc.start()
+    manager = SessionManager()
+    before, _ = tracemalloc.get_traced_memory()
+    for call in calls:
+        manager.process_message(*call)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sessions = len(manager.sessions)
+    return timings, {"sessions": sessions, "bytesPerSession": round((after - before) / max(sessions, 1))}
+
+
+def run(args) -> Dict[str, Any]:
+    generator = CorpusGenerator(
+        args.seed, args.languages, args.scam_share, args.indicator_density,
+        message_words=(0, args.max_extra_words)
+    )
+    conversations = list(generator.conversations(args.conversations))
+    messages = [(text, c.language) for c in conversations for text in c.messages]
+    detector = ScamDetector()
+
+    results = {
+        "ScamDetector.analyze": measure(detector.analyze, [(text,) for text, _ in messages], args.repeat),
+        "extract_intelligence": measure(extract_intelligence, [(text,) for text, _ in messages], args.repeat),
+        "analyze_message": measure(
+            lambda text, language: analyze_message(text, detector, language=language), messages, args.repeat
+        ),
+    }
+    # Session replay runs once (time is process_message's, memory the live sessions')
+    results["SessionManager.process_message"], memory = replay_sessions(conversations)
+    results["sessionMemory"] = memory
+
+    return {
+        "meta": {
+            "createdAt": int(time.time()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "corpus": {
+                "seed": args.seed,
+                "conversations": args.conversations,
+                "messages": len(messages),
+                "languages": args.languages,
+                "scamShare": args.scam_share,
+                "indicatorDensity": args.indicator_density,
+                "maxExtraWords": args.max_extra_words
+            },
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`, as readable lines: a
+    metric regresses when it is worse by more than `threshold` (relative).
+    """
+    regressions = []
+    print(f"\n{'benchmark':<34} {'metric':<16} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in old or metric not in new or not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSED" if worse > threshold else ""
+            print(f"{name:<34} {metric:<16} {old[metric]:>12} {new[metric]:>12} {change:>+8.1%}{flag}")
+            if flag:
+                regressions.append(f"{name} {metric}: {old[metric]} -> {new[metric]} ({change:+.1%})")
+    return regressions
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    corpus = report["meta"]["corpus"]
+    print(f"\n--- Benchmark suite ({corpus['conversations']} conversations, {corpus['messages']} messages, seed {corpus['seed']}) ---\n")
+    print(f"{'benchmark':<34} {'calls/s':>10} {'p50 us':>9} {'p99 us':>9}")
+    for name, result in report["results"].items():
+        if "opsPerSec" in result:
+            print(f"{name:<34} {result['opsPerSec']:>10.0f} {result['p50Us']:>9.1f} {result['p99Us']:>9.1f}")
+    memory = report["results"]["sessionMemory"]
+    print(f"\nMemory per session: {memory['bytesPerSession']} bytes ({memory['sessions']} sessions)")
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark suite with baseline comparison.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run", help="run the benchmarks and write a JSON results file")
+    run_cmd.add_argument("--out", default="bench_results.json")
+    run_cmd.add_argument("--conversations", type=int, default=DEFAULT_CONVERSATIONS)
+    run_cmd.add_argument("--seed", type=int, default=0)
+    run_cmd.add_argument("--languages", type=parse_languages, default=DEFAULT_LANGUAGES, help="e.g. en=0.7,hinglish=0.2,hi=0.1")
+    run_cmd.add_argument("--scam-share", type=float, default=0.6)
+    run_cmd.add_argument("--indicator-density", type=float, default=0.3)
+    run_cmd.add_argument("--max-extra-words", type=int, default=12, help="message length spread")
+    run_cmd.add_argument("--repeat", type=int, default=3, help="passes over the corpus per function benchmark")
+    run_cmd.add_argument("--baseline", help="compare against this results file")
+    run_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_cmd = commands.add_parser("compare", help="compare a results file against a baseline")
+    compare_cmd.add_argument("baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    if args.command == "run":
+        report = run(args)
+        print_results(report)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {args.out}")
+        if not args.baseline:
+            return 0
+        baseline, current = load(args.baseline), report
+    else:
+        baseline, current = load(args.baseline), load(args.current)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
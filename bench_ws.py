@@ -0,0 +1,159 @@
+"""
+Benchmark: turns per second over POST /api/honeypot vs the /ws/honeypot
+stream, replaying the same scripted conversations.
+
+Over REST every turn re-sends the conversation so far in
+conversationHistory (as the platform does) and pays for a request; over
+the stream a session authenticates once and sends only the new message.
+Both are driven straight through the ASGI app (no sockets), so the
+numbers are handler + framework cost.
+
+Usage:
+    python bench_ws.py [--conversations N]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import List, Optional
+
+# Turns are replayed back to back; don't let the session rate limit shed them
+os.environ.setdefault("HONEYPOT_SESSION_RATE", "1000000")
+os.environ.setdefault("HONEYPOT_SESSION_BURST", "1000000")
+os.environ.setdefault("HONEYPOT_KEY_RATE", "1000000")
+os.environ.setdefault("HONEYPOT_KEY_BURST", "1000000")
+
+import main
+
+main.use_callback_outbox()
+
+SCRIPT = [
+    "Dear customer, this is your bank calling about your account.",
+    "Your account is BLOCKED! Verify immediately at http://scam-bank.com/verify",
+    "Share the OTP sent to your phone now.",
+    "Why are you waiting? This is urgent.",
+    "Pay the verification fee to verify.fee@ybl",
+    "Or call our officer at 9876543210",
+    "Last chance, your account will be suspended.",
+    "I am from the head office, trust me.",
+    "Send the code now!",
+    "Legal action will be taken against you.",
+    "Transfer to account 123456789012 IFSC SBIN0001234",
+    "Are you there?",
+]
+KEY = main.EXPECTED_API_KEY.encode()
+
+
+def rest_body(session_id: str, turn: int) -> bytes:
+    history = []
+    for i in range(turn):
+        history.append({"sender": "scammer", "text": SCRIPT[i], "timestamp": 1770000000000 + 2 * i})
+        history.append({"sender": "user", "text": "Which bank is this?", "timestamp": 1770000000001 + 2 * i})
+    return json.dumps({
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": SCRIPT[turn], "timestamp": 1770000000000 + 2 * turn},
+        "conversationHistory": history,
+        "metadata": {"channel": "SMS", "language": "en", "locale": "IN"}
+    }).encode("utf-8")
+
+
+async def rest_turn(body: bytes) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/honeypot",
+        "raw_path": b"/api/honeypot",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"x-api-key", KEY),
+            (b"content-length", str(len(body)).encode())
+        ],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    status = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await main.app(scope, receive, send)
+    assert status == [200], status
+
+
+async def rest_conversation(session_id: str) -> None:
+    for turn in range(len(SCRIPT)):
+        await rest_turn(rest_body(session_id, turn))
+
+
+async def stream_conversation(session_id: str) -> None:
+    scope = {
+        "type": "websocket",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "scheme": "ws",
+        "path": "/ws/honeypot",
+        "raw_path": b"/ws/honeypot",
+        "query_string": f"sessionId={session_id}&language=en&locale=IN".encode(),
+        "root_path": "",
+        "headers": [(b"x-api-key", KEY)],
+        "subprotocols": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    inbox: asyncio.Queue = asyncio.Queue()
+    outbox: asyncio.Queue = asyncio.Queue()
+    await inbox.put({"type": "websocket.connect"})
+    handler = asyncio.create_task(main.app(scope, inbox.get, outbox.put))
+    assert (await outbox.get())["type"] == "websocket.accept"
+    for turn, text in enumerate(SCRIPT):
+        frame = json.dumps({"text": text, "timestamp": 1770000000000 + 2 * turn})
+        await inbox.put({"type": "websocket.receive", "text": frame})
+        assert (await outbox.get())["type"] == "websocket.send"
+    await inbox.put({"type": "websocket.disconnect", "code": 1000})
+    await handler
+
+
+async def run(conversation, prefix: str, n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        await conversation(f"{prefix}-{i}")
+    return n * len(SCRIPT) / (time.perf_counter() - started)
+
+
+async def main_bench(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Turns per second: POST /api/honeypot vs the /ws/honeypot stream.")
+    parser.add_argument("--conversations", type=int, default=200, metavar="N", help="scripted conversations replayed per transport")
+    n = parser.parse_args(argv).conversations
+    logging.disable(logging.WARNING)
+    # No lifespan: the callback dispatcher stays stopped, so the sessions'
+    # callbacks only land in the temporary outbox and are never sent
+    # Warm-up (rule compilation, caches)
+    await run(rest_conversation, "warm-rest", 5)
+    await run(stream_conversation, "warm-ws", 5)
+    rest = await run(rest_conversation, "rest", n)
+    stream = await run(stream_conversation, "ws", n)
+
+    print(f"\n--- Turns per second ({n} conversations x {len(SCRIPT)} turns) ---\n")
+    print(f"{'POST /api/honeypot':<22} {rest:>9.0f}")
+    print(f"{'/ws/honeypot stream':<22} {stream:>9.0f}  ({stream / rest:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main_bench())
@@ -0,0 +1,259 @@
+"""
+Known-bad indicator blocklist: a Bloom filter file read through mmap.
+
+Build a filter from reported UPI IDs, phone numbers, accounts, links and
+domains (text files: one per line, '#' comments; CSV files: a header row,
+then one indicator per row in the chosen column):
+
+    python blocklist.py build blocklist.bloom reported_upi.txt numbers.csv --column phone
+    python blocklist.py check blocklist.bloom fraud@ybl +91-9876543210
+
+Point the API at it with BLOCKLIST_PATH. Rebuilding writes a new file and
+renames it over the old one, and running workers pick it up on their next
+check (see Blocklist.reload_if_changed).
+"""
+import argparse
+import csv
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from intelligence import normalize_indicator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HPBLOOM1"
+# magic, bit count, hash count, entry count, then padding to HEADER_SIZE
+HEADER = struct.Struct("<8sQIQ")
+HEADER_SIZE = 32
+DEFAULT_FP_RATE = 0.001
+DEFAULT_CHECK_INTERVAL = 30.0
+
+
+def _hashes(value: str) -> Tuple[int, int]:
+    # Two 64-bit hashes from one digest; the k probes are h1 + i*h2 (double hashing)
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+def filter_size(count: int, fp_rate: float = DEFAULT_FP_RATE) -> Tuple[int, int]:
+    """(bits, hashes) for `count` entries at the target false-positive rate."""
+    count = max(count, 1)
+    bits = max(64, math.ceil(-count * math.log(fp_rate) / (math.log(2) ** 2)))
+    hashes = max(1, round(-math.log2(fp_rate)))
+    return bits, hashes
+
+
+def lookup_keys(value: str) -> List[str]:
+    """
+    Keys to probe for one extracted indicator: its normalized form and, for
+    a link, its host and each parent domain (login.scam.example also hits a
+    listed scam.example).
+    """
+    key = normalize_indicator(value)
+    keys = [key]
+    if "://" in key:
+        host = key.partition("://")[2].partition("/")[0].partition(":")[0]
+        labels = host.split(".")
+        keys.extend(".".join(labels[i:]) for i in range(len(labels) - 1))
+    return keys
+
+
+class BloomFilter:
+    """
+    Read-only view of a filter file. The bit array is memory-mapped, so
+    opening costs one header read and pages are shared by every worker
+    process through the OS page cache.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hashes, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or len(self._mm) < HEADER_SIZE + (self.bits + 7) // 8:
+            self._mm.close()
+            raise ValueError(f"{path} is not a blocklist filter")
+
+    def __contains__(self, value: str) -> bool:
+        h1, h2 = _hashes(value)
+        mm, bits = self._mm, self.bits
+        for i in range(self.hashes):
+            index = (h1 + i * h2) % bits
+            if not mm[HEADER_SIZE + (index >> 3)] & (1 << (index & 7)):
+                return False
+        return True
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def build_filter(path: str, values: Iterable[str], count: int, fp_rate: float = DEFAULT_FP_RATE) -> int:
+    """
+    Writes a filter sized for `count` entries to `path`, atomically: the
+    file is written next to it and renamed over it, so readers see either
+    the old or the new filter. Returns the number of entries added.
+    """
+    bits, hashes = filter_size(count, fp_rate)
+    array = bytearray((bits + 7) // 8)
+    added = 0
+    for value in values:
+        h1, h2 = _hashes(value)
+        for i in range(hashes):
+            index = (h1 + i * h2) % bits
+            array[index >> 3] |= 1 << (index & 7)
+        added += 1
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, bits, hashes, added).ljust(HEADER_SIZE, b"\0"))
+        f.write(array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return added
+
+
+class Blocklist:
+    """
+    Checks extracted indicators against a Bloom filter file.
+
+    A missing file is an empty blocklist, not an error, so the API starts
+    without one. The file is re-checked (one stat) at most every
+    `check_interval` seconds and re-mapped when it was replaced; reload()
+    forces it. The old mapping stays valid until the swap, so checks never
+    see a half-written filter. Thread-safe.
+    """
+    def __init__(self, path: str, check_interval: float = DEFAULT_CHECK_INTERVAL, clock=time.monotonic):
+        self.path = path
+        self.check_interval = check_interval
+        self.clock = clock
+        self._filter: Optional[BloomFilter] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        self.checks = 0
+        self.hits = 0
+        self.reloads = 0
+        self.reload()
+
+    def reload(self) -> bool:
+        """Maps the current file; returns whether a filter is loaded."""
+        with self._lock:
+            self._next_check = self.clock() + self.check_interval
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                old, self._filter, self._identity = self._filter, None, None
+            else:
+                identity = (st.st_ino, st.st_size, st.st_mtime_ns)
+                if identity == self._identity:
+                    return True
+                old, self._filter, self._identity = self._filter, BloomFilter(self.path), identity
+                self.reloads += 1
+        # Closing while another thread is mid-check would fault it; let the
+        # old mapping go with its last reference instead.
+        del old
+        return self._filter is not None
+
+    def reload_if_changed(self) -> None:
+        if self.clock() >= self._next_check:
+            try:
+                self.reload()
+            except (OSError, ValueError) as e:
+                logger.error(f"Blocklist reload failed, keeping the loaded filter: {str(e)}")
+
+    def matches(self, intelligence: Dict[str, List[str]]) -> List[str]:
+        """Extracted indicators ({type: [values]}) that are on the blocklist."""
+        self.reload_if_changed()
+        bloom = self._filter
+        if bloom is None:
+            return []
+        found = []
+        checked = 0
+        for values in intelligence.values():
+            for value in values:
+                checked += 1
+                if any(key in bloom for key in lookup_keys(value)) and value not in found:
+                    found.append(value)
+        with self._lock:
+            self.checks += checked
+            self.hits += len(found)
+        return found
+
+    def stats(self) -> Dict[str, object]:
+        bloom = self._filter
+        with self._lock:
+            checks, hits, reloads = self.checks, self.hits, self.reloads
+        return {
+            "loaded": bloom is not None,
+            "entries": bloom.count if bloom else 0,
+            "checks": checks,
+            "hits": hits,
+            "reloads": reloads
+        }
+
+
+def read_list(path: str, column: Optional[str] = None) -> Iterator[str]:
+    """
+    Normalized entries of a text list (one per line) or a CSV list (header
+    row, then `column`: a name or index, the first column by default).
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = csv.reader(f)
+            header = next(rows, [])
+            if column is None or column.isdigit():
+                index = int(column or 0)
+            else:
+                index = header.index(column)
+            for row in rows:
+                if len(row) > index and row[index].strip():
+                    yield normalize_indicator(row[index])
+        else:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield normalize_indicator(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or query a known-bad indicator blocklist.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a filter file from text/CSV lists")
+    build.add_argument("output")
+    build.add_argument("inputs", nargs="+")
+    build.add_argument("--column", help="CSV column name or index (default: the first)")
+    build.add_argument("--fp-rate", type=float, default=DEFAULT_FP_RATE)
+    check = commands.add_parser("check", help="look indicators up in a filter file")
+    check.add_argument("filter")
+    check.add_argument("indicators", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        # Two passes: count first so the filter is sized once, without
+        # holding millions of entries in memory
+        count = sum(1 for path in args.inputs for _ in read_list(path, args.column))
+        values = (value for path in args.inputs for value in read_list(path, args.column))
+        added = build_filter(args.output, values, count, args.fp_rate)
+        bits, hashes = filter_size(count, args.fp_rate)
+        print(f"Wrote {args.output}: {added} entries, {bits // 8} bytes, {hashes} hashes")
+        return 0
+
+    bloom = BloomFilter(args.filter)
+    listed = False
+    for value in args.indicators:
+        hit = any(key in bloom for key in lookup_keys(value))
+        listed = listed or hit
+        print(f"{value}: {'listed' if hit else 'not listed'}")
+    return 0 if listed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
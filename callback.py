@@ -1,7 +1,7 @@
 import requests
 import logging
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -9,31 +9,34 @@ logger = logging.getLogger(__name__)
 
 GUVI_CALLBACK_URL = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
 
-def send_final_callback(session_data: Dict[str, Any]) -> None:
+def build_callback_payload(session_data: Dict[str, Any], final: bool = False) -> Optional[Dict[str, Any]]:
     """
-    Sends the final extracted intelligence and session summary to the GUVI evaluation endpoint.
-    
+    Builds the GUVI payload for a session, or returns None if the session is
+    not eligible for a callback.
+
     Strictly follows the payload requirements:
     - ONLY sent if scamDetected is True.
-    - ONLY sent if totalTurns >= 10.
-    - Post once per session.
-    
+    - ONLY sent if totalTurns >= 10, unless `final`.
+
     Args:
         session_data (dict): A dictionary representing the SessionState.
                              Expected keys: sessionId, scamDetected, totalTurns, 
                              extractedIntelligence, scamReasons, riskScore.
+        final (bool): The session is leaving memory (evicted or expired) and
+                      this is its last chance to be reported, so the turn
+                      minimum does not apply.
     """
-    
+
     session_id = session_data.get("sessionId")
-    
+
     # 1. Validation Checks (Redundant safety, but good practice)
     if not session_data.get("scamDetected"):
         logger.info(f"Callback skipped for {session_id}: Scam not detected.")
-        return
-        
-    if session_data.get("totalTurns", 0) < 10:
+        return None
+
+    if not final and session_data.get("totalTurns", 0) < 10:
         logger.info(f"Callback skipped for {session_id}: Insufficient turns.")
-        return
+        return None
 
     # 2. Construct Agent Notes
     # Summarize why it was flagged and what happened.
@@ -46,7 +49,7 @@ def send_final_callback(session_data: Dict[str, Any]) -> None:
     )
 
     # 3. Construct Payload (STRICT FORMAT)
-    payload = {
+    return {
         "sessionId": session_id,
         "scamDetected": True,
         "totalMessagesExchanged": session_data.get("totalTurns", 0),
@@ -60,6 +63,30 @@ def send_final_callback(session_data: Dict[str, Any]) -> None:
         "agentNotes": agent_notes
     }
 
+
+def send_final_callback(session_data: Dict[str, Any], final: bool = False) -> bool:
+    """
+    Sends the final extracted intelligence and session summary to the GUVI evaluation endpoint.
+
+    Blocking; post once per session. On the request path prefer
+    callback_dispatcher.CallbackDispatcher, which sends in the background.
+
+    Args:
+        session_data (dict): A dictionary representing the SessionState.
+                             Expected keys: sessionId, scamDetected, totalTurns, 
+                             extractedIntelligence, scamReasons, riskScore.
+        final (bool): Last report before the session leaves memory (see
+                      build_callback_payload).
+
+    Returns:
+        bool: True if the endpoint accepted the callback.
+    """
+
+    session_id = session_data.get("sessionId")
+    payload = build_callback_payload(session_data, final)
+    if payload is None:
+        return False
+
     # 4. Send Request
     try:
         logger.info(f"Sending callback for {session_id}...")
@@ -67,6 +94,7 @@ def send_final_callback(session_data: Dict[str, Any]) -> None:
         
         if response.status_code == 200:
             logger.info(f"Callback SUCCESS for {session_id}. Response: {response.text}")
+            return True
         else:
             logger.error(f"Callback FAILED for {session_id}. Status: {response.status_code}, Body: {response.text}")
             
@@ -74,3 +102,4 @@ def send_final_callback(session_data: Dict[str, Any]) -> None:
         logger.error(f"Callback FAILED for {session_id}: Request timed out (5s).")
     except Exception as e:
         logger.error(f"Callback FAILED for {session_id}: {str(e)}")
+    return False
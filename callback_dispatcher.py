@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+import httpx
+
+from callback import GUVI_CALLBACK_URL, build_callback_payload
+from outbox import CallbackOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_TIMEOUT = 5.0
+BACKOFF_BASE = 0.5      # seconds; doubled per attempt, with jitter
+BACKOFF_MAX = 30.0
+OUTBOX_POLL_INTERVAL = 1.0  # seconds between outbox scans for due (rate-limited) rows
+
+# Statuses worth retrying; any other non-2xx goes straight to dead letters.
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CallbackDispatcher:
+    """
+    Delivers final-result callbacks off the request path.
+
+    submit() is thread-safe and never blocks: it puts the payload on a bounded
+    asyncio queue owned by the dispatcher's event loop. Worker tasks drain the
+    queue through one pooled keep-alive httpx.AsyncClient and retry failures
+    with exponential backoff. Payloads that still fail (or arrive while the
+    queue is full) are kept in a bounded dead-letter list.
+
+    With an `outbox`, submit() first commits the payload to the durable
+    CallbackOutbox and a relay task feeds due rows to the queue; rows left
+    pending by a crash or shutdown are replayed on the next start(), and
+    repeated submits for a session are coalesced and rate-limited there.
+
+    Lifecycle: `await start()` on the serving loop (FastAPI lifespan startup),
+    `await stop()` on shutdown, which drains the queue before closing.
+    """
+    def __init__(
+        self,
+        url: str = GUVI_CALLBACK_URL,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        timeout: float = DEFAULT_TIMEOUT,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+        outbox: Optional[CallbackOutbox] = None,
+        poll_interval: float = OUTBOX_POLL_INTERVAL
+    ):
+        self.url = url
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client_factory = client_factory
+        self.outbox = outbox
+        self.poll_interval = poll_interval
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._relay_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        # Outbox rows currently queued or being sent (touched on the loop only)
+        self._inflight: Set[str] = set()
+
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=1000)
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        # Updated from request threads (submit) and the loop alike
+        self.counters = {"submitted": 0, "delivered": 0, "retries": 0, "deadLettered": 0}
+        self._counters_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.client_factory is not None:
+            self._client = self.client_factory()
+        else:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.workers, max_keepalive_connections=self.workers)
+            )
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"callback-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if self.outbox is not None:
+            self._wake = asyncio.Event()
+            self._relay_task = asyncio.create_task(self._relay(), name="callback-outbox-relay")
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Waits (up to drain_timeout) for queued callbacks, then shuts down."""
+        if not self.running:
+            return
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            await asyncio.gather(self._relay_task, return_exceptions=True)
+            self._relay_task = None
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Callback drain timed out; {self._queue.qsize()} callbacks left undelivered")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            # Outbox rows stay pending and are replayed on the next start
+            if "version" not in item:
+                self._dead_letter(item, "shutdown before delivery")
+        await self._client.aclose()
+        self._tasks = []
+        self._inflight.clear()
+        self._loop = None
+
+    def submit(self, session_data: Dict[str, Any], final: bool = False) -> bool:
+        """
+        Queues the final callback for a session. Safe to call from any thread.
+        Returns False if the session is not eligible or the dispatcher is not
+        running (in which case the payload is dead-lettered). With an outbox
+        the payload is durable once this returns, running or not. `final`
+        reports a session leaving memory regardless of its turn count.
+        """
+        payload = build_callback_payload(session_data, final)
+        if payload is None:
+            return False
+        if self.outbox is not None:
+            self.outbox.add(payload)
+            self._count("submitted")
+            if self.running:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            return True
+        item = {"payload": payload, "queuedAt": time.monotonic(), "attempts": 0}
+        if not self.running:
+            self._dead_letter(item, "dispatcher not running")
+            return False
+        self._loop.call_soon_threadsafe(self._enqueue, item)
+        return True
+
+    def _enqueue(self, item: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(item)
+            self._count("submitted")
+        except asyncio.QueueFull:
+            self._dead_letter(item, "queue full")
+
+    async def _relay(self) -> None:
+        """Moves due outbox rows onto the queue; wakes on submit or every poll_interval."""
+        while True:
+            self._wake.clear()
+            try:
+                rows = self.outbox.due(limit=self.queue_size, exclude=self._inflight)
+            except Exception as e:
+                logger.error(f"Callback outbox scan failed: {str(e)}")
+                rows = []
+            for session_id, version, payload in rows:
+                self._inflight.add(session_id)
+                await self._queue.put({
+                    "payload": payload,
+                    "queuedAt": time.monotonic(),
+                    "attempts": 0,
+                    "version": version
+                })
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._deliver(item)
+            except Exception as e:
+                self._dead_letter(item, str(e))
+            finally:
+                if "version" in item:
+                    self._inflight.discard(item["payload"]["sessionId"])
+                self._queue.task_done()
+
+    async def _deliver(self, item: Dict[str, Any]) -> None:
+        session_id = item["payload"]["sessionId"]
+        while True:
+            item["attempts"] += 1
+            error = None
+            retryable = True
+            try:
+                response = await self._client.post(self.url, json=item["payload"])
+                if 200 <= response.status_code < 300:
+                    self._count("delivered")
+                    self._latencies.append(time.monotonic() - item["queuedAt"])
+                    if "version" in item:
+                        self.outbox.mark_delivered(session_id, item["version"])
+                    logger.info(f"Callback SUCCESS for {session_id} after {item['attempts']} attempt(s)")
+                    return
+                error = f"status {response.status_code}"
+                retryable = response.status_code in RETRYABLE_STATUSES
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {str(e)}"
+
+            if not retryable or item["attempts"] >= self.max_attempts:
+                self._dead_letter(item, error)
+                return
+
+            self._count("retries")
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (item["attempts"] - 1))
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning(f"Callback for {session_id} failed ({error}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _dead_letter(self, item: Dict[str, Any], error: str) -> None:
+        self._count("deadLettered")
+        session_id = item["payload"].get("sessionId")
+        logger.error(f"Callback FAILED for {session_id}: {error}")
+        if "version" in item:
+            self.outbox.mark_dead(session_id, item["version"], error)
+        self.dead_letters.append({
+            "sessionId": session_id,
+            "payload": item["payload"],
+            "attempts": item["attempts"],
+            "error": error
+        })
+
+    def _count(self, counter: str) -> None:
+        with self._counters_lock:
+            self.counters[counter] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        with self._counters_lock:
+            counters = dict(self.counters)
+        return {
+            "queueDepth": self._queue.qsize() if self._queue is not None else 0,
+            **counters,
+            "deadLetters": len(self.dead_letters),
+            "outbox": self.outbox.stats() if self.outbox is not None else None,
+            "deliveryLatencyMs": {
+                "p50": round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+                "p99": round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None
+            }
+        }
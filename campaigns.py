@@ -0,0 +1,267 @@
+import random
+import re
+import threading
+import time
+from hashlib import blake2b
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+DEFAULT_BINS = 32               # MinHash signature length
+DEFAULT_ROWS = 2                # signature values per LSH band (bins / rows bands)
+DEFAULT_THRESHOLD = 0.4         # estimated Jaccard needed to join a cluster
+DEFAULT_MAX_CLUSTERS = 5000
+DEFAULT_MIN_SCAM_REPORTS = 2    # confirmed scam messages before a cluster flags new sessions
+REPRESENTATIVE_CHARS = 200
+
+_MASK64 = (1 << 64) - 1
+_ASCII_TOKENS = re.compile(r"https?://\S+|[a-z]+|\d+")
+# Any script: letters, or a run of Indic letters and vowel signs/viramas
+# (combining marks, which are not \w)
+_TOKENS = re.compile(r"https?://\S+|\d+|[^\W\d_\u0900-\u0dff]+|[\u0900-\u0963\u0970-\u0dff]+")
+
+
+def shingles(text: str) -> List[int]:
+    """
+    Hashed word bigrams of a message, case-folded, with every number
+    collapsed to "0" and every link to "://" (campaign copies differ mostly
+    in amounts, phone numbers, IDs and links). A one-word message yields
+    its single token.
+    """
+    tokens = [
+        "0" if token[0].isdigit() else "://" if "://" in token else token
+        for token in (_ASCII_TOKENS if text.isascii() else _TOKENS).findall(text.lower())
+    ]
+    if len(tokens) < 2:
+        return [_stable_hash(tokens[0])] if tokens else []
+    return [_stable_hash(first + " " + second) for first, second in zip(tokens, tokens[1:])]
+
+
+def _stable_hash(shingle: str) -> int:
+    # Not hash(): str hashes are salted per process, and clusters must agree
+    # across workers and restarts
+    return int.from_bytes(blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=None)
+def _probes(bins: int) -> Tuple[Tuple[int, ...], ...]:
+    # For each bin, a fixed pseudo-random order of the other bins to borrow from
+    orders = []
+    for i in range(bins):
+        others = [j for j in range(bins) if j != i]
+        random.Random(i).shuffle(others)
+        orders.append(tuple(others))
+    return tuple(orders)
+
+
+def signature(hashes: List[int], bins: int = DEFAULT_BINS) -> Tuple[int, ...]:
+    """
+    One-permutation MinHash: each shingle hash is computed once, its low
+    bits pick a bin and the bin keeps the smallest remaining value. Empty
+    bins borrow from the first non-empty bin in their own fixed random
+    probe order ("optimal" densification), so short messages still get a
+    full-length signature.
+
+    Why not borrow from the next bin over? Neighbouring empty bins then
+    copy the same value, so one differing shingle flips a whole run of
+    bins; a 20-shingle message in 64 bins was estimated at 0.55 Jaccard
+    against a true 0.64, with a wide spread. Independent probe orders keep
+    the estimate unbiased and about half as noisy.
+
+    Why not k independent hash functions? That costs k x shingles Python
+    operations per message; this is one pass over the shingles.
+    """
+    mins: List[Optional[int]] = [None] * bins
+    for h in hashes:
+        h &= _MASK64
+        index = h % bins
+        value = h // bins
+        current = mins[index]
+        if current is None or value < current:
+            mins[index] = value
+    if None in mins:
+        if not hashes:
+            return tuple([0] * bins)
+        original = list(mins)
+        probes = _probes(bins)
+        for i in range(bins):
+            if original[i] is None:
+                for attempt, j in enumerate(probes[i], 1):
+                    if original[j] is not None:
+                        # Offset by the attempt so borrowed values stay distinct
+                        mins[i] = original[j] + (attempt << 64)
+                        break
+    return tuple(mins)
+
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the fraction of equal signature values."""
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def jaccard(first: FrozenSet[int], second: FrozenSet[int]) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    if not first and not second:
+        return 1.0
+    common = len(first & second)
+    return common / (len(first) + len(second) - common)
+
+
+class Campaign:
+    """One cluster of near-duplicate scam messages."""
+    __slots__ = ("campaignId", "size", "scamReports", "representative", "shingles",
+                 "bandKeys", "firstSeen", "lastSeen")
+
+    def __init__(self, campaign_id: int, text: str, shingle_set: FrozenSet[int], band_keys: List[tuple], now: float):
+        self.campaignId = campaign_id
+        self.size = 0
+        self.scamReports = 0
+        self.representative = text[:REPRESENTATIVE_CHARS]
+        self.shingles = shingle_set
+        self.bandKeys = band_keys
+        self.firstSeen = now
+        self.lastSeen = now
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "campaignId": self.campaignId,
+            "size": self.size,
+            "scamReports": self.scamReports,
+            "representative": self.representative,
+            "firstSeen": self.firstSeen,
+            "lastSeen": self.lastSeen
+        }
+
+
+class CampaignIndex:
+    """
+    In-memory near-duplicate index that groups scam messages into campaigns.
+
+    Each message gets a MinHash signature split into LSH bands; messages
+    sharing any band are candidates. Candidates are then scored by exact
+    Jaccard similarity against the representative's shingles (a message
+    has a few dozen, so this is cheap and removes the signature's estimation
+    noise), and the best one reaching `threshold` is the message's
+    campaign. Otherwise the message starts a new campaign and becomes its
+    representative.
+
+    Memory is bounded by `max_clusters`: the least recently matched campaign
+    is dropped with its band entries. Thread-safe.
+    """
+    def __init__(
+        self,
+        bins: int = DEFAULT_BINS,
+        rows: int = DEFAULT_ROWS,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_clusters: int = DEFAULT_MAX_CLUSTERS,
+        min_scam_reports: int = DEFAULT_MIN_SCAM_REPORTS,
+        clock=time.time
+    ):
+        if bins % rows:
+            raise ValueError("bins must be a multiple of rows")
+        self.bins = bins
+        self.rows = rows
+        self.threshold = threshold
+        self.max_clusters = max_clusters
+        self.min_scam_reports = min_scam_reports
+        self.clock = clock
+
+        self._campaigns: "OrderedDict[int, Campaign]" = OrderedDict()
+        # (band number, band values...) -> campaign id
+        self._buckets: Dict[tuple, int] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        self.indexed = 0
+        self.evicted = 0
+
+    def _band_keys(self, sig: Tuple[int, ...]) -> List[tuple]:
+        rows = self.rows
+        return [(band,) + sig[band * rows:(band + 1) * rows] for band in range(self.bins // rows)]
+
+    def _find(self, shingle_set: FrozenSet[int], band_keys: List[tuple]) -> Optional[Campaign]:
+        # Caller holds the lock
+        best = None
+        best_score = self.threshold
+        seen = set()
+        for key in band_keys:
+            campaign_id = self._buckets.get(key)
+            if campaign_id is None or campaign_id in seen:
+                continue
+            seen.add(campaign_id)
+            campaign = self._campaigns.get(campaign_id)
+            if campaign is None:
+                continue
+            score = jaccard(shingle_set, campaign.shingles)
+            if score >= best_score:
+                best, best_score = campaign, score
+        return best
+
+    def match(self, text: str) -> Optional[Campaign]:
+        """The campaign a message belongs to, without counting it."""
+        hashes = shingles(text)
+        band_keys = self._band_keys(signature(hashes, self.bins))
+        with self._lock:
+            return self._find(frozenset(hashes), band_keys)
+
+    def assign(self, text: str, is_scam: bool = True) -> Optional[Campaign]:
+        """
+        Counts a message in its campaign and returns the campaign.
+
+        A confirmed scam (`is_scam`) that matches nothing starts a new
+        campaign; any other unmatched message is not indexed (None).
+        """
+        hashes = shingles(text)
+        shingle_set = frozenset(hashes)
+        band_keys = self._band_keys(signature(hashes, self.bins))
+        now = self.clock()
+        with self._lock:
+            campaign = self._find(shingle_set, band_keys)
+            if campaign is None:
+                if not is_scam:
+                    return None
+                campaign = Campaign(self._next_id, text, shingle_set, band_keys, now)
+                self._next_id += 1
+                self._campaigns[campaign.campaignId] = campaign
+                for key in band_keys:
+                    self._buckets[key] = campaign.campaignId
+                if len(self._campaigns) > self.max_clusters:
+                    self._evict_oldest()
+            else:
+                self._campaigns.move_to_end(campaign.campaignId)
+            campaign.size += 1
+            if is_scam:
+                campaign.scamReports += 1
+            campaign.lastSeen = now
+            self.indexed += 1
+            return campaign
+
+    def _evict_oldest(self) -> None:
+        # Caller holds the lock
+        _, campaign = self._campaigns.popitem(last=False)
+        for key in campaign.bandKeys:
+            if self._buckets.get(key) == campaign.campaignId:
+                del self._buckets[key]
+        self.evicted += 1
+
+    def is_known_scam(self, campaign: Optional[Campaign]) -> bool:
+        """Whether enough confirmed scams back a campaign to flag new sessions."""
+        return campaign is not None and campaign.scamReports >= self.min_scam_reports
+
+    def top(self, n: int = 10) -> List[Dict[str, Any]]:
+        """The n largest campaigns."""
+        with self._lock:
+            campaigns = sorted(self._campaigns.values(), key=lambda c: c.size, reverse=True)[:n]
+            return [campaign.to_dict() for campaign in campaigns]
+
+    def __len__(self) -> int:
+        return len(self._campaigns)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "campaigns": len(self._campaigns),
+                "buckets": len(self._buckets),
+                "indexed": self.indexed,
+                "evicted": self.evicted
+            }
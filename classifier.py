@@ -0,0 +1,184 @@
+"""
+Second-stage scam classifier: a linear model over hashed n-gram features.
+
+Messages (normalized and case-folded, like the detector's input) become
+sparse binary features: word unigrams and bigrams plus character 3-5-grams
+of each word, hashed into a fixed number of dimensions. The model is one
+float32 weight per dimension and a bias, stored as a .npz file and trained
+offline with train_classifier.py. Needs numpy; CPU only.
+
+ScamDetector runs it only for rule scores near the threshold (see
+ScamDetector.refine), where the keyword sum is least reliable.
+"""
+import json
+import os
+import re
+import threading
+from zlib import crc32
+from typing import Any, Dict, List, Sequence, Tuple
+
+# numpy is optional: without it the detector runs on its rules alone
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+DEFAULT_DIMS = 1 << 18
+CHAR_NGRAMS = (3, 5)
+# Longer messages are cut before featurizing; the opening carries the pitch
+MAX_TEXT_LENGTH = 2000
+MODEL_FORMAT = 1
+
+_WORDS = re.compile(r"\w+")
+_WORD_SEED = crc32(b"w")
+_BIGRAM_SEED = crc32(b"b")
+# Multiplier of the character n-gram hash (64-bit FNV prime)
+_PRIME = 0x100000001B3
+
+
+def _word_hashes(words: List[str]) -> List[int]:
+    # Unigrams and bigrams; each kind starts from its own crc32 seed
+    hashes = [crc32(word.encode("utf-8"), _WORD_SEED) for word in words]
+    hashes.extend(crc32(f"{a} {b}".encode("utf-8"), _BIGRAM_SEED) for a, b in zip(words, words[1:]))
+    return hashes
+
+
+def _char_hashes(data, low: int, high: int):
+    # Polynomial hashes of every low..high-byte window, all windows at once:
+    # hashing forward one byte at a time yields each length in turn.
+    # Returns [(n, hashes of the len(data) - n + 1 windows of n bytes)].
+    found = []
+    h = np.zeros(len(data), dtype=np.uint64)
+    for k in range(min(high, len(data))):
+        h = h[:len(data) - k] * np.uint64(_PRIME) + data[k:]
+        if k + 1 >= low:
+            mixed = h + np.uint64(k + 1)
+            found.append((k + 1, mixed ^ (mixed >> np.uint64(29))))
+    return found
+
+
+def featurize(texts: Sequence[str], dims: int = DEFAULT_DIMS, char_ngrams: Tuple[int, int] = CHAR_NGRAMS):
+    """
+    Sparse binary features of a batch of case-folded messages, as three
+    flat arrays sorted by row: (row of each entry, feature index, value).
+    Features are word unigrams and bigrams plus character 3-5-grams (of
+    the UTF-8 bytes of the words, space-separated), hashed into `dims`.
+    Each row is L2-normalized so long messages don't outweigh short ones.
+
+    Why hash characters in numpy? A message has a few hundred character
+    n-grams; hashing them one by one in Python cost ~150us per message,
+    while here every window of the whole batch is hashed in a few array
+    operations. Words are few and keep a stable crc32 (Python's hash() is
+    salted per process, and training and serving must agree).
+    """
+    low, high = char_ngrams
+    keys = []
+    chunks = []
+    owners = []
+    for row, text in enumerate(texts):
+        words = _WORDS.findall(text[:MAX_TEXT_LENGTH])
+        if not words:
+            continue
+        base = row * dims
+        keys.extend(base + h % dims for h in _word_hashes(words))
+        chunk = (" " + " ".join(words) + " ").encode("utf-8")
+        chunks.append(chunk)
+        owners.append((row, len(chunk)))
+
+    all_keys = [np.asarray(keys, dtype=np.int64)]
+    if chunks:
+        data = np.frombuffer(b"".join(chunks), dtype=np.uint8).astype(np.uint64)
+        row_of = np.repeat(
+            np.asarray([row for row, _ in owners], dtype=np.int64),
+            [length for _, length in owners]
+        )
+        for n, hashes in _char_hashes(data, low, high):
+            owner = row_of[:len(hashes)]
+            if len(owners) > 1:
+                # Windows inside one message only
+                same = owner == row_of[n - 1:]
+                hashes, owner = hashes[same], owner[same]
+            all_keys.append(owner * dims + (hashes % np.uint64(dims)).astype(np.int64))
+
+    # Sort + neighbour compare: cheaper than np.unique's hashing here
+    unique = np.sort(np.concatenate(all_keys))
+    if len(unique):
+        unique = unique[np.concatenate(([True], unique[1:] != unique[:-1]))]
+    rows = unique // dims
+    indices = unique % dims
+    counts = np.bincount(rows, minlength=len(texts))
+    values = (counts[rows] ** -0.5).astype(np.float32)
+    return rows, indices, values
+
+
+def features(text_lower: str, dims: int = DEFAULT_DIMS, char_ngrams: Tuple[int, int] = CHAR_NGRAMS) -> List[int]:
+    """Sorted, distinct feature indices of one case-folded message."""
+    return featurize([text_lower], dims, char_ngrams)[1].tolist()
+
+
+class LinearClassifier:
+    """
+    Logistic-regression scorer over hashed n-gram features.
+
+    predict() scores a whole batch in one vectorized pass: the weights of
+    every (row, feature) entry are gathered at once and summed per row with
+    bincount, so numpy does the arithmetic for all messages together.
+    Read-only after construction, hence thread-safe (counters aside).
+    """
+    def __init__(
+        self,
+        weights,
+        bias: float = 0.0,
+        char_ngrams: Tuple[int, int] = CHAR_NGRAMS
+    ):
+        if np is None:
+            raise ImportError("LinearClassifier needs numpy (pip install numpy)")
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.dims = len(self.weights)
+        self.bias = float(bias)
+        self.char_ngrams = tuple(char_ngrams)
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.scored = 0
+
+    def decision(self, rows, indices, values, count: int):
+        """Raw scores (logits) of `count` featurized rows."""
+        return np.bincount(rows, weights=self.weights[indices] * values, minlength=count) + self.bias
+
+    def predict(self, texts: Sequence[str]):
+        """Scam probabilities of case-folded messages, as a float array."""
+        rows, indices, values = featurize(texts, self.dims, self.char_ngrams)
+        probabilities = 1.0 / (1.0 + np.exp(-self.decision(rows, indices, values, len(texts))))
+        with self._lock:
+            self.batches += 1
+            self.scored += len(texts)
+        return probabilities
+
+    def score(self, text_lower: str) -> float:
+        """Scam probability of one case-folded message."""
+        return float(self.predict([text_lower])[0])
+
+    def save(self, path: str) -> None:
+        """Writes the model atomically (a temporary file renamed over `path`)."""
+        config = {"format": MODEL_FORMAT, "charNgrams": list(self.char_ngrams)}
+        tmp = f"{path}.tmp{os.getpid()}.npz"
+        np.savez(tmp, weights=self.weights, bias=np.float64(self.bias), config=np.array(json.dumps(config)))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LinearClassifier":
+        if np is None:
+            raise ImportError("LinearClassifier needs numpy (pip install numpy)")
+        with np.load(path, allow_pickle=False) as data:
+            config = json.loads(str(data["config"]))
+            if config.get("format") != MODEL_FORMAT:
+                raise ValueError(f"{path}: unsupported classifier format {config.get('format')}")
+            return cls(
+                data["weights"],
+                float(data["bias"]),
+                char_ngrams=tuple(config["charNgrams"])
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"dims": self.dims, "batches": self.batches, "scored": self.scored}
@@ -0,0 +1,98 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+
+from models import IncomingMessage, InputFormat, Message, Metadata
+
+# orjson is optional: it only speeds up encoding and the lenient decode path
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed (stdlib json otherwise)."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def decode_input(body: bytes) -> Tuple[Optional[InputFormat], Optional[str]]:
+    """
+    Decodes a request body straight into InputFormat.
+
+    Why pydantic's validate_json first? It parses and validates in one native
+    pass, faster than any loads() + model_validate() pair. Only bodies that
+    fail it take the slower lenient path, which still accepts a usable
+    sessionId + message.text. There a non-integer message timestamp is
+    dropped like a missing one (None leaves the session's history watermark
+    alone, where 0 would rewind it and replay the whole history next turn),
+    invalid metadata is dropped, and history entries that validate are kept.
+
+    Returns:
+        (InputFormat, None) when the body can be processed, otherwise
+        (None, reason) with a human-readable reason for the reply.
+    """
+    if not body:
+        return None, "Request received with empty body"
+    try:
+        return InputFormat.model_validate_json(body), None
+    except ValidationError:
+        pass
+
+    try:
+        data = loads(body)
+    except ValueError:
+        return None, "Request received with non-JSON body"
+    if not data:
+        return None, "Request received with empty JSON object"
+    if isinstance(data, dict):
+        message = data.get("message")
+        session_id = data.get("sessionId")
+        if isinstance(session_id, str) and isinstance(message, dict) and isinstance(message.get("text"), str):
+            return InputFormat.model_construct(
+                sessionId=session_id,
+                message=IncomingMessage.model_construct(
+                    sender=str(message.get("sender", "scammer")),
+                    text=message["text"],
+                    timestamp=message["timestamp"] if isinstance(message.get("timestamp"), int) else None
+                ),
+                conversationHistory=_valid_history(data.get("conversationHistory")),
+                metadata=_valid_metadata(data.get("metadata"))
+            ), None
+    return None, "Request received without a sessionId and message text"
+
+
+def _valid_metadata(metadata: Any) -> Optional[Metadata]:
+    # The lenient path keeps metadata that validates (it picks the locale sets)
+    try:
+        return Metadata.model_validate(metadata)
+    except ValidationError:
+        return None
+
+
+def _valid_history(history: Any) -> List[Message]:
+    # The lenient path's conversationHistory: the entries that validate, in order
+    if not isinstance(history, list):
+        return []
+    valid = []
+    for entry in history:
+        try:
+            valid.append(Message.model_validate(entry))
+        except ValidationError:
+            continue
+    return valid
@@ -0,0 +1,209 @@
+"""
+Seeded generator of synthetic scam and benign conversations.
+
+Used by bench_suite.py (and usable as a labeled training corpus for
+train_classifier.py). Scam conversations follow the usual arc (hook,
+urgency, payment or credential ask, threat) with UPI IDs, phone numbers,
+accounts and links filled in; benign ones are everyday chat. The same
+seed and settings always give the same corpus.
+
+    python corpus.py corpus.jsonl --conversations 2000 --languages en=0.6,hinglish=0.3,hi=0.1
+
+Each output line is one message: {"sessionId", "turn", "language", "text", "label"}.
+"""
+import argparse
+import json
+import random
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_LANGUAGES = {"en": 0.7, "hinglish": 0.2, "hi": 0.1}
+DEFAULT_SCAM_SHARE = 0.6
+DEFAULT_INDICATOR_DENSITY = 0.3
+DEFAULT_TURNS = (6, 15)
+# Extra filler words appended to each message: (min, max)
+DEFAULT_MESSAGE_WORDS = (0, 12)
+
+NAMES = ["Rahul", "Priya", "Amit", "Sneha", "Vikram", "Anita", "Rohan", "Kavya"]
+BANKS = ["SBI", "HDFC", "ICICI", "Axis", "Kotak", "PNB"]
+UPI_HANDLES = ["ybl", "okaxis", "paytm", "okhdfcbank", "upi"]
+
+# Scam lines by stage, per language; {name}/{bank}/{amount} are filled in
+SCAM_STAGES: Dict[str, List[List[str]]] = {
+    "en": [
+        ["Dear {name}, this is {bank} customer care.", "Hello sir, calling from {bank} head office.",
+         "Congratulations {name}, you have won a lottery prize of Rs {amount}."],
+        ["Your account is blocked, verify your KYC immediately.", "Your SIM will be deactivated today, update now.",
+         "Your card will expire tonight, last chance to renew."],
+        ["Share the OTP sent to your phone now.", "Pay the processing fee of Rs {amount} to claim it.",
+         "Click the link and enter your card details to verify."],
+        ["Legal action will be taken if you do not pay.", "Your account will be suspended with a penalty.",
+         "Police will file a case against you, act now."],
+    ],
+    "hinglish": [
+        ["Namaste {name} ji, main {bank} se bol raha hoon.", "Sir aapka {bank} account check karna hai."],
+        ["Aapka account block ho gaya hai, turant KYC update karo.", "Jaldi karo warna account band ho jayega."],
+        ["OTP bata do jo abhi aaya hai.", "Rs {amount} processing fee bhejo abhi."],
+        ["Nahi kiya toh legal action hoga.", "Police case ho jayega, jaldi karo."],
+    ],
+    "hi": [
+        ["नमस्ते {name} जी, मैं {bank} बैंक से बोल रहा हूं।", "सर, आपके {bank} खाते की जांच करनी है।"],
+        ["आपका खाता ब्लॉक हो गया है, तुरंत केवाईसी अपडेट करें।", "जल्दी करें वरना खाता बंद हो जाएगा।"],
+        ["ओटीपी बताएं जो अभी आया है।", "{amount} रुपये प्रोसेसिंग फीस भेजें।"],
+        ["नहीं किया तो कानूनी कार्रवाई होगी।", "पुलिस केस हो जाएगा, जल्दी करें।"],
+    ],
+}
+# Lines that carry an indicator; {indicator} is the UPI ID, number, account or link
+INDICATOR_LINES: Dict[str, List[str]] = {
+    "en": ["Send it to {indicator} right away.", "Call our officer at {indicator}.", "Visit {indicator} to verify."],
+    "hinglish": ["Is pe bhejo: {indicator}", "Is number pe call karo {indicator}", "Yeh link kholo {indicator}"],
+    "hi": ["यहां भेजें: {indicator}", "इस नंबर पर कॉल करें {indicator}", "यह लिंक खोलें {indicator}"],
+}
+BENIGN: Dict[str, List[str]] = {
+    "en": ["Are we still meeting for lunch tomorrow?", "The train is running late, see you at seven.",
+           "Thanks for the photos from the trip.", "Can you pick up milk on the way home?",
+           "Happy birthday {name}, have a great day!", "The meeting moved to the second floor room.",
+           "Did you pay the electricity bill this month?", "I sent you Rs {amount} for the tickets."],
+    "hinglish": ["Kal lunch pe mil rahe hain na?", "Train late hai, saat baje milte hain.",
+                 "Ghar aate waqt doodh le aana.", "Happy birthday {name}, party kab hai?"],
+    "hi": ["क्या हम कल दोपहर का खाना साथ खा रहे हैं?", "ट्रेन देर से चल रही है, सात बजे मिलते हैं।",
+           "घर आते समय दूध ले आना।", "जन्मदिन मुबारक हो {name}!"],
+}
+FILLER: Dict[str, List[str]] = {
+    "en": "please sir madam today quickly kindly okay listen bank office customer support team".split(),
+    "hinglish": "please sir ji abhi jaldi theek hai suno bank office customer team".split(),
+    "hi": "कृपया सर जी अभी जल्दी ठीक है सुनिए बैंक ऑफिस ग्राहक टीम".split(),
+}
+
+
+class Conversation:
+    """One generated conversation: the scammer's (or contact's) messages in order."""
+    __slots__ = ("sessionId", "language", "isScam", "messages")
+
+    def __init__(self, session_id: str, language: str, is_scam: bool, messages: List[str]):
+        self.sessionId = session_id
+        self.language = language
+        self.isScam = is_scam
+        self.messages = messages
+
+
+def parse_languages(spec: str) -> Dict[str, float]:
+    """"en=0.7,hi=0.3" -> {"en": 0.7, "hi": 0.3}."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCAM_STAGES:
+            raise ValueError(f"unknown language {name.strip()!r} (known: {', '.join(SCAM_STAGES)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def indicator(rng: random.Random) -> str:
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"{rng.choice(NAMES).lower()}{rng.randint(1, 999)}@{rng.choice(UPI_HANDLES)}"
+    if kind == 1:
+        return f"+91 {rng.randint(6000000000, 9999999999)}"
+    if kind == 2:
+        return str(rng.randint(10 ** 11, 10 ** 12 - 1))
+    return f"http://{rng.choice(BANKS).lower()}-verify-{rng.randint(1, 9999)}.in/kyc"
+
+
+class CorpusGenerator:
+    """
+    Seeded conversation generator.
+
+    Args:
+        seed: Same seed and settings, same corpus.
+        languages: Language mix, {"en" | "hinglish" | "hi": weight}.
+        scam_share: Share of conversations that are scams.
+        indicator_density: Probability that a scam message carries an
+                           indicator (UPI ID, phone, account or link).
+        turns: (min, max) messages per conversation.
+        message_words: (min, max) filler words added to each message, to
+                       vary message length.
+    """
+    def __init__(
+        self,
+        seed: int = 0,
+        languages: Optional[Dict[str, float]] = None,
+        scam_share: float = DEFAULT_SCAM_SHARE,
+        indicator_density: float = DEFAULT_INDICATOR_DENSITY,
+        turns: Tuple[int, int] = DEFAULT_TURNS,
+        message_words: Tuple[int, int] = DEFAULT_MESSAGE_WORDS
+    ):
+        self.rng = random.Random(seed)
+        self.languages = languages or DEFAULT_LANGUAGES
+        self.scam_share = scam_share
+        self.indicator_density = indicator_density
+        self.turns = turns
+        self.message_words = message_words
+        self._count = 0
+
+    def _fill(self, line: str, language: str) -> str:
+        rng = self.rng
+        text = line.format(name=rng.choice(NAMES), bank=rng.choice(BANKS), amount=rng.randint(99, 99999))
+        extra = rng.randint(*self.message_words)
+        if extra:
+            text += " " + " ".join(rng.choice(FILLER[language]) for _ in range(extra))
+        return text
+
+    def conversation(self) -> Conversation:
+        rng = self.rng
+        language = rng.choices(list(self.languages), weights=list(self.languages.values()))[0]
+        is_scam = rng.random() < self.scam_share
+        session_id = f"corpus-{self._count}"
+        self._count += 1
+        messages = []
+        for turn in range(rng.randint(*self.turns)):
+            if not is_scam:
+                messages.append(self._fill(rng.choice(BENIGN[language]), language))
+                continue
+            stages = SCAM_STAGES[language]
+            # Walk the arc, then keep pressing with the later stages
+            stage = stages[min(turn, len(stages) - 1)] if turn < len(stages) else rng.choice(stages[1:])
+            text = self._fill(rng.choice(stage), language)
+            if rng.random() < self.indicator_density:
+                text += " " + rng.choice(INDICATOR_LINES[language]).format(indicator=indicator(rng))
+            messages.append(text)
+        return Conversation(session_id, language, is_scam, messages)
+
+    def conversations(self, n: int) -> Iterator[Conversation]:
+        for _ in range(n):
+            yield self.conversation()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic scam/benign conversation corpus (JSONL).")
+    parser.add_argument("output", help="JSONL file to write ('-' for stdout)")
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--languages", type=parse_languages, default=DEFAULT_LANGUAGES, help="e.g. en=0.7,hinglish=0.2,hi=0.1")
+    parser.add_argument("--scam-share", type=float, default=DEFAULT_SCAM_SHARE)
+    parser.add_argument("--indicator-density", type=float, default=DEFAULT_INDICATOR_DENSITY)
+    parser.add_argument("--max-extra-words", type=int, default=DEFAULT_MESSAGE_WORDS[1], help="message length spread")
+    args = parser.parse_args(argv)
+
+    generator = CorpusGenerator(
+        args.seed, args.languages, args.scam_share, args.indicator_density,
+        message_words=(0, args.max_extra_words)
+    )
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for conversation in generator.conversations(args.conversations):
+            for turn, text in enumerate(conversation.messages, 1):
+                out.write(json.dumps({
+                    "sessionId": conversation.sessionId,
+                    "turn": turn,
+                    "language": conversation.language,
+                    "text": text,
+                    "label": int(conversation.isScam)
+                }, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from matcher import _is_word_char
+from normalization import fold
+from rules import CompiledRules
+from scam_detector import ScamDetector
+
+DEFAULT_CACHE_SIZE = 10000
+
+_DIGITS = re.compile(r"\d+")
+
+
+class DetectionCache:
+    """
+    LRU cache in front of ScamDetector keyed by a masked fingerprint.
+
+    Campaign messages repeat one template with a different name, number,
+    link or UPI handle. Those variable parts are masked so every copy maps
+    to the same key:
+    - digit runs become "0" (skipped if any keyword contains a digit)
+    - the message's extracted links and UPI handles become a two-character
+      placeholder that keeps the word/non-word class of their first and last
+      characters, so keyword boundaries next to them behave as before.
+
+    Why is the result still exact? Only keyword hits of the masked text are
+    cached. On every call, the raw text around each masked entity (padded
+    by the longest keyword) is scanned again, and those hits are merged in,
+    so keywords inside or straddling a link are not lost. Extra patterns
+    (the URL check) always run on the raw text. The cache is cleared
+    whenever the detector's rule pack changes (see ScamDetector.use_rules).
+
+    Thread-safe; shared by all sessions.
+    """
+    def __init__(self, detector: ScamDetector, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.detector = detector
+        self.max_entries = max_entries
+        # (rules version, masked text) -> cached scan; locale variants of one
+        # pack share the LRU but never each other's entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict[str, List[str]], Dict[tuple, Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        # rules version -> (mask digits?, re-scan context)
+        self._params: Dict[str, Tuple[bool, int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypassed = 0
+
+    def _check_version(self, base: CompiledRules) -> None:
+        # Caller holds the lock
+        version = base.version
+        if version == self._version:
+            return
+        if self._version is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self._params.clear()
+        self._version = version
+
+    def _params_for(self, rules: CompiledRules) -> Tuple[bool, int]:
+        # Caller holds the lock
+        params = self._params.get(rules.version)
+        if params is None:
+            matcher = rules.matcher
+            mask_digits = not any(
+                char.isdigit()
+                for keywords in matcher.categories.values()
+                for kw in keywords
+                for char in kw
+            )
+            params = self._params[rules.version] = (mask_digits, matcher.max_keyword_length)
+        return params
+
+    def fingerprint(
+        self,
+        text_lower: str,
+        entities: Iterable[str] = (),
+        mask_digits: bool = True
+    ) -> Tuple[str, List[Tuple[int, int]]]:
+        """
+        Masked form of the text and the (start, end) spans that were masked
+        out (entity occurrences only; digit runs keep their word class).
+        """
+        masked = text_lower
+        spans = []
+        for entity in entities:
+            entity = fold(entity)
+            start = text_lower.find(entity)
+            if start < 0:
+                continue
+            while start >= 0:
+                spans.append((start, start + len(entity)))
+                start = text_lower.find(entity, start + len(entity))
+            placeholder = ("_" if _is_word_char(entity[0]) else "\x00") + ("_" if _is_word_char(entity[-1]) else "\x00")
+            masked = masked.replace(entity, placeholder)
+        if mask_digits:
+            masked = _DIGITS.sub("0", masked)
+        return masked, spans
+
+    def _around(self, text_lower: str, spans: List[Tuple[int, int]], context: int) -> str:
+        # Raw text around each masked span, widened to whole words
+        pieces = []
+        for start, end in spans:
+            start = max(0, start - context)
+            while start > 0 and _is_word_char(text_lower[start - 1]):
+                start -= 1
+            end = min(len(text_lower), end + context)
+            while end < len(text_lower) and _is_word_char(text_lower[end]):
+                end += 1
+            pieces.append(text_lower[start:end])
+        return "\n".join(pieces)
+
+    def assess(
+        self,
+        text_lower: str,
+        entities: Iterable[str] = (),
+        rules: Optional[CompiledRules] = None
+    ) -> Dict[str, Any]:
+        """
+        Same result as detector.assess(text_lower, rules) (shared; treat as
+        read-only).
+
+        Args:
+            text_lower: The case-folded message.
+            entities: Links and UPI handles extracted from the message, to
+                      mask out of the fingerprint.
+            rules: The locale variant to score with (defaults to the
+                   detector's base rules).
+        """
+        # One rule pack for the whole call, even if a reload swaps it meanwhile
+        base = self.detector.rules
+        if rules is None:
+            rules = base
+        matcher = rules.matcher
+        with self._lock:
+            self._check_version(base)
+            version = self._version
+            mask_digits, context = self._params_for(rules)
+
+        # When re-scanning around the entities would cover most of a short
+        # message anyway, a plain scan is cheaper than the cache.
+        entities = list(entities)
+        if entities and 2 * sum(len(entity) + 2 * context for entity in entities) > len(text_lower):
+            with self._lock:
+                self.bypassed += 1
+            return self.detector.assess(text_lower, rules)
+
+        patterns = matcher.scan_patterns(text_lower)
+        masked, spans = self.fingerprint(text_lower, entities, mask_digits)
+        key = (rules.version, masked)
+        with self._lock:
+            entry = self._entries.get(key) if self._version == version else None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is None:
+            # [keyword hits of the masked text, {pattern names hit: assessment}]
+            entry = (matcher.scan_keywords(masked), {})
+            with self._lock:
+                if self._version == version:
+                    self._entries[key] = entry
+                    if len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+
+        hits = entry[0]
+        if spans:
+            hits = matcher.merge(hits, matcher.scan_keywords(self._around(text_lower, spans, context)))
+        if hits is not entry[0]:
+            return self.detector.score({**hits, **patterns}, rules)
+
+        pattern_key = tuple(patterns)
+        assessment = entry[1].get(pattern_key)
+        if assessment is None:
+            assessment = self.detector.score({**hits, **patterns}, rules)
+            entry[1][pattern_key] = assessment
+        return assessment
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "bypassed": self.bypassed,
+                "rulesVersion": self._version
+            }
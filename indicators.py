@@ -0,0 +1,158 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+from intelligence import normalize_indicator
+
+DEFAULT_MAX_INDICATORS = 200000
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Indicator:
+    """One normalized indicator and the sessions it was seen in."""
+    __slots__ = ("value", "types", "sessions", "firstSeen", "lastSeen")
+
+    def __init__(self, value: str, now: int):
+        self.value = value
+        self.types: Dict[str, None] = {}
+        # {sessionId: [first seen, last seen]}, in first-seen order
+        self.sessions: Dict[str, List[int]] = {}
+        self.firstSeen = now
+        self.lastSeen = now
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "indicator": self.value,
+            "types": list(self.types),
+            "sessionCount": len(self.sessions),
+            "firstSeen": self.firstSeen,
+            "lastSeen": self.lastSeen
+        }
+
+
+class IndicatorIndex:
+    """
+    Cross-session inverted index: normalized indicator -> sessions.
+
+    Why an index? Each session only knows its own intelligence, so finding
+    every session that shares a mule account meant scanning all of them.
+    Here a lookup is one dict access plus the requested page, and sessions
+    are recorded incrementally as their intelligence is aggregated.
+
+    "Most reused" is answered from count buckets ({session count: indicators})
+    plus a sorted list of the non-empty counts, so top(n) reads only the
+    largest buckets instead of sorting every indicator.
+
+    Memory is bounded by `max_indicators`: the least recently seen indicator
+    is dropped. Thread-safe.
+    """
+    def __init__(self, max_indicators: int = DEFAULT_MAX_INDICATORS, clock=time.time):
+        self.max_indicators = max_indicators
+        self.clock = clock
+        self._entries: "OrderedDict[str, Indicator]" = OrderedDict()
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        self._counts: List[int] = []
+        self._lock = threading.Lock()
+
+        self.recorded = 0
+        self.evicted = 0
+
+    def _move(self, value: str, old: int, new: int) -> None:
+        # Caller holds the lock; moves `value` between count buckets
+        if old:
+            bucket = self._buckets[old]
+            del bucket[value]
+            if not bucket:
+                del self._buckets[old]
+                del self._counts[bisect.bisect_left(self._counts, old)]
+        if new:
+            bucket = self._buckets.get(new)
+            if bucket is None:
+                bucket = self._buckets[new] = {}
+                bisect.insort(self._counts, new)
+            bucket[value] = None
+
+    def record(self, session_id: str, kind: str, items: Iterable[str], now: Optional[int] = None) -> None:
+        """
+        Records indicators of one type seen in a session's turn.
+
+        Args:
+            session_id: The session they were seen in.
+            kind: Intelligence type (e.g. "upiIds").
+            items: Raw extracted values; normalized here.
+            now: Seen-at time in epoch seconds (defaults to the clock).
+        """
+        if now is None:
+            now = int(self.clock())
+        with self._lock:
+            for item in items:
+                value = normalize_indicator(item)
+                entry = self._entries.get(value)
+                if entry is None:
+                    entry = self._entries[value] = Indicator(value, now)
+                    if len(self._entries) > self.max_indicators:
+                        self._evict_oldest()
+                else:
+                    self._entries.move_to_end(value)
+                    entry.lastSeen = now
+                entry.types[kind] = None
+                seen = entry.sessions.get(session_id)
+                if seen is None:
+                    entry.sessions[session_id] = [now, now]
+                    self._move(value, len(entry.sessions) - 1, len(entry.sessions))
+                else:
+                    seen[1] = now
+                self.recorded += 1
+
+    def _evict_oldest(self) -> None:
+        # Caller holds the lock
+        value, entry = self._entries.popitem(last=False)
+        self._move(value, len(entry.sessions), 0)
+        self.evicted += 1
+
+    def lookup(self, indicator: str, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        """
+        The indicator's summary and one page of its sessions (first-seen
+        order), or None if it was never seen.
+        """
+        offset = max(0, offset)
+        limit = max(0, min(limit, MAX_PAGE_SIZE))
+        with self._lock:
+            entry = self._entries.get(normalize_indicator(indicator))
+            if entry is None:
+                return None
+            result = entry.summary()
+            result["offset"] = offset
+            result["limit"] = limit
+            result["sessions"] = [
+                {"sessionId": session_id, "firstSeen": first, "lastSeen": last}
+                for session_id, (first, last) in islice(entry.sessions.items(), offset, offset + limit)
+            ]
+            return result
+
+    def top(self, n: int = 10, min_sessions: int = 2) -> List[Dict[str, Any]]:
+        """The n indicators seen in the most sessions (at least `min_sessions`)."""
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            for count in reversed(self._counts):
+                if count < min_sessions or len(results) >= n:
+                    break
+                for value in islice(self._buckets[count], n - len(results)):
+                    results.append(self._entries[value].summary())
+        return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "indicators": len(self._entries),
+                "shared": sum(len(self._buckets[count]) for count in self._counts if count >= 2),
+                "recorded": self.recorded,
+                "evicted": self.evicted
+            }
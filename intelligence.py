@@ -1,63 +1,210 @@
 import re
-from typing import Dict, List, Set
+import threading
+from typing import Dict, List, Optional
 
-def extract_intelligence(text: str) -> Dict[str, List[str]]:
+# Work limits for a single call. Every pattern below runs in linear time, and
+# input beyond MAX_EXTRACT_CHARS is ignored, so a multi-megabyte paste costs a
+# bounded amount of CPU.
+MAX_EXTRACT_CHARS = 256 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Longest entity any pattern can produce; chunks overlap by this much so an
+# entity that crosses a chunk boundary is still found whole.
+MAX_LINK_CHARS = 2048
+CHUNK_OVERLAP = MAX_LINK_CHARS + 16
+
+# Regex Patterns (compiled once at import, not looked up in the `re` cache per call)
+PATTERNS = {
+    # Matches 9-18 digit numbers (common bank account lengths)
+    "bankAccounts": re.compile(r"\b\d{9,18}\b"),
+
+    # Matches typical UPI IDs (user@bank)
+    # The lookbehind only lets a match start at the beginning of a run of
+    # handle characters, so a long run without '@' is scanned once instead of
+    # once per starting offset (which was quadratic).
+    "upiIds": re.compile(r"(?<![\w.-])[\w.-]{1,256}@[\w.-]{1,256}"),
+
+    # Matches Indian mobile numbers:
+    # - Optional +91
+    # - Optional separators (- or space)
+    # - Must start with 6-9
+    # - Total 10 digits
+    "phoneNumbers": re.compile(r"(?:\+?91[-\s]?)?[6-9]\d{9}"),
+
+    # Matches http/s URLs
+    # Explicit RFC 3986 character set; the old `[$-_]` range also let in
+    # '<', '>', '[', '\\' and '^'. Length is capped so chunk overlap covers it.
+    "phishingLinks": re.compile(r"https?://[\w\-.~:/?#\[\]@!$&'()*+,;=%]{1," + str(MAX_LINK_CHARS) + "}")
+}
+
+# Gates: a pattern only runs when its gate matches somewhere in the text.
+# Both digit-based patterns need at least 9 consecutive digits, so one cheap
+# scan tells us whether either of them can match at all.
+_DIGIT_RUN = re.compile(r"\d{9}")
+DEFAULT_GATES = {
+    "bankAccounts": _DIGIT_RUN,
+    "upiIds": re.compile("@"),
+    "phoneNumbers": _DIGIT_RUN,
+    "phishingLinks": re.compile("://")
+}
+
+
+class ExtractionRules:
+    """
+    Compiled extraction patterns and their gates ({type: regex}; a None gate
+    always runs). Rule packs build their own (see rules.py); the default is
+    PATTERNS with DEFAULT_GATES.
+    """
+    __slots__ = ("patterns", "gates")
+
+    def __init__(self, patterns: Dict[str, "re.Pattern"], gates: Dict[str, Optional["re.Pattern"]]):
+        self.patterns = patterns
+        self.gates = gates
+
+
+DEFAULT_EXTRACTION = ExtractionRules(PATTERNS, DEFAULT_GATES)
+
+_stats_lock = threading.Lock()
+_stats = {"truncated": 0, "chunked": 0}
+
+
+def get_extraction_stats() -> Dict[str, int]:
+    """
+    Returns how many messages were cut at MAX_EXTRACT_CHARS ("truncated")
+    and how many were scanned in more than one chunk ("chunked").
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _scan(pattern: "re.Pattern", text: str, limit: int, chunk_size: int, found: Dict[str, None]) -> None:
+    """
+    Runs `pattern` over text[:limit] in chunk_size windows overlapping by
+    CHUNK_OVERLAP. Windows use pos/endpos rather than slices, so nothing is
+    copied and lookbehinds still see the preceding characters.
+
+    A match is kept by the window it starts in, and the window reaches
+    CHUNK_OVERLAP past its own end so the match is seen whole. A match cut
+    off by the window end (only possible for an entity longer than the
+    overlap) is dropped rather than recorded truncated.
+    """
+    for start in range(0, limit, chunk_size):
+        stop = min(start + chunk_size, limit)
+        window_end = min(stop + CHUNK_OVERLAP, limit)
+        for match in pattern.finditer(text, start, window_end):
+            if match.start() >= stop:
+                break
+            if match.end() == window_end and window_end < limit:
+                continue
+            # Clean up the match (strip whitespace)
+            found[match.group().strip()] = None
+
+
+def extract_intelligence(
+    text: str,
+    max_chars: int = MAX_EXTRACT_CHARS,
+    chunk_size: int = CHUNK_SIZE,
+    rules: ExtractionRules = DEFAULT_EXTRACTION
+) -> Dict[str, List[str]]:
     """
     Extracts structured scam intelligence from text using regex patterns.
-    
+
     Why Regex?
     - High performance and reliability for structured data like phone numbers and UPI IDs.
     - No external API dependency (good for hackathons/offline privacy).
     - Deterministic output suitable for legal/evidence gathering.
-    
+
+    Patterns that cannot match (no '@', no '://', no 9-digit run) are skipped,
+    so a plain chat message costs a few C-level substring checks. Long inputs
+    are capped at `max_chars` and scanned in overlapping chunks; see
+    get_extraction_stats() for how often that happens.
+
     Args:
         text (str): The input message or conversation history.
-        
+        max_chars (int): Characters beyond this offset are ignored.
+        chunk_size (int): Size of each scan window for long inputs.
+        rules (ExtractionRules): Patterns to use (a rule pack's, or the defaults).
+
     Returns:
-        dict: Deduplicated lists of found entities.
-    """
-    
-    # Define Regex Patterns
-    patterns = {
-        # Matches 9-18 digit numbers (common bank account lengths)
-        "bankAccounts": r"\b\d{9,18}\b",
-        
-        # Matches typical UPI IDs (user@bank)
-        "upiIds": r"[\w\.-]+@[\w\.-]+",
-        
-        # Matches Indian mobile numbers:
-        # - Optional +91
-        # - Optional separators (- or space)
-        # - Must start with 6-9
-        # - Total 10 digits
-        "phoneNumbers": r"(?:\+?91[-\s]?)?[6-9]\d{9}",
-        
-        # Matches http/s URLs
-        "phishingLinks": r"https?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
-    }
-    
-    results = {
-        "bankAccounts": set(),
-        "upiIds": set(),
-        "phoneNumbers": set(),
-        "phishingLinks": set()
+        dict: Deduplicated lists of found entities, in order of appearance.
+    """
+
+    # Dicts as ordered sets: entities come out in the order they appear
+    results: Dict[str, Dict[str, None]] = {
+        "bankAccounts": {},
+        "upiIds": {},
+        "phoneNumbers": {},
+        "phishingLinks": {}
     }
-    
-    for key, pattern in patterns.items():
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            # Clean up the match (strip whitespace)
-            clean_match = match.group().strip()
-            
-            # Special handling for Phone Numbers to normalize format if needed
-            # For now, we store exactly what was found as evidence.
-            
-            results[key].add(clean_match)
-            
-    # Convert sets back to lists for JSON serialization
+
+    limit = len(text)
+    if limit > max_chars:
+        limit = max_chars
+        _count("truncated")
+    if limit > chunk_size:
+        _count("chunked")
+
+    # Each distinct gate is searched once (the digit gate serves two patterns)
+    gate_hits: Dict[Optional["re.Pattern"], bool] = {None: True}
+
+    # Special handling for Phone Numbers to normalize format if needed
+    # For now, we store exactly what was found as evidence.
+    for key, pattern in rules.patterns.items():
+        gate = rules.gates[key]
+        passed = gate_hits.get(gate)
+        if passed is None:
+            passed = gate_hits[gate] = gate.search(text, 0, limit) is not None
+        if passed:
+            _scan(pattern, text, limit, chunk_size, results[key])
+
+    # Convert to lists for JSON serialization
     return {
         "bankAccounts": list(results["bankAccounts"]),
         "upiIds": list(results["upiIds"]),
         "phoneNumbers": list(results["phoneNumbers"]),
         "phishingLinks": list(results["phishingLinks"])
     }
+
+
+_NON_DIGITS = re.compile(r"\D")
+_NUMBER = re.compile(r"\+?[\d\s().-]+")
+_LINK_TRAILER = ".,;:!?)]}'\"/"
+
+
+def normalize_indicator(value: str) -> str:
+    """
+    Canonical form of an extracted indicator, so the same mule account or
+    number written two ways is one index key.
+
+    - Links: scheme and host lowercased, trailing punctuation and '/' dropped
+      (the path keeps its case: it often carries a case-sensitive token).
+    - UPI IDs: lowercased.
+    - Domains and other text: lowercased.
+    - Numbers: separators dropped, and a "+91"/"91-" country prefix removed
+      from a 10-digit mobile number.
+
+    The type is not needed: 9876543210 is both a phone number and a possible
+    bank account, and both must land on the same key.
+    """
+    value = value.strip()
+    if "://" in value:
+        scheme, _, rest = value.partition("://")
+        host, slash, path = rest.partition("/")
+        return (scheme.lower() + "://" + host.lower() + slash + path).rstrip(_LINK_TRAILER)
+    if "@" in value:
+        return value.lower()
+    if not _NUMBER.fullmatch(value):
+        # Domains and anything else ("sbi-1234.in" is not a number)
+        return value.lower()
+    digits = _NON_DIGITS.sub("", value)
+    if not digits:
+        return value.lower()
+    if len(digits) == 12 and digits.startswith("91") and digits[2] in "6789" and not value.isdigit():
+        # "+91 98765 43210" / "91-9876543210"; a bare 12-digit run may be an account
+        digits = digits[2:]
+    return digits
@@ -0,0 +1,254 @@
+"""
+Load test: how many concurrent scam conversations one worker sustains.
+
+Virtual scammers replay multi-turn scripts (seeded corpus.py
+conversations, mostly scams, like the scenario in test_workflow.py)
+against POST /api/honeypot, with think times between turns and the
+conversationHistory growing as the platform sends it. Each concurrency
+level runs for a fixed time. Reported per level: turns/s, latency
+percentiles and a histogram per turn number, error and shed (busy reply)
+rates, and callbacks triggered. The highest level within the p99 SLO is
+named at the end.
+
+    python loadtest.py                                  # in-process (ASGI), no server
+    python loadtest.py --url http://127.0.0.1:8000      # a local uvicorn worker
+    python loadtest.py --levels 50 100 200 400 --duration 20 --think 1.0 --slo-ms 200 --out load.json
+
+In-process runs use a temporary callback outbox, and the callback
+dispatcher is not started, so triggered callbacks are counted but never
+sent anywhere.
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from corpus import CorpusGenerator
+
+API_KEY = os.getenv("HONEYPOT_API_KEY", "secret-hackathon-key")
+DEFAULT_LEVELS = [25, 50, 100, 200]
+DEFAULT_DURATION = 15.0
+DEFAULT_THINK = 1.0
+DEFAULT_SLO_MS = 200.0
+# Latency histogram bucket upper bounds, ms (the last bucket is open-ended)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000]
+BUSY_PREFIX = "Sorry, I'm a bit busy"
+
+
+class LevelStats:
+    """Results of one concurrency level."""
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.latencies: Dict[int, List[float]] = defaultdict(list)  # turn number -> seconds
+        self.ok = 0
+        self.shed = 0
+        self.errors = 0
+        self.conversations = 0
+        self.elapsed = 0.0
+        self.callbacks = 0
+
+    def record(self, turn: int, latency: float, outcome: str) -> None:
+        self.latencies[turn].append(latency)
+        if outcome == "ok":
+            self.ok += 1
+        elif outcome == "shed":
+            self.shed += 1
+        else:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        every = sorted(latency for values in self.latencies.values() for latency in values)
+        total = len(every)
+        return {
+            "concurrency": self.concurrency,
+            "turns": total,
+            "conversations": self.conversations,
+            "turnsPerSec": round(total / self.elapsed, 1) if self.elapsed else 0.0,
+            **percentiles(every),
+            "errorRate": round(self.errors / total, 4) if total else 0.0,
+            "shedRate": round(self.shed / total, 4) if total else 0.0,
+            "callbacksTriggered": self.callbacks,
+            "byTurn": {
+                str(turn): {**percentiles(sorted(values)), "histogram": histogram(values)}
+                for turn, values in sorted(self.latencies.items())
+            }
+        }
+
+
+def percentiles(ordered: List[float]) -> Dict[str, Optional[float]]:
+    if not ordered:
+        return {"p50Ms": None, "p95Ms": None, "p99Ms": None}
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 2)
+    return {"p50Ms": round(statistics.median(ordered) * 1000, 2), "p95Ms": pick(0.95), "p99Ms": pick(0.99)}
+
+
+def histogram(values: List[float]) -> List[int]:
+    """Counts per BUCKETS_MS bucket, plus one for everything slower."""
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for value in values:
+        counts[bisect.bisect_left(BUCKETS_MS, value * 1000)] += 1
+    return counts
+
+
+def think(rng: random.Random, mean: float) -> float:
+    # Lognormal pauses: mostly near the mean, with the odd long one
+    return rng.lognormvariate(0, 0.5) * mean / 1.133 if mean > 0 else 0.0
+
+
+async def scammer(
+    client: httpx.AsyncClient,
+    worker: int,
+    scripts: List[List[str]],
+    stats: LevelStats,
+    deadline: float,
+    think_mean: float,
+    seed: int
+) -> None:
+    """One virtual scammer: replays scripts, one session each, until the deadline."""
+    rng = random.Random(seed * 100003 + worker)
+    # Spread the start over one think time, so the level ramps up
+    await asyncio.sleep(rng.random() * think_mean)
+    headers = {"x-api-key": API_KEY}
+    conversation = 0
+    while time.monotonic() < deadline:
+        script = scripts[rng.randrange(len(scripts))]
+        session_id = f"load-{stats.concurrency}-{worker}-{conversation}"
+        conversation += 1
+        history: List[Dict[str, Any]] = []
+        for turn, text in enumerate(script, 1):
+            if time.monotonic() >= deadline:
+                return
+            timestamp = int(time.time() * 1000)
+            payload = {
+                "sessionId": session_id,
+                "message": {"sender": "scammer", "text": text, "timestamp": timestamp},
+                "conversationHistory": history,
+                "metadata": {"channel": "SMS", "language": "en", "locale": "IN"}
+            }
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/honeypot", json=payload, headers=headers)
+                reply = response.json().get("reply") if response.status_code == 200 else None
+                if response.status_code != 200:
+                    outcome = "error"
+                elif reply and reply.startswith(BUSY_PREFIX):
+                    outcome = "shed"
+                else:
+                    outcome = "ok"
+            except (httpx.HTTPError, ValueError):
+                reply, outcome = None, "error"
+            stats.record(turn, time.perf_counter() - started, outcome)
+            history = history + [payload["message"]]
+            if reply:
+                history.append({"sender": "user", "text": reply, "timestamp": timestamp + 1})
+            await asyncio.sleep(think(rng, think_mean))
+        stats.conversations += 1
+
+
+async def callbacks_triggered(client: httpx.AsyncClient) -> int:
+    # Turn-10 triggers only: the dispatcher's "submitted" also counts late
+    # intelligence updates and eviction flushes
+    health = (await client.get("/health")).json()
+    return health["sessions"]["callbacksTriggered"]
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, scripts, args) -> Dict[str, Any]:
+    stats = LevelStats(concurrency)
+    before = await callbacks_triggered(client)
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        scammer(client, worker, scripts, stats, deadline, args.think, args.seed)
+        for worker in range(concurrency)
+    ))
+    stats.elapsed = time.monotonic() - started
+    stats.callbacks = await callbacks_triggered(client) - before
+    return stats.summary()
+
+
+def print_level(summary: Dict[str, Any]) -> None:
+    print(
+        f"{summary['concurrency']:>6} {summary['turnsPerSec']:>9.1f} {summary['p50Ms'] or 0:>8.1f} "
+        f"{summary['p95Ms'] or 0:>8.1f} {summary['p99Ms'] or 0:>8.1f} {summary['errorRate']:>7.2%} "
+        f"{summary['shedRate']:>7.2%} {summary['callbacksTriggered']:>9}"
+    )
+
+
+def print_turns(summary: Dict[str, Any]) -> None:
+    labels = [f"<{b}" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]}"]
+    print(f"\n  Latency by turn at concurrency {summary['concurrency']} (ms buckets: {' '.join(labels)})")
+    for turn, row in summary["byTurn"].items():
+        print(f"  turn {turn:>2}: p50 {row['p50Ms']:>7.1f}  p99 {row['p99Ms']:>7.1f}  {row['histogram']}")
+
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    generator = CorpusGenerator(args.seed, {"en": 1.0}, scam_share=args.scam_share, turns=(10, 16))
+    scripts = [c.messages for c in generator.conversations(200)]
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30.0, limits=httpx.Limits(max_connections=max(args.levels)))
+    else:
+        # In-process: one worker's app, driven on this event loop. Its
+        # callbacks go to a temporary outbox, whoever imported main first.
+        import main
+        main.use_callback_outbox()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest", timeout=30.0)
+
+    print(f"\n--- Load test: {args.url or 'in-process ASGI'}, {args.duration:.0f}s per level, think {args.think}s ---\n")
+    print(f"{'conc':>6} {'turns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'shed':>7} {'callbacks':>9}")
+    summaries = []
+    async with client:
+        for concurrency in args.levels:
+            summary = await run_level(client, concurrency, scripts, args)
+            summaries.append(summary)
+            print_level(summary)
+    if args.by_turn:
+        for summary in summaries:
+            print_turns(summary)
+
+    within = [
+        s["concurrency"] for s in summaries
+        if s["p99Ms"] is not None and s["p99Ms"] <= args.slo_ms and s["errorRate"] + s["shedRate"] <= args.max_failure_rate
+    ]
+    print(
+        f"\nSLO p99 <= {args.slo_ms:.0f}ms with <= {args.max_failure_rate:.0%} errors+shed: "
+        + (f"held up to {max(within)} concurrent conversations" if within else "not met at any level")
+    )
+    return summaries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent scam-conversation load test for the honeypot API.")
+    parser.add_argument("--url", help="base URL of a running server (default: drive main:app in-process)")
+    parser.add_argument("--levels", type=int, nargs="+", default=DEFAULT_LEVELS, help="concurrent conversations per level")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds per level")
+    parser.add_argument("--think", type=float, default=DEFAULT_THINK, help="mean think time between turns, seconds")
+    parser.add_argument("--scam-share", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--slo-ms", type=float, default=DEFAULT_SLO_MS, help="p99 latency objective")
+    parser.add_argument("--max-failure-rate", type=float, default=0.01, help="errors + shed allowed within the SLO")
+    parser.add_argument("--by-turn", action="store_true", help="print the latency histogram per turn number")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    summaries = asyncio.run(main_async(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "out"}, "levels": summaries}, f, indent=2)
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+import threading
+from typing import List
+
+
+class StripedLock:
+    """
+    A fixed pool of locks shared out by key (e.g. sessionId).
+
+    All work for one key goes through the same lock, so it never interleaves,
+    while different keys usually land on different stripes and run in
+    parallel. Memory stays constant no matter how many keys are seen, unlike
+    a lock-per-session dict that would itself need a global lock and cleanup.
+    """
+    def __init__(self, stripes: int = 64):
+        if stripes < 1:
+            raise ValueError("stripes must be >= 1")
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(stripes)]
+
+    def lock_for(self, key: str) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
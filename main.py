@@ -1,87 +1,206 @@
-from fastapi import FastAPI, Request, HTTPException, Header
-from fastapi.responses import JSONResponse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import FastAPI, Request, Header, Response, WebSocket
+from pydantic import ValidationError
 from typing import Optional
-import json
+import asyncio
+import logging
+import os
+import tempfile
 
-app = FastAPI(title="Hackathon API")
+from admission import AdmissionController, ConnectionLimiter, RateLimiter
+from blocklist import Blocklist
+from callback_dispatcher import CallbackDispatcher
+from campaigns import CampaignIndex
+from classifier import LinearClassifier
+from codec import FastJSONResponse, decode_input, dumps
+from indicators import DEFAULT_PAGE_SIZE, IndicatorIndex
+from models import OutputFormat, StreamMessage
+from outbox import CallbackOutbox
+from rules import RulePackError, RulePackReloader
+from session_manager import SessionManager, flush_evicted_session
+from session_store import SessionStore
 
+logger = logging.getLogger(__name__)
 
-@app.post("/api/honeypot")
+EXPECTED_API_KEY = os.getenv("HONEYPOT_API_KEY", "secret-hackathon-key")
+
+# Final-result callbacks are recorded in a durable outbox and delivered in the
+# background, never on the request path. The outbox is opened at startup, not
+# on import, and its pending rows are replayed then.
+callback_dispatcher = CallbackDispatcher()
+
+
+def use_callback_outbox(path: Optional[str] = None) -> CallbackOutbox:
+    """
+    Records this worker's callbacks in the outbox at `path`, replacing any
+    outbox already open. Startup opens CALLBACK_OUTBOX_PATH (default
+    ./callback_outbox.db) unless this was called first.
+
+    Why a function? Tests and in-process tools (loadtest.py, the voice
+    demo's replay) import this module in any order, and the sessions they
+    make up must never land in the real outbox, which the next server start
+    would deliver.
+
+    Args:
+        path: SQLite file; None for a fresh temporary one.
+    """
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "callback_outbox.db")
+    if callback_dispatcher.outbox is not None:
+        callback_dispatcher.outbox.close()
+    callback_dispatcher.outbox = CallbackOutbox(path)
+    return callback_dispatcher.outbox
+
+# Admission control: a bounded number of pipeline runs at once, a short
+# bounded wait for the rest, and token buckets per API key and per session.
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("HONEYPOT_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("HONEYPOT_MAX_QUEUE", "64")),
+    queue_timeout=float(os.getenv("HONEYPOT_QUEUE_TIMEOUT", "0.5"))
+)
+# Dedicated pipeline threads, one per admission slot (SessionManager is thread-safe)
+pipeline_executor = ThreadPoolExecutor(max_workers=admission.max_concurrent, thread_name_prefix="pipeline")
+key_limiter = RateLimiter(
+    rate=float(os.getenv("HONEYPOT_KEY_RATE", "1000")),
+    burst=float(os.getenv("HONEYPOT_KEY_BURST", "2000"))
+)
+session_limiter = RateLimiter(
+    rate=float(os.getenv("HONEYPOT_SESSION_RATE", "5")),
+    burst=float(os.getenv("HONEYPOT_SESSION_BURST", "20"))
+)
+
+# Shed requests get this prebuilt reply: valid JSON in the normal shape, so
+# the "never 4xx, always JSON" contract holds even when overloaded.
+BUSY_BODY = dumps({"status": "success", "reply": "Sorry, I'm a bit busy right now. Can you send that again in a moment?"})
+
+
+def busy_response() -> Response:
+    return Response(content=BUSY_BODY, media_type="application/json", headers={"Retry-After": "1"})
+
+
+# WebSocket streams (/ws/honeypot): capped per worker, closed when idle
+stream_connections = ConnectionLimiter(int(os.getenv("HONEYPOT_WS_MAX_CONNECTIONS", "256")))
+STREAM_IDLE_TIMEOUT = float(os.getenv("HONEYPOT_WS_IDLE_TIMEOUT", "60"))
+
+
+# Known-bad indicators (see blocklist.py to build the file). A missing file
+# is an empty blocklist; a rebuilt one is picked up without a restart.
+blocklist = Blocklist(os.getenv("BLOCKLIST_PATH", "blocklist.bloom"))
+
+# Optional second-stage classifier (see train_classifier.py; needs numpy)
+# for messages whose rule score is near the threshold.
+CLASSIFIER_PATH = os.getenv("SCAM_CLASSIFIER_PATH")
+classifier = None
+if CLASSIFIER_PATH:
+    try:
+        classifier = LinearClassifier.load(CLASSIFIER_PATH)
+    except (ImportError, OSError, ValueError, KeyError) as e:
+        logger.error(f"Classifier not loaded, using rules only: {e}")
+
+session_manager = SessionManager(
+    store=SessionStore(on_evict=partial(flush_evicted_session, send=callback_dispatcher.submit)),
+    callback_sink=callback_dispatcher.submit,
+    campaign_index=CampaignIndex(),
+    indicator_index=IndicatorIndex(),
+    blocklist=blocklist,
+    classifier=classifier
+)
+
+# Optional rule pack file (JSON/YAML, see rules.py) replacing the built-in
+# detector rules. It is polled for changes and recompiled off the request path.
+RULES_PATH = os.getenv("SCAM_RULES_PATH")
+rules_reloader = RulePackReloader(session_manager.scam_detector, RULES_PATH) if RULES_PATH else None
+if rules_reloader is not None:
+    try:
+        rules_reloader.load()
+    except RulePackError as e:
+        logger.error(f"Rule pack not loaded, using built-in rules: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if callback_dispatcher.outbox is None:
+        use_callback_outbox(os.getenv("CALLBACK_OUTBOX_PATH", "callback_outbox.db"))
+    await callback_dispatcher.start()
+    watcher = asyncio.create_task(rules_reloader.run()) if rules_reloader is not None else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    # Drain queued callbacks before the worker exits
+    await callback_dispatcher.stop()
+
+
+app = FastAPI(title="Hackathon API", lifespan=lifespan)
+
+
+async def run_turn(session_id: str, text: str, **kwargs) -> Optional[dict]:
+    """
+    One pipeline turn in the worker pool, behind the session rate limit and
+    the admission controller. Returns None when the turn was shed (busy).
+    """
+    if not session_limiter.allow(session_id):
+        admission.record_rate_limited()
+        return None
+    if not await admission.acquire():
+        return None
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            pipeline_executor,
+            partial(session_manager.process_message, session_id, text, **kwargs)
+        )
+    finally:
+        admission.release()
+
+
+@app.post("/api/honeypot", response_class=FastJSONResponse)
 async def honeypot(
     request: Request,
     x_api_key: Optional[str] = Header(None)
 ):
     """
-    Honeypot endpoint that gracefully handles empty request bodies.
-    
+    Honeypot endpoint: runs one turn of the pipeline for the sender's session.
+
     This endpoint:
     - Never returns 422 (Unprocessable Entity)
-    - Always returns valid JSON
-    - Handles missing/empty request bodies
+    - Always returns valid JSON ({"status", "reply"} only)
+    - Handles missing/empty/malformed request bodies
     - Validates API key authentication
+    - Sheds load with a "busy" reply when rate-limited or over capacity
     """
-    
+
     # Validate API key
-    if x_api_key != "secret-hackathon-key":
-        return JSONResponse(
-            status_code=401,
-            content={
-                "status": "error",
-                "reply": "Invalid or missing API key"
-            }
-        )
-    
-    # Attempt to read and parse request body
+    if x_api_key != EXPECTED_API_KEY:
+        return FastJSONResponse(status_code=401, content={"detail": "Invalid API key"})
+    if not key_limiter.allow(x_api_key):
+        admission.record_rate_limited()
+        return busy_response()
+
     try:
         body_bytes = await request.body()
-        
-        # Handle empty body gracefully
-        if not body_bytes:
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "status": "success",
-                    "reply": "Request received with empty body"
-                }
-            )
-        
-        # Try to parse JSON
-        try:
-            body_data = json.loads(body_bytes)
-            
-            # Handle empty JSON object
-            if not body_data:
-                return JSONResponse(
-                    status_code=200,
-                    content={
-                        "status": "success",
-                        "reply": "Request received with empty JSON object"
-                    }
-                )
-            
-            # Process valid JSON data
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "status": "success",
-                    "reply": f"Request processed successfully with data: {json.dumps(body_data)}"
-                }
-            )
-            
-        except json.JSONDecodeError:
-            # Handle invalid JSON gracefully
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "status": "success",
-                    "reply": "Request received with non-JSON body"
-                }
-            )
-    
+        payload, reason = decode_input(body_bytes)
+        if payload is None:
+            return FastJSONResponse(content={"status": "success", "reply": reason})
+
+        result = await run_turn(
+            payload.sessionId,
+            payload.message.text,
+            timestamp=payload.message.timestamp,
+            sender=payload.message.sender,
+            history=payload.conversationHistory,
+            language=payload.metadata.language if payload.metadata else None,
+            locale=payload.metadata.locale if payload.metadata else None
+        )
+        if result is None:
+            return busy_response()
+        output = OutputFormat(status=result["status"], reply=result["reply"])
+        return FastJSONResponse(content=output.model_dump())
+
     except Exception as e:
         # Catch-all for any unexpected errors
-        return JSONResponse(
-            status_code=200,
+        logger.error(f"Honeypot request failed: {str(e)}")
+        return FastJSONResponse(
             content={
                 "status": "success",
                 "reply": f"Request processed with exception: {str(e)}"
@@ -89,10 +208,152 @@ async def honeypot(
         )
 
 
+@app.websocket("/ws/honeypot")
+async def honeypot_stream(
+    websocket: WebSocket,
+    sessionId: str,
+    language: Optional[str] = None,
+    locale: Optional[str] = None,
+    apiKey: Optional[str] = None
+):
+    """
+    Streaming variant of /api/honeypot for one session per connection.
+
+    Why a stream? Each REST turn pays for a connection, the key check and a
+    conversationHistory upload that grows every turn, although the session
+    state already lives here. A stream authenticates once (x-api-key header
+    or apiKey query parameter); then each text frame is one scammer message,
+    {"text": ..., "sender": ..., "timestamp": ...} (or plain text), answered
+    by one {"status", "reply"} frame.
+
+    Backpressure: frames are handled one at a time, and the next is read
+    only once the reply is sent, so a fast client fills the server's
+    receive buffer and then TCP's window instead of our memory. Turns still
+    go through the session rate limit and the admission controller (busy
+    replies as in REST). Connections past the per-worker cap are closed
+    with 1013 (try again later); idle ones are closed after
+    STREAM_IDLE_TIMEOUT seconds.
+    """
+    if (websocket.headers.get("x-api-key") or apiKey) != EXPECTED_API_KEY:
+        # Rejected in the handshake (HTTP 403)
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    if not stream_connections.try_open():
+        await websocket.close(code=1013, reason="Too many connections")
+        return
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(websocket.receive(), timeout=STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                stream_connections.record_idle_close()
+                await websocket.close(code=1000, reason="Idle timeout")
+                return
+            if frame["type"] == "websocket.disconnect":
+                return
+            data = frame.get("text") or frame.get("bytes") or ""
+            if data[:1] in ("{", b"{"):
+                try:
+                    message = StreamMessage.model_validate_json(data)
+                except ValidationError:
+                    await websocket.send_text('{"status":"success","reply":"Invalid message frame"}')
+                    continue
+            else:
+                message = StreamMessage(text=data if isinstance(data, str) else data.decode("utf-8", "replace"))
+
+            try:
+                result = await run_turn(
+                    sessionId,
+                    message.text,
+                    timestamp=message.timestamp,
+                    sender=message.sender,
+                    language=language,
+                    locale=locale
+                )
+            except Exception as e:
+                logger.error(f"Stream turn failed for {sessionId}: {str(e)}")
+                result = {"status": "success", "reply": f"Request processed with exception: {str(e)}"}
+            if result is None:
+                await websocket.send_text(BUSY_BODY.decode("utf-8"))
+            else:
+                await websocket.send_text(dumps({"status": result["status"], "reply": result["reply"]}).decode("utf-8"))
+    finally:
+        stream_connections.close()
+
+
+# Declared before the lookup route: "{indicator:path}" would also match "top"
+@app.get("/api/intel/top", response_class=FastJSONResponse)
+async def intel_top(limit: int = 10, min_sessions: int = 2, x_api_key: Optional[str] = Header(None)):
+    """Indicators shared by the most sessions (likely mule accounts)."""
+    if x_api_key != EXPECTED_API_KEY:
+        return FastJSONResponse(status_code=401, content={"detail": "Invalid API key"})
+    return FastJSONResponse(content={"indicators": session_manager.indicator_index.top(limit, min_sessions)})
+
+
+@app.get("/api/intel/{indicator:path}", response_class=FastJSONResponse)
+async def intel_lookup(
+    indicator: str,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    x_api_key: Optional[str] = Header(None)
+):
+    """
+    Sessions an indicator (UPI ID, phone number, account or link) was seen
+    in, one page at a time. The indicator is normalized like extracted ones,
+    so "+91 98765 43210" finds 9876543210.
+    """
+    if x_api_key != EXPECTED_API_KEY:
+        return FastJSONResponse(status_code=401, content={"detail": "Invalid API key"})
+    result = session_manager.indicator_index.lookup(indicator, offset, limit)
+    if result is None:
+        return FastJSONResponse(status_code=404, content={"detail": "Unknown indicator"})
+    return FastJSONResponse(content=result)
+
+
+@app.post("/api/blocklist/reload", response_class=FastJSONResponse)
+async def blocklist_reload(x_api_key: Optional[str] = Header(None)):
+    """Re-maps the blocklist file now instead of at the next periodic check."""
+    if x_api_key != EXPECTED_API_KEY:
+        return FastJSONResponse(status_code=401, content={"detail": "Invalid API key"})
+    try:
+        blocklist.reload()
+    except (OSError, ValueError) as e:
+        return FastJSONResponse(status_code=500, content={"detail": f"Blocklist reload failed: {str(e)}"})
+    return FastJSONResponse(content=blocklist.stats())
+
+
+@app.post("/api/rules/reload", response_class=FastJSONResponse)
+async def rules_reload(x_api_key: Optional[str] = Header(None)):
+    """Recompiles the rule pack file now and swaps it in."""
+    if x_api_key != EXPECTED_API_KEY:
+        return FastJSONResponse(status_code=401, content={"detail": "Invalid API key"})
+    if rules_reloader is None:
+        return FastJSONResponse(status_code=404, content={"detail": "No rule pack configured (SCAM_RULES_PATH)"})
+    try:
+        await rules_reloader.reload()
+    except RulePackError as e:
+        return FastJSONResponse(status_code=500, content={"detail": f"Rule pack reload failed: {str(e)}", **rules_reloader.stats()})
+    return FastJSONResponse(content=rules_reloader.stats())
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring."""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "admission": admission.stats(),
+        "sessions": session_manager.stats(),
+        "detectionCache": session_manager.detection_cache.stats() if session_manager.detection_cache else None,
+        "campaigns": session_manager.campaign_index.stats(),
+        "indicators": session_manager.indicator_index.stats(),
+        "blocklist": blocklist.stats(),
+        "classifier": classifier.stats() if classifier else None,
+        "agent": session_manager.agent.stats(),
+        "streams": stream_connections.stats(),
+        "rules": rules_reloader.stats() if rules_reloader else {"rulesVersion": session_manager.scam_detector.rules_version},
+        "callbacks": callback_dispatcher.metrics()
+    }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,285 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Boundary modes for keyword matching:
+# - "none":  plain substring match (legacy behaviour, "now" matches "know")
+# - "start": keyword must start at a word boundary ("now" no longer matches
+#            "know", but "expire" still matches "expired")
+# - "both":  keyword must be a whole word / phrase
+BOUNDARY_MODES = ("none", "start", "both")
+
+# Up to this many distinct keywords, one `kw in text` check per keyword beats
+# the trie regex on chat-sized messages; the two cross at roughly 48 (see
+# bench_analysis.py's rule-list scaling section)
+SUBSTRING_MAX_KEYWORDS = 48
+
+
+# Indic scripts (Devanagari through Sinhala) write vowel signs and viramas
+# as combining marks, which are not alphanumeric, so "\b" would find a word
+# boundary in the middle of "बहीखाता". Every character in these blocks except
+# the danda punctuation counts as part of a word.
+_INDIC_WORD = "\u0900-\u0963\u0966-\u0dff"
+# Checked right after a keyword's first character (the engine can still
+# jump between candidate first characters): the character before it is no
+# word character.
+_NOT_AFTER_WORD = "(?<![\\w" + _INDIC_WORD + "].)"
+_NOT_BEFORE_WORD = "(?![\\w" + _INDIC_WORD + "])"
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_" or ("\u0900" <= char <= "\u0dff" and char not in "\u0964\u0965")
+
+
+def _lead(char: str, boundary: bool) -> str:
+    # Regex for a keyword's first character, with the start boundary if any
+    if not boundary:
+        return re.escape(char)
+    if char.isascii():
+        return r"\b" + re.escape(char)
+    return re.escape(char) + _NOT_AFTER_WORD
+
+
+def _end_boundary(char: str) -> str:
+    return r"\b" if char.isascii() else _NOT_BEFORE_WORD
+
+
+class KeywordMatcher:
+    """
+    Compiles several categories of literal keywords into a single regex and
+    reports every category hit in one scan over the text.
+
+    Why a trie-shaped regex?
+    - The keywords are factored into a prefix trie before compiling, so at
+      each offset the `re` engine follows one branch per character instead of
+      trying every keyword. Cost stays roughly flat as the rule lists grow,
+      where one `kw in text` check per keyword grows with (keywords x length).
+    - Below `substring_max` distinct keywords those checks are still cheaper
+      than entering the regex engine, so small rule sets (the built-in pack
+      has 17) are scanned with `in` instead, and only the keywords present
+      are verified against their boundaries.
+    - Keywords hidden inside a longer match ("otp" in "share otp") and
+      keywords that straddle the end of a match are recovered from tables
+      precomputed at compile time, so overlapping hits are still reported.
+
+    Extra (non-literal) patterns such as the URL check can be passed as
+    `patterns`; they are precompiled and reported by name. They are searched
+    separately: folding them into the trie as lookaheads would disable the
+    engine's per-offset fast path and cost more than one extra C-level search.
+    """
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        patterns: Optional[Dict[str, str]] = None,
+        boundary: str = "start",
+        substring_max: int = SUBSTRING_MAX_KEYWORDS
+    ):
+        if boundary not in BOUNDARY_MODES:
+            raise ValueError(f"Unknown boundary mode: {boundary}")
+
+        self.boundary = boundary
+        self.categories = {name: list(keywords) for name, keywords in categories.items()}
+        self.patterns = dict(patterns or {})
+
+        # keyword -> ((category, index in category), ...), so a keyword listed
+        # in several categories (e.g. "cvv") is reported for each of them.
+        owners: Dict[str, List[Tuple[str, int]]] = {}
+        for name, keywords in self.categories.items():
+            for index, kw in enumerate(keywords):
+                if kw:
+                    owners.setdefault(kw.lower(), []).append((name, index))
+        self._owners = {kw: tuple(found) for kw, found in owners.items()}
+        keywords = list(self._owners)
+
+        # keyword -> [(offset, other keyword fully contained at that offset)]
+        self._contained: Dict[str, List[Tuple[int, str]]] = {}
+        # keyword -> [offsets where another keyword could start and run past it]
+        self._straddles: Dict[str, List[int]] = {}
+        for kw in keywords:
+            contained = []
+            straddles = set()
+            for other in keywords:
+                if other == kw:
+                    continue
+                for offset in range(len(kw)):
+                    if not self._starts_cleanly(kw, offset, other):
+                        continue
+                    if kw.startswith(other, offset):
+                        contained.append((offset, other))
+                    elif offset and other.startswith(kw[offset:]):
+                        straddles.add(offset)
+            self._contained[kw] = contained
+            self._straddles[kw] = sorted(straddles)
+
+        self._regex = re.compile(self._compile_trie(keywords)) if keywords else None
+        # Small rule sets: the keywords for the substring path, and a regex
+        # (same boundaries as the trie) for each one that has a boundary
+        self._plain: Optional[List[str]] = None
+        self._plain_bounded: Dict[str, "re.Pattern"] = {}
+        if len(keywords) <= substring_max:
+            self._plain = keywords
+            for kw in keywords:
+                check_start = boundary != "none" and _is_word_char(kw[0])
+                check_end = boundary == "both" and _is_word_char(kw[-1])
+                if check_start or check_end:
+                    self._plain_bounded[kw] = re.compile(
+                        _lead(kw[0], check_start) + re.escape(kw[1:]) + (_end_boundary(kw[-1]) if check_end else "")
+                    )
+        self._pattern_regexes = {name: re.compile(pattern) for name, pattern in self.patterns.items()}
+
+        # Identifies the compiled rule set; anything cached from scan results
+        # must be dropped when this changes.
+        self.version = hashlib.blake2b(
+            repr((self.boundary, self.categories, sorted(self.patterns.items()))).encode("utf-8"),
+            digest_size=8
+        ).hexdigest()
+        self.max_keyword_length = max((len(kw) for kw in keywords), default=0)
+
+    def _compile_trie(self, keywords: List[str]) -> str:
+        trie: Dict[str, dict] = {}
+        for kw in keywords:
+            node = trie
+            for char in kw:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        def emit(node: dict, last_char: str) -> str:
+            branches = [
+                re.escape(char) + emit(child, char)
+                for char, child in sorted(node.items()) if char
+            ]
+            if "" in node:
+                # Terminal node; as the last branch, longer keywords win.
+                if self.boundary == "both" and _is_word_char(last_char):
+                    branches.append(_end_boundary(last_char))
+                else:
+                    branches.append("")
+            if len(branches) == 1:
+                return branches[0]
+            return "(?:" + "|".join(branches) + ")"
+
+        top = []
+        for char, child in sorted(trie.items()):
+            top.append(_lead(char, self.boundary != "none" and _is_word_char(char)) + emit(child, char))
+        return "|".join(top)
+
+    def _starts_cleanly(self, keyword: str, offset: int, other: str) -> bool:
+        # Would `other` satisfy the start boundary at `offset` inside `keyword`?
+        if self.boundary == "none" or offset == 0 or not _is_word_char(other[0]):
+            return True
+        return not _is_word_char(keyword[offset - 1])
+
+    def _ends_cleanly(self, text: str, end: int, keyword: str) -> bool:
+        if self.boundary != "both" or end >= len(text) or not _is_word_char(keyword[-1]):
+            return True
+        return not _is_word_char(text[end])
+
+    def _add_contained(self, text: str, match: "re.Match", found: Dict[str, bool]) -> None:
+        start = match.start()
+        for offset, other in self._contained[match.group()]:
+            if self._ends_cleanly(text, start + offset + len(other), other):
+                found[other] = True
+
+    def scan(self, text_lower: str) -> Dict[str, List[str]]:
+        """
+        Scans already-lowercased text once.
+
+        Returns:
+            dict: {category: [keywords found, in declared order]} for every
+                  keyword category, plus {pattern name: [first match]} for
+                  each extra pattern that matched.
+        """
+        results = self.scan_keywords(text_lower)
+        results.update(self.scan_patterns(text_lower))
+        return results
+
+    def scan_patterns(self, text_lower: str) -> Dict[str, List[str]]:
+        """{pattern name: [first match]} for each extra pattern that matched."""
+        results = {}
+        for name, regex in self._pattern_regexes.items():
+            match = regex.search(text_lower)
+            if match is not None:
+                results[name] = [match.group()]
+        return results
+
+    def scan_keywords(self, text_lower: str) -> Dict[str, List[str]]:
+        """{category: [keywords found, in declared order]} for every category."""
+        results: Dict[str, List[str]] = {name: [] for name in self.categories}
+        if self._regex is None:
+            return results
+
+        found = self._find_substrings(text_lower) if self._plain is not None else self._find_trie(text_lower)
+        if not found:
+            return results
+
+        hits = []
+        for keyword in found:
+            hits.extend(self._owners[keyword])
+
+        # Report in declared order within each category
+        hits.sort(key=_index_of)
+        for name, index in hits:
+            results[name].append(self.categories[name][index])
+        return results
+
+    def _find_substrings(self, text_lower: str) -> Dict[str, bool]:
+        # One C-level containment test per keyword; only the (few) keywords
+        # present are checked against their boundaries, occurrence by occurrence
+        found = {}
+        bounded = self._plain_bounded
+        for keyword in [kw for kw in self._plain if kw in text_lower]:
+            regex = bounded.get(keyword)
+            if regex is None:
+                found[keyword] = True
+                continue
+            start = text_lower.find(keyword)
+            while start != -1:
+                if regex.match(text_lower, start) is not None:
+                    found[keyword] = True
+                    break
+                start = text_lower.find(keyword, start + 1)
+        return found
+
+    def _find_trie(self, text_lower: str) -> Dict[str, bool]:
+        found = {}
+        contained = self._contained
+        straddles = self._straddles
+        pending = None
+        for match in self._regex.finditer(text_lower):
+            keyword = match.group()
+            found[keyword] = True
+            if contained[keyword]:
+                self._add_contained(text_lower, match, found)
+            if straddles[keyword]:
+                pending = pending or []
+                pending.append(match)
+
+        # Rare: another keyword may start inside a match and run past its end
+        while pending:
+            match = pending.pop()
+            for offset in straddles[match.group()]:
+                extra = self._regex.match(text_lower, match.start() + offset)
+                if extra is not None:
+                    found[extra.group()] = True
+                    self._add_contained(text_lower, extra, found)
+                    pending.append(extra)
+        return found
+
+
+    def merge(self, first: Dict[str, List[str]], second: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        Union of two scan_keywords() results, still in declared order.
+        Returns `first` itself when `second` adds nothing.
+        """
+        merged = first
+        for name, found in second.items():
+            if found and not set(found).issubset(merged[name]):
+                if merged is first:
+                    merged = dict(first)
+                order = self.categories[name]
+                merged[name] = sorted(set(merged[name]).union(found), key=order.index)
+        return merged
+
+
+def _index_of(hit: Tuple[str, int]) -> int:
+    return hit[1]
@@ -1,11 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class Message(BaseModel):
     sender: str
     text: str
     timestamp: int
 
+class IncomingMessage(Message):
+    """The request's current message; without a timestamp it leaves the session's history watermark alone."""
+    timestamp: Optional[int] = None
+
 class Metadata(BaseModel):
     channel: str
     language: str
@@ -13,11 +17,29 @@ class Metadata(BaseModel):
 
 class InputFormat(BaseModel):
     sessionId: str
-    message: Message
+    message: IncomingMessage
     conversationHistory: List[Message] = []
-    metadata: Metadata
+    metadata: Optional[Metadata] = None
+
+class StreamMessage(BaseModel):
+    """One scammer message on a WebSocket stream (the session is the connection's)."""
+    text: str
+    sender: str = "scammer"
+    timestamp: Optional[int] = None
 
 class OutputFormat(BaseModel):
     status: str
     reply: Optional[str] = None
-    action: Optional[str] = None
+
+class SessionSnapshot(BaseModel):
+    sessionId: str
+    messages: List[str] = []
+    totalTurns: int = 0
+    scamDetected: bool = False
+    riskScore: float = 0.0
+    scamReasons: List[str] = []
+    extractedIntelligence: Dict[str, List[str]] = {}
+    intelligenceFirstSeen: Dict[str, Dict[str, Dict[str, int]]] = {}
+    callbackSent: bool = False
+    campaignId: Optional[int] = None
+    startTime: int = 0
@@ -0,0 +1,37 @@
+import unicodedata
+from typing import Tuple
+
+# Decimal digits of the Arabic and Indic scripts (Devanagari ०-९, Bengali,
+# Tamil, ...) mapped to ASCII, so phone numbers and accounts typed in them
+# are found by the ASCII extraction patterns. Fullwidth digits are already
+# folded by NFKC.
+_DIGITS = {
+    code: ord("0") + unicodedata.decimal(chr(code))
+    for code in range(0x0660, 0x1100)
+    if unicodedata.category(chr(code)) == "Nd"
+}
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFKC-normalizes a message and maps non-ASCII decimal digits to ASCII.
+    Case is kept (extracted evidence keeps its original casing).
+
+    Why check isascii() first? Most traffic is plain ASCII, which both
+    steps leave unchanged; the check is one C-level pass, while NFKC is a
+    full table-driven rewrite.
+    """
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKC", text).translate(_DIGITS)
+
+
+def fold(text: str) -> str:
+    """Case-folded form of normalized text, for keyword matching."""
+    return text.lower() if text.isascii() else text.casefold()
+
+
+def prepare(text: str) -> Tuple[str, str]:
+    """(normalized text for extraction, folded text for detection)."""
+    normalized = normalize_text(text)
+    return normalized, fold(normalized)
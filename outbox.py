@@ -0,0 +1,151 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimum gap between two deliveries for the same session: late intelligence
+# updates are coalesced and sent at most this often.
+DEFAULT_UPDATE_INTERVAL = 60.0
+
+STATUS_PENDING = "pending"
+STATUS_DELIVERED = "delivered"
+STATUS_DEAD = "dead"
+
+
+class CallbackOutbox:
+    """
+    Durable record of final-result callbacks that still have to be delivered.
+
+    One SQLite row per session holds the latest payload. add() commits before
+    it returns, so a callback that was triggered survives a crash or restart
+    and is replayed on startup. Adding again for the same session replaces
+    the payload (coalescing) and bumps its version; a delivery only marks the
+    row delivered if no newer version arrived meanwhile.
+
+    Updates after the first delivery are rate-limited: the row becomes due
+    no earlier than `update_interval` seconds after the last send.
+    """
+    def __init__(
+        self,
+        path: str,
+        update_interval: float = DEFAULT_UPDATE_INTERVAL,
+        clock: Callable[[], float] = time.time
+    ):
+        self.path = path
+        self.update_interval = update_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "session_id TEXT PRIMARY KEY, payload TEXT NOT NULL, version INTEGER NOT NULL, "
+            "status TEXT NOT NULL, due_at REAL NOT NULL, last_sent_at REAL, error TEXT)"
+        )
+        self._conn.commit()
+        self.coalesced = 0
+
+    def add(self, payload: Dict[str, Any]) -> int:
+        """Records (or replaces) the pending payload for a session; returns its version."""
+        session_id = payload["sessionId"]
+        data = json.dumps(payload, separators=(",", ":"))
+        now = self.clock()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT version, status, last_sent_at FROM outbox WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                version = 1
+                self._conn.execute(
+                    "INSERT INTO outbox (session_id, payload, version, status, due_at) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, data, version, STATUS_PENDING, now)
+                )
+                return version
+
+            version, status, last_sent_at = row
+            version += 1
+            if status == STATUS_PENDING:
+                self.coalesced += 1
+            due_at = now if last_sent_at is None else max(now, last_sent_at + self.update_interval)
+            self._conn.execute(
+                "UPDATE outbox SET payload = ?, version = ?, status = ?, due_at = ?, error = NULL "
+                "WHERE session_id = ?",
+                (data, version, STATUS_PENDING, due_at, session_id)
+            )
+            return version
+
+    def due(self, limit: int = 100, exclude: Collection[str] = ()) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """Pending callbacks that may be sent now: [(sessionId, version, payload)]."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, version, payload FROM outbox "
+                "WHERE status = ? AND due_at <= ? ORDER BY due_at LIMIT ?",
+                (STATUS_PENDING, self.clock(), limit + len(exclude))
+            ).fetchall()
+        return [
+            (session_id, version, json.loads(payload))
+            for session_id, version, payload in rows
+            if session_id not in exclude
+        ][:limit]
+
+    def mark_delivered(self, session_id: str, version: int) -> None:
+        now = self.clock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = CASE WHEN version = ? THEN ? ELSE status END, "
+                "last_sent_at = ?, due_at = MAX(due_at, ?) WHERE session_id = ?",
+                (version, STATUS_DELIVERED, now, now + self.update_interval, session_id)
+            )
+
+    def mark_dead(self, session_id: str, version: int, error: str) -> None:
+        """Gives up on a version; a newer pending version is left alone."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, error = ? WHERE session_id = ? AND version = ?",
+                (STATUS_DEAD, error, session_id, version)
+            )
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, version, status, due_at, last_sent_at, error FROM outbox WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, version, status, due_at, last_sent_at, error = row
+        return {
+            "payload": json.loads(payload),
+            "version": version,
+            "status": status,
+            "dueAt": due_at,
+            "lastSentAt": last_sent_at,
+            "error": error
+        }
+
+    def prune(self, older_than: float) -> int:
+        """Deletes delivered rows last sent before `older_than` (epoch seconds)."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND last_sent_at < ?", (STATUS_DELIVERED, older_than)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return {
+            "pending": counts.get(STATUS_PENDING, 0),
+            "delivered": counts.get(STATUS_DELIVERED, 0),
+            "dead": counts.get(STATUS_DEAD, 0),
+            "coalesced": self.coalesced
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,328 @@
+"""
+Rule packs: the detector's keywords, weights and threshold plus the
+intelligence extraction regexes, as data.
+
+A pack is a JSON or YAML file (YAML needs PyYAML) shaped like DEFAULT_RULES;
+any top-level key left out keeps its default, and an "intelligence" entry
+may override only some of the four extraction patterns:
+
+    version: "2026-10-18.1"
+    threshold: 0.5
+    categories:
+      scam: {keywords: [urgent, verify, blocked], weight: 0.3, minHits: 2,
+             reason: "Multiple scam keywords detected"}
+    patterns:
+      url: {pattern: "https?://...", weight: 0.3, reason: "Suspicious URL format detected"}
+    intelligence:
+      upiIds: {pattern: "...", gate: "@"}
+
+"locales" adds keywords per language ({name: {categories: {...}}}) and
+"localeSelect" maps a request's metadata.language / locale to locale names.
+
+Categories and patterns are scored in file order. A pack is compiled once
+(compile_rules) and swapped into a detector as a whole (ScamDetector.use_rules),
+so every message is scored by exactly one pack.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from intelligence import DEFAULT_GATES, ExtractionRules, PATTERNS
+from matcher import BOUNDARY_MODES, KeywordMatcher
+from normalization import fold, normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 10.0
+
+# The built-in pack (what ScamDetector used to hardcode)
+DEFAULT_RULES: Dict[str, Any] = {
+    "version": "builtin",
+    "boundary": "start",
+    "threshold": 0.5,
+    "categories": {
+        "scam": {
+            "keywords": ["urgent", "verify", "blocked", "otp", "upi", "account", "password", "cvv"],
+            "weight": 0.3,
+            "minHits": 2,
+            "reason": "Multiple scam keywords detected"
+        },
+        "urgency": {
+            "keywords": ["immediately", "now", "expire", "last chance"],
+            "weight": 0.25,
+            "reason": "Urgency language detected"
+        },
+        "threat": {
+            "keywords": ["suspended", "legal action", "penalty"],
+            "weight": 0.25,
+            "reason": "Threatening language detected"
+        },
+        "sensitive": {
+            "keywords": ["share otp", "send password", "cvv"],
+            "weight": 0.4,
+            "reason": "Sensitive information request detected"
+        }
+    },
+    "patterns": {
+        "url": {
+            "pattern": r"https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+",
+            "weight": 0.3,
+            "reason": "Suspicious URL format detected"
+        }
+    },
+    "intelligence": {},
+    # Extra keywords per language, merged into the categories above when a
+    # request's metadata selects them (see CompiledRules.select)
+    "locales": {
+        "hi": {
+            "categories": {
+                "scam": {"keywords": ["खाता", "ब्लॉक", "सत्यापित", "ओटीपी", "यूपीआई", "पासवर्ड", "केवाईसी", "सीवीवी"]},
+                "urgency": {"keywords": ["तुरंत", "अभी", "जल्दी", "आखिरी मौका"]},
+                "threat": {"keywords": ["बंद हो जाएगा", "कानूनी कार्रवाई", "जुर्माना", "गिरफ्तार"]},
+                "sensitive": {"keywords": ["ओटीपी बताएं", "ओटीपी भेजें", "पिन बताएं", "पासवर्ड भेजें"]}
+            }
+        },
+        "hinglish": {
+            "categories": {
+                "scam": {"keywords": ["khata", "kyc", "verify karo", "block ho"]},
+                "urgency": {"keywords": ["turant", "jaldi", "abhi", "aaj hi"]},
+                "threat": {"keywords": ["band ho jayega", "kanooni", "jurmana", "giraftar"]},
+                "sensitive": {"keywords": ["otp batao", "otp bhejo", "otp share karo", "pin batao"]}
+            }
+        }
+    },
+    # metadata.language, then metadata.locale (lowercased; "hi-IN" also
+    # tries "hi", "en-IN" also tries "in") -> locale sets to add
+    "localeSelect": {
+        "hi": ["hi", "hinglish"],
+        "hindi": ["hi", "hinglish"],
+        "hinglish": ["hinglish"],
+        "in": ["hinglish"]
+    }
+}
+
+
+class RulePackError(ValueError):
+    """A rule pack that cannot be read or compiled."""
+
+
+class CompiledRules:
+    """
+    One compiled rule pack: the keyword matcher, scoring table and
+    extraction patterns. Immutable once built, so it can be shared by every
+    thread and replaced with a single reference swap.
+
+    `version` is the pack's declared version plus a digest of its content
+    ("builtin@1a2b3c4d"): editing a pack without bumping its version still
+    changes it, which is what caches key on.
+    """
+    def __init__(self, pack: Dict[str, Any], source: Optional[str] = None, version: Optional[str] = None):
+        start = time.perf_counter()
+        self.source = source
+        if version is None:
+            digest = hashlib.blake2b(json.dumps(pack, sort_keys=True).encode("utf-8"), digest_size=4).hexdigest()
+            version = f"{pack.get('version', 'unversioned')}@{digest}"
+        self.version = version
+        self.threshold = float(pack["threshold"])
+
+        # [(category, weight, minimum hits, reason)] in scoring order
+        self.categories: List[Tuple[str, float, int, str]] = []
+        keywords: Dict[str, List[str]] = {}
+        for name, spec in pack["categories"].items():
+            keywords[name] = [fold(normalize_text(str(kw))) for kw in spec.get("keywords", [])]
+            self.categories.append((name, float(spec["weight"]), int(spec.get("minHits", 1)),
+                                    spec.get("reason", f"{name} keywords detected")))
+        self.patterns: List[Tuple[str, float, str]] = []
+        regexes: Dict[str, str] = {}
+        for name, spec in pack.get("patterns", {}).items():
+            if name in keywords:
+                raise RulePackError(f"Pattern {name!r} has the same name as a category")
+            regexes[name] = spec["pattern"]
+            self.patterns.append((name, float(spec["weight"]), spec.get("reason", f"{name} pattern detected")))
+
+        boundary = pack.get("boundary", "start")
+        if boundary not in BOUNDARY_MODES:
+            raise RulePackError(f"Unknown boundary mode: {boundary}")
+        self.matcher = KeywordMatcher(keywords, patterns=regexes, boundary=boundary)
+
+        overrides = pack.get("intelligence") or {}
+        patterns, gates = dict(PATTERNS), dict(DEFAULT_GATES)
+        for key, spec in overrides.items():
+            if key not in PATTERNS:
+                raise RulePackError(f"Unknown intelligence type: {key}")
+            if isinstance(spec, str):
+                patterns[key] = re.compile(spec)
+            else:
+                patterns[key] = re.compile(spec["pattern"])
+                gate = spec.get("gate", DEFAULT_GATES[key].pattern)
+                gates[key] = re.compile(gate) if gate else None
+        self.extraction = ExtractionRules(patterns, gates)
+
+        # Locale variants are compiled up front, one per distinct set of
+        # locales, so selecting one per request is a dict lookup and each
+        # request still runs a single matcher scan.
+        self._select: Dict[str, CompiledRules] = {}
+        variants: Dict[Tuple[str, ...], CompiledRules] = {}
+        for key, names in (pack.get("localeSelect") or {}).items():
+            names = tuple(names)
+            if names and names not in variants:
+                variants[names] = CompiledRules(
+                    _locale_pack(pack, names), source, version=f"{self.version}+{'+'.join(names)}"
+                )
+            self._select[key.lower()] = variants[names] if names else self
+
+        self.compile_seconds = time.perf_counter() - start
+
+    def select(self, language: Optional[str] = None, locale: Optional[str] = None) -> "CompiledRules":
+        """
+        The rules for a request's metadata: the first localeSelect entry
+        matching the language ("hi-IN", then "hi"), else the locale ("en-IN",
+        then "in"), else these base rules.
+        """
+        if not self._select:
+            return self
+        for value, part in ((language, 0), (locale, -1)):
+            if value:
+                value = value.strip().lower().replace("_", "-")
+                rules = self._select.get(value) or self._select.get(value.split("-")[part])
+                if rules is not None:
+                    return rules
+        return self
+
+    def keywords(self, category: str) -> List[str]:
+        return self.matcher.categories.get(category, [])
+
+
+def _locale_pack(pack: Dict[str, Any], names: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    A pack with the named locales' keywords merged into its categories. A
+    locale category the pack lacks is added only if it has its own weight.
+    """
+    merged = copy.deepcopy(pack)
+    merged.pop("localeSelect", None)
+    locales = merged.pop("locales", None) or {}
+    categories = merged["categories"]
+    for name in names:
+        if name not in locales:
+            raise RulePackError(f"localeSelect names an unknown locale: {name}")
+        for category, spec in locales[name].get("categories", {}).items():
+            if category in categories:
+                categories[category]["keywords"] = list(categories[category].get("keywords", [])) + list(spec.get("keywords", []))
+            elif "weight" in spec:
+                categories[category] = copy.deepcopy(spec)
+            # else: extra keywords for a category this pack doesn't score
+    return merged
+
+
+def merge_pack(pack: Dict[str, Any]) -> Dict[str, Any]:
+    """DEFAULT_RULES overlaid with a pack's top-level keys."""
+    if not isinstance(pack, dict):
+        raise RulePackError("A rule pack must be a mapping")
+    merged = copy.deepcopy(DEFAULT_RULES)
+    merged.update(pack)
+    return merged
+
+
+def load_rule_pack(path: str) -> Dict[str, Any]:
+    """Reads a JSON or YAML (.yaml/.yml) rule pack, merged over the defaults."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError:
+                    raise RulePackError("YAML rule packs need PyYAML (pip install pyyaml)")
+                pack = yaml.safe_load(f)
+            else:
+                pack = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RulePackError(f"Cannot read rule pack {path}: {e}") from e
+    except Exception as e:
+        # yaml.YAMLError does not subclass ValueError
+        raise RulePackError(f"Cannot parse rule pack {path}: {e}") from e
+    return merge_pack(pack or {})
+
+
+def compile_rules(pack: Optional[Dict[str, Any]] = None, source: Optional[str] = None) -> CompiledRules:
+    """Compiles a (merged) pack, logging how long it took."""
+    try:
+        rules = CompiledRules(pack if pack is not None else DEFAULT_RULES, source)
+    except RulePackError:
+        raise
+    except (KeyError, TypeError, ValueError, re.error) as e:
+        raise RulePackError(f"Invalid rule pack {source or ''}: {e!r}") from e
+    logger.info(f"Compiled rule pack {rules.version} from {source or 'defaults'} in {rules.compile_seconds * 1000:.1f} ms")
+    return rules
+
+
+class RulePackReloader:
+    """
+    Keeps a detector on the latest version of a rule pack file.
+
+    Compiling a large pack takes milliseconds, so it never happens on the
+    request path: reload() compiles in a worker thread and then swaps the
+    result in with one assignment. run() polls the file's identity
+    (one stat per interval) and reloads when it changed; a pack that fails
+    to load is logged and the current rules stay in place.
+    """
+    def __init__(self, detector, path: str, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.detector = detector
+        self.path = path
+        self.check_interval = check_interval
+        self._identity: Optional[Tuple[int, int, int]] = None
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def _file_identity(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def load(self) -> CompiledRules:
+        """Compiles the file now and swaps it in (blocking; call from a thread)."""
+        identity = self._file_identity()
+        try:
+            rules = compile_rules(load_rule_pack(self.path), self.path)
+        except RulePackError as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self._identity = identity  # don't retry the same broken file every tick
+            raise
+        self.detector.use_rules(rules)
+        self._identity = identity
+        self.reloads += 1
+        self.last_error = None
+        return rules
+
+    async def reload(self) -> CompiledRules:
+        return await asyncio.to_thread(self.load)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            identity = self._file_identity()
+            if identity is None or identity == self._identity:
+                continue
+            try:
+                await self.reload()
+            except RulePackError as e:
+                logger.error(f"Rule pack reload failed, keeping {self.detector.rules_version}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "rulesVersion": self.detector.rules_version,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "lastError": self.last_error
+        }
@@ -1,86 +1,251 @@
-import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence
+import logging
+
+from blocklist import Blocklist
+from classifier import LinearClassifier
+from matcher import KeywordMatcher
+from normalization import fold, normalize_text
+from rules import DEFAULT_RULES, CompiledRules, compile_rules
+
+logger = logging.getLogger(__name__)
+
+# Added to the risk score when an extracted indicator is on the blocklist:
+# enough on its own to confirm the scam.
+BLOCKLIST_RISK = 0.9
+
+# Rule scores this close to the threshold are refined by the classifier,
+# whose probability then makes up CLASSIFIER_WEIGHT of the risk score.
+CLASSIFIER_BAND = 0.2
+CLASSIFIER_WEIGHT = 0.5
+
 
 class ScamDetector:
     """
     A weighted, multi-layer scam detection system using pattern matching.
+
+    The keyword categories, weights, threshold and extra patterns come from
+    a rule pack (rules.py; the built-in DEFAULT_RULES unless given one),
+    compiled once into a KeywordMatcher so each message is scanned a single
+    time. use_rules() swaps in a new pack atomically: every call reads
+    `self.rules` once, so a message is never scored by half of each.
     """
-    def __init__(self):
-        # 1. Define Categories and Patterns
-        self.scam_keywords = [
-            "urgent", "verify", "blocked", "otp", "upi", 
-            "account", "password", "cvv"
-        ]
-        
-        self.urgency_patterns = [
-            "immediately", "now", "expire", "last chance"
-        ]
-        
-        self.threat_patterns = [
-            "suspended", "legal action", "penalty"
-        ]
-        
-        self.sensitive_patterns = [
-            "share otp", "send password", "cvv"
-        ]
-        
-        self.url_pattern = r"https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+"
+    def __init__(
+        self,
+        boundary: Optional[str] = None,
+        blocklist: Optional[Blocklist] = None,
+        rules: Optional[CompiledRules] = None,
+        classifier: Optional[LinearClassifier] = None
+    ):
+        # 1-2. Categories and patterns, compiled into a single-pass matcher
+        if rules is None:
+            pack = DEFAULT_RULES if boundary is None else {**DEFAULT_RULES, "boundary": boundary}
+            rules = compile_rules(pack)
+        self.rules = rules
+
+        # 3. Optional known-bad indicators (a Bloom filter file), checked
+        # against the entities extracted from each message
+        self.blocklist = blocklist
+
+        # 4. Optional second stage (classifier.LinearClassifier) for
+        # borderline rule scores only; see refine()
+        self.classifier = classifier
+
+    def use_rules(self, rules: CompiledRules) -> None:
+        """Atomically replaces the rule pack (compile it off the request path)."""
+        previous, self.rules = self.rules, rules
+        logger.info(f"Rule pack {previous.version} replaced by {rules.version}")
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        return self.rules.matcher
+
+    # The built-in categories, as lists (kept for callers of the old attributes)
+    @property
+    def scam_keywords(self) -> List[str]:
+        return self.rules.keywords("scam")
+
+    @property
+    def urgency_patterns(self) -> List[str]:
+        return self.rules.keywords("urgency")
+
+    @property
+    def threat_patterns(self) -> List[str]:
+        return self.rules.keywords("threat")
+
+    @property
+    def sensitive_patterns(self) -> List[str]:
+        return self.rules.keywords("sensitive")
+
+    @property
+    def url_pattern(self) -> Optional[str]:
+        return self.rules.matcher.patterns.get("url")
 
     def analyze(self, text: str) -> Dict[str, Any]:
         """
         Analyzes the message text and returns a scam risk assessment
         using a weighted scoring system.
         """
-        text_lower = text.lower()
+        text_lower = fold(normalize_text(text))
+        return self.refine(self.assess(text_lower), text_lower)
+
+    def analyze_batch(
+        self,
+        texts: Sequence[str],
+        language: Optional[str] = None,
+        locale: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        analyze() for many messages of one locale; the borderline ones go
+        through the classifier together, in one vectorized call.
+        """
+        rules = self.rules_for(language, locale)
+        folded = [fold(normalize_text(text)) for text in texts]
+        return self.refine_batch([self.assess(text, rules) for text in folded], folded, rules)
+
+    @property
+    def rules_version(self) -> str:
+        """The rule pack's version; changes whenever the compiled rules do."""
+        return self.rules.version
+
+    def rules_for(self, language: Optional[str] = None, locale: Optional[str] = None) -> CompiledRules:
+        """The current pack's variant for a request's metadata.language / locale."""
+        return self.rules.select(language, locale)
+
+    def assess(self, text_lower: str, rules: Optional[CompiledRules] = None) -> Dict[str, Any]:
+        """
+        Same as analyze(), for callers that have already lowercased (or
+        normalized and case-folded) the text; see analysis.analyze_message.
+
+        Args:
+            rules: A locale variant from rules_for() (defaults to the base rules).
+        """
+        if rules is None:
+            rules = self.rules
+        return self.score(rules.matcher.scan(text_lower), rules)
+
+    def score(self, hits: Dict[str, List[str]], rules: Optional[CompiledRules] = None) -> Dict[str, Any]:
+        """
+        Weighted scoring of matcher hits ({category: [keywords]}, plus a key
+        for each extra pattern that matched, e.g. "url").
+
+        Each category adds its weight once it has `minHits` keywords (the
+        built-in pack: +0.3 for 2+ scam keywords, +0.25 urgency, +0.25
+        threat, +0.4 sensitive), each matched pattern adds its weight (+0.3
+        for a URL), and the capped total is compared to the threshold (0.5).
+
+        Args:
+            hits: Output of the pack's matcher.
+            rules: The pack that produced `hits` (defaults to the current one).
+        """
+        if rules is None:
+            rules = self.rules
         risk_score = 0.0
         scam_reasons = []
         suspicious_keywords = []
-        
-        # 1. Keyword Analysis (+0.3 if >= 2 keywords found)
-        found_keywords = [kw for kw in self.scam_keywords if kw in text_lower]
-        if found_keywords:
-            suspicious_keywords.extend(found_keywords)
-            if len(found_keywords) >= 2:
-                risk_score += 0.3
-                scam_reasons.append(f"Multiple scam keywords detected: {', '.join(found_keywords)}")
-
-        # 2. Urgency Analysis (+0.25)
-        found_urgency = [p for p in self.urgency_patterns if p in text_lower]
-        if found_urgency:
-            suspicious_keywords.extend(found_urgency)
-            risk_score += 0.25
-            scam_reasons.append(f"Urgency language detected: {', '.join(found_urgency)}")
-
-        # 3. Threat Analysis (+0.25)
-        found_threats = [p for p in self.threat_patterns if p in text_lower]
-        if found_threats:
-            suspicious_keywords.extend(found_threats)
-            risk_score += 0.25
-            scam_reasons.append(f"Threatening language detected: {', '.join(found_threats)}")
-
-        # 4. Sensitive Info Request Analysis (+0.4)
-        found_sensitive = [p for p in self.sensitive_patterns if p in text_lower]
-        if found_sensitive:
-            suspicious_keywords.extend(found_sensitive)
-            risk_score += 0.4
-            scam_reasons.append(f"Sensitive information request detected: {', '.join(found_sensitive)}")
-
-        # 5. Phishing URL Analysis (+0.3)
-        if re.search(self.url_pattern, text_lower):
-            risk_score += 0.3
-            scam_reasons.append("Suspicious URL format detected")
+
+        # 1. Keyword categories
+        for name, weight, min_hits, reason in rules.categories:
+            found = hits.get(name)
+            if found:
+                suspicious_keywords.extend(found)
+                if len(found) >= min_hits:
+                    risk_score += weight
+                    scam_reasons.append(f"{reason}: {', '.join(found)}")
+
+        # 2. Extra patterns (e.g. the phishing URL check)
+        for name, weight, reason in rules.patterns:
+            if name in hits:
+                risk_score += weight
+                scam_reasons.append(reason)
 
         # Cap score at 1.0 (optional, but good practice)
         risk_score = min(risk_score, 1.0)
 
         # Final Decision
-        scam_detected = risk_score >= 0.5
-        
+        scam_detected = risk_score >= rules.threshold
+
         return {
             "riskScore": round(risk_score, 2),
             "scamDetected": scam_detected,
             "scamReasons": scam_reasons,
-            "suspiciousKeywords": list(set(suspicious_keywords))
+            "suspiciousKeywords": list(set(suspicious_keywords)),
+            "rulesVersion": rules.version
+        }
+
+    def refine(
+        self,
+        assessment: Dict[str, Any],
+        text_lower: str,
+        rules: Optional[CompiledRules] = None
+    ) -> Dict[str, Any]:
+        """
+        Second-stage scoring of one assessment; see refine_batch().
+        """
+        return self.refine_batch([assessment], [text_lower], rules)[0]
+
+    def refine_batch(
+        self,
+        assessments: List[Dict[str, Any]],
+        texts_lower: Sequence[str],
+        rules: Optional[CompiledRules] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Re-scores the assessments whose rule score is within CLASSIFIER_BAND
+        of the threshold: the risk score becomes a blend of the rule score
+        and the classifier's scam probability ("classifierScore").
+
+        Why only near the threshold? Clear-cut messages keep the cheap rule
+        verdict, so the classifier costs nothing on most traffic, and it
+        decides exactly the cases where a keyword more or less flips the
+        verdict. Returns new dicts for the re-scored ones (assessments may be
+        shared by the detection cache) and the others unchanged.
+
+        Args:
+            assessments: Outputs of assess()/score(), one per message.
+            texts_lower: The case-folded messages they were computed from.
+            rules: The pack whose threshold applies (defaults to the current one).
+        """
+        if self.classifier is None:
+            return assessments
+        if rules is None:
+            rules = self.rules
+        borderline = [
+            i for i, assessment in enumerate(assessments)
+            if round(abs(assessment["riskScore"] - rules.threshold), 2) <= CLASSIFIER_BAND
+        ]
+        if not borderline:
+            return assessments
+        probabilities = self.classifier.predict([texts_lower[i] for i in borderline])
+        refined = list(assessments)
+        for i, probability in zip(borderline, probabilities.tolist()):
+            assessment = assessments[i]
+            risk_score = (1 - CLASSIFIER_WEIGHT) * assessment["riskScore"] + CLASSIFIER_WEIGHT * probability
+            refined[i] = {
+                **assessment,
+                "riskScore": round(risk_score, 2),
+                "scamDetected": risk_score >= rules.threshold,
+                "scamReasons": assessment["scamReasons"] + [f"Classifier scam probability: {probability:.2f}"],
+                "classifierScore": round(probability, 3)
+            }
+        return refined
+
+    def check_blocklist(self, assessment: Dict[str, Any], intelligence: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        Raises an assessment by BLOCKLIST_RISK when any extracted indicator
+        is on the blocklist. Returns a new dict (assessments may be shared by
+        the detection cache) or the same one when nothing is listed.
+        """
+        if self.blocklist is None:
+            return assessment
+        listed = self.blocklist.matches(intelligence)
+        if not listed:
+            return assessment
+        risk_score = min(assessment["riskScore"] + BLOCKLIST_RISK, 1.0)
+        return {
+            **assessment,
+            "riskScore": round(risk_score, 2),
+            "scamDetected": risk_score >= self.rules.threshold,
+            "scamReasons": assessment["scamReasons"] + [f"Known scam indicator on blocklist: {', '.join(listed)}"]
         }
 
     def is_scam(self, text: str) -> bool:
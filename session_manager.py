@@ -1,69 +1,460 @@
-from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, Field
+from typing import Callable, Dict, List, Any, Optional, Sequence, Tuple
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
+import base64
+import hashlib
+import json
 import logging
+import sys
+import threading
+import zlib
 
 from scam_detector import ScamDetector
-from intelligence import extract_intelligence
-from agent import HoneypotAgent
+from blocklist import Blocklist
+from classifier import LinearClassifier
+from analysis import analyze_message
+from detection_cache import DetectionCache, DEFAULT_CACHE_SIZE
+from campaigns import CampaignIndex
+from indicators import IndicatorIndex
+from agent import HoneypotAgent, ReplyEngine
+from session_store import SessionStore, EVICT_EXPIRED
+from locks import StripedLock
+from callback import send_final_callback
+from models import SessionSnapshot
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SessionState(BaseModel):
+# Only the most recent messages are kept per session; older text is dropped,
+# or compressed into the session archive when archiving is enabled.
+MAX_RECENT_MESSAGES = 8
+ARCHIVE_BATCH = 8
+
+
+INTELLIGENCE_KEYS = ("bankAccounts", "upiIds", "phoneNumbers", "phishingLinks")
+
+# Risk assigned to a session flagged only by matching a known scam campaign
+CAMPAIGN_MATCH_RISK = 0.6
+
+# conversationHistory senders that are the honeypot's own replies (not analyzed)
+OWN_SENDERS = frozenset({"user"})
+
+
+def _empty_intelligence() -> Dict[str, Dict[str, Tuple[int, int]]]:
+    return {key: {} for key in INTELLIGENCE_KEYS}
+
+
+@dataclass(slots=True)
+class SessionState:
     """
     In-memory storage for a single conversation session.
+
+    A slotted dataclass rather than a pydantic model: with tens of thousands
+    of live sessions the per-instance overhead matters, and validation is
+    only needed at the edges (see to_model()).
+
+    Messages live in a small ring buffer (`_ring`, oldest at `_head`);
+    `messages` returns them oldest first.
+
+    Intelligence is kept per type as an insertion-ordered dict
+    {value: (first-seen turn, first-seen timestamp)}, so merging a turn costs
+    O(new items) and output order is the order entities were first seen.
+    The list form (`extractedIntelligence`) is built lazily and cached until
+    the next new entity.
     """
     sessionId: str
-    messages: List[str] = Field(default_factory=list)
     totalTurns: int = 0
     scamDetected: bool = False
     riskScore: float = 0.0
-    scamReasons: List[str] = Field(default_factory=list)
-    
-    # Aggregated intelligence
-    extractedIntelligence: Dict[str, List[str]] = Field(default_factory=lambda: {
-        "bankAccounts": [],
-        "upiIds": [],
-        "phoneNumbers": [],
-        "phishingLinks": []
-    })
-    
+    scamReasons: List[str] = field(default_factory=list)
+
+    # Aggregated intelligence: {type: {value: (turn, timestamp)}}
+    _intel: Dict[str, Dict[str, Tuple[int, int]]] = field(default_factory=_empty_intelligence, repr=False)
+    _intel_lists: Optional[Dict[str, List[str]]] = field(default=None, repr=False)
+
     callbackSent: bool = False
-    startTime: int = Field(default_factory=lambda: int(datetime.now().timestamp()))
+    campaignId: Optional[int] = None
+    startTime: int = field(default_factory=lambda: int(datetime.now().timestamp()))
+
+    _ring: List[str] = field(default_factory=list, repr=False)
+    _head: int = field(default=0, repr=False)
+    # Overflowed messages: zlib-compressed batches plus a not-yet-compressed tail
+    _archive: Optional[List[bytes]] = field(default=None, repr=False)
+    _pending: Optional[List[str]] = field(default=None, repr=False)
+
+    # Last ingested message as (timestamp, message_digest); see unseen_history()
+    _watermark: Optional[Tuple[int, str]] = field(default=None, repr=False)
+    # Digest of the last message ingested without a timestamp: it can't move
+    # the watermark, so it is skipped when the history later repeats it
+    _untimed: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def messages(self) -> List[str]:
+        """Retained messages, oldest first."""
+        return self._ring[self._head:] + self._ring[:self._head]
+
+    def add_message(self, text: str, max_recent: int = MAX_RECENT_MESSAGES, archive: bool = False) -> None:
+        if len(self._ring) < max_recent:
+            self._ring.append(text)
+            return
+
+        oldest = self._ring[self._head]
+        self._ring[self._head] = text
+        self._head = (self._head + 1) % len(self._ring)
+
+        if archive:
+            if self._pending is None:
+                self._pending = []
+            self._pending.append(oldest)
+            if len(self._pending) >= ARCHIVE_BATCH:
+                if self._archive is None:
+                    self._archive = []
+                self._archive.append(zlib.compress(json.dumps(self._pending).encode("utf-8")))
+                self._pending = None
+
+    def archived_messages(self) -> List[str]:
+        """Messages that overflowed the ring buffer (only kept when archiving)."""
+        archived: List[str] = []
+        for blob in self._archive or []:
+            archived.extend(json.loads(zlib.decompress(blob)))
+        archived.extend(self._pending or [])
+        return archived
+
+    @property
+    def extractedIntelligence(self) -> Dict[str, List[str]]:
+        """Deduplicated intelligence lists in first-seen order (treat as read-only)."""
+        if self._intel_lists is None:
+            self._intel_lists = {key: list(values) for key, values in self._intel.items()}
+        return self._intel_lists
+
+    def add_intelligence(self, key: str, items: List[str], turn: int, timestamp: int) -> List[str]:
+        """
+        Records entities of one type; returns the ones not seen before.
+        Unknown types are ignored.
+        """
+        seen = self._intel.get(key)
+        if seen is None:
+            return []
+        added = []
+        for item in items:
+            if item not in seen:
+                seen[item] = (turn, timestamp)
+                added.append(item)
+        if added:
+            self._intel_lists = None
+        return added
+
+    def intelligence_first_seen(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """{type: {value: {"turn": n, "timestamp": t}}} for every entity."""
+        return {
+            key: {value: {"turn": turn, "timestamp": ts} for value, (turn, ts) in values.items()}
+            for key, values in self._intel.items()
+        }
+
+    def add_reasons(self, reasons: List[str]) -> None:
+        for reason in reasons:
+            if reason not in self.scamReasons:
+                self.scamReasons.append(reason)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict with the public fields (callback payload input)."""
+        return {
+            "sessionId": self.sessionId,
+            "messages": self.messages,
+            "totalTurns": self.totalTurns,
+            "scamDetected": self.scamDetected,
+            "riskScore": self.riskScore,
+            "scamReasons": list(self.scamReasons),
+            "extractedIntelligence": {key: list(items) for key, items in self.extractedIntelligence.items()},
+            "intelligenceFirstSeen": self.intelligence_first_seen(),
+            "callbackSent": self.callbackSent,
+            "campaignId": self.campaignId,
+            "startTime": self.startTime
+        }
+
+    def to_model(self) -> SessionSnapshot:
+        """Validated pydantic view of the session, for API responses."""
+        return SessionSnapshot(**self.to_dict())
+
+    def to_record(self) -> Dict[str, Any]:
+        """Complete state (including archive and first-seen data) for storage."""
+        return {
+            "sessionId": self.sessionId,
+            "totalTurns": self.totalTurns,
+            "scamDetected": self.scamDetected,
+            "riskScore": self.riskScore,
+            "scamReasons": self.scamReasons,
+            "callbackSent": self.callbackSent,
+            "campaignId": self.campaignId,
+            "startTime": self.startTime,
+            "messages": self.messages,
+            "archive": [base64.b64encode(blob).decode("ascii") for blob in self._archive or []],
+            "pending": self._pending,
+            "watermark": list(self._watermark) if self._watermark else None,
+            "untimed": self._untimed,
+            "intel": {
+                key: [[value, turn, ts] for value, (turn, ts) in values.items()]
+                for key, values in self._intel.items()
+            }
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "SessionState":
+        session = cls(
+            sessionId=record["sessionId"],
+            totalTurns=record["totalTurns"],
+            scamDetected=record["scamDetected"],
+            riskScore=record["riskScore"],
+            scamReasons=list(record["scamReasons"]),
+            callbackSent=record["callbackSent"],
+            campaignId=record.get("campaignId"),
+            startTime=record["startTime"]
+        )
+        session._ring = list(record["messages"])
+        if record.get("archive"):
+            session._archive = [base64.b64decode(blob) for blob in record["archive"]]
+        session._pending = record.get("pending")
+        if record.get("watermark"):
+            session._watermark = tuple(record["watermark"])
+        session._untimed = record.get("untimed")
+        for key, entries in record.get("intel", {}).items():
+            if key in session._intel:
+                session._intel[key] = {value: (turn, ts) for value, turn, ts in entries}
+        return session
+
+
+def message_digest(sender: str, text: str) -> str:
+    """Short content hash of a message, to tell apart messages sharing a timestamp."""
+    return hashlib.blake2b(f"{sender}\x00{text}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+def unseen_history(history: Sequence[Any], watermark: Optional[Tuple[int, str]]) -> Sequence[Any]:
+    """
+    The suffix of a chronological conversationHistory that comes after the
+    watermark message.
+
+    Walks back from the end and stops at the watermark, so the cost is
+    O(new messages) and the already-processed prefix is never touched.
+    Among messages sharing the watermark's timestamp, the content hash finds
+    the exact one; if none matches, everything up to that timestamp counts
+    as seen.
+
+    Args:
+        history: Message-like objects (sender, text, timestamp), oldest first.
+        watermark: (timestamp, message_digest) of the last ingested message.
+    """
+    if watermark is None:
+        return history
+    ts, digest = watermark
+    start = len(history)
+    while start > 0 and history[start - 1].timestamp > ts:
+        start -= 1
+    i = start
+    while i > 0 and history[i - 1].timestamp == ts:
+        if message_digest(history[i - 1].sender, history[i - 1].text) == digest:
+            return history[i:]
+        i -= 1
+    return history[start:]
+
+
+def encode_session(session: SessionState) -> str:
+    return json.dumps(session.to_record(), separators=(",", ":"))
+
+
+def decode_session(data: str) -> SessionState:
+    return SessionState.from_record(json.loads(data))
+
+
+def estimate_session_bytes(session: SessionState) -> int:
+    """
+    Rough memory footprint of a session, used for the store's memory budget.
+    Counts the variable-size parts (message text and intelligence strings)
+    on top of a fixed allowance for the model itself.
+    """
+    size = 512
+    for message in session._ring:
+        size += sys.getsizeof(message)
+    for reason in session.scamReasons:
+        size += sys.getsizeof(reason)
+    for values in session._intel.values():
+        for item in values:
+            size += sys.getsizeof(item) + 64
+    for blob in session._archive or []:
+        size += sys.getsizeof(blob)
+    return size
+
+
+def flush_evicted_session(
+    session: SessionState,
+    reason: str,
+    send: Callable[..., Any] = send_final_callback
+) -> None:
+    """
+    Eviction hook: reports a confirmed scam session that never got its final
+    callback, so its intelligence is not lost when it leaves memory. The
+    report is `final`, so it goes out whatever the turn count.
+    Bind `send` to CallbackDispatcher.submit to keep it off the request path.
+    """
+    if session.scamDetected and not session.callbackSent:
+        logger.info(f"Flushing evicted session {session.sessionId} ({reason})")
+        if send(session.to_dict(), final=True):
+            session.callbackSent = True
+        else:
+            logger.error(f"Flush of evicted session {session.sessionId} was not accepted")
+
 
 class SessionManager:
     """
     Orchestrates the Scam Detection, Agent Response, and Intelligence Aggregation.
+
+    Safe to call from many threads (e.g. FastAPI's threadpool): each turn runs
+    under its session's stripe of a StripedLock, so turns of one session never
+    interleave while different sessions proceed in parallel.
     """
-    def __init__(self):
-        # In-memory store: {sessionId: SessionState}
-        # Note: This is ephemeral and will be lost on restart.
-        self.sessions: Dict[str, SessionState] = {}
-        
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        max_recent_messages: int = MAX_RECENT_MESSAGES,
+        archive_messages: bool = False,
+        lock_stripes: int = 64,
+        callback_sink: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        detection_cache_size: int = DEFAULT_CACHE_SIZE,
+        campaign_index: Optional[CampaignIndex] = None,
+        indicator_index: Optional[IndicatorIndex] = None,
+        blocklist: Optional[Blocklist] = None,
+        classifier: Optional[LinearClassifier] = None,
+        reply_engine: Optional[ReplyEngine] = None
+    ):
+        # Bounded in-memory store: {sessionId: SessionState} with TTL/LRU eviction.
+        # Note: The default store is ephemeral and will be lost on restart.
+        # Pass SessionStore(on_evict=flush_evicted_session) to report evicted scams.
+        # For persistence pass storage.WriteBehindSessionStore(SQLiteBackend(path)).
+        self.sessions = store if store is not None else SessionStore()
+        if self.sessions.sizeof is None:
+            self.sessions.sizeof = estimate_session_bytes
+        if getattr(self.sessions, "persistent", False):
+            if self.sessions.serialize is None:
+                self.sessions.serialize = encode_session
+            if self.sessions.deserialize is None:
+                self.sessions.deserialize = decode_session
+
+        # Evictions happen inside some other session's turn. The store's hook is
+        # deferred and run after that turn's lock is released, under the evicted
+        # session's own lock, so flushing can't deadlock or race a live turn.
+        self._locks = StripedLock(lock_stripes)
+        self._flush_hook = self.sessions.on_evict
+        self._evicted: deque = deque()
+        if self._flush_hook is not None:
+            self.sessions.on_evict = self._defer_eviction
+
+        # Message history kept per session (older text is dropped or compressed)
+        self.max_recent_messages = max_recent_messages
+        self.archive_messages = archive_messages
+
+        # Where triggered callbacks go (e.g. CallbackDispatcher.submit); it returns
+        # whether it accepted the report. The sink also gets an updated report
+        # whenever intelligence arrives after the first callback. Without a
+        # sink, callers act on "callbackTrigger".
+        self.callback_sink = callback_sink
+
+        # Optional cross-session campaign clustering: scam messages are grouped
+        # into near-duplicate campaigns, and a new session whose message
+        # matches a known scam campaign is flagged from that first message.
+        self.campaign_index = campaign_index
+
+        # Optional cross-session inverted index of extracted indicators
+        # (which sessions share a UPI ID, number or link)
+        self.indicator_index = indicator_index
+
         # Initialize components
-        self.scam_detector = ScamDetector()
-        self.agent = HoneypotAgent()
+        # An optional blocklist of known-bad indicators raises the risk of
+        # any message that contains one; an optional classifier re-scores
+        # borderline messages
+        self.scam_detector = ScamDetector(blocklist=blocklist, classifier=classifier)
+        # Shared across sessions: campaign copies of one template hit the same entry
+        self.detection_cache = DetectionCache(self.scam_detector, detection_cache_size) if detection_cache_size else None
+        # Replies: an optional engine under a latency budget, templates as fallback
+        self.agent = HoneypotAgent(engine=reply_engine)
+
+        # Final-callback triggers (turn-10 rule), as opposed to the reports the
+        # sink receives, which also include late updates and eviction flushes
+        self.callbacks_triggered = 0
+        self._stats_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        """The session store's stats plus callback triggers."""
+        with self._stats_lock:
+            triggered = self.callbacks_triggered
+        return {**self.sessions.stats(), "callbacksTriggered": triggered}
 
     def get_session(self, session_id: str) -> SessionState:
-        if session_id not in self.sessions:
-            self.sessions[session_id] = SessionState(sessionId=session_id)
-        return self.sessions[session_id]
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = SessionState(sessionId=session_id)
+            self.sessions.put(session_id, session)
+        return session
 
-    def process_message(self, session_id: str, message_text: str) -> Dict[str, Any]:
+    def process_message(
+        self,
+        session_id: str,
+        message_text: str,
+        timestamp: Optional[int] = None,
+        sender: str = "scammer",
+        history: Optional[Sequence[Any]] = None,
+        language: Optional[str] = None,
+        locale: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Main pipeline:
-        1. Update Session
-        2. Detect Scam
-        3. Extract Intelligence
-        4. Engage Agent
-        5. Check Callback Rules
+        Runs one turn of the pipeline for a session (see _process_locked).
+
+        Args:
+            timestamp, sender: The current message's metadata; with a
+                timestamp the session's history watermark moves past it.
+            history: The request's conversationHistory (Message-like objects,
+                oldest first). Only messages past the watermark are ingested,
+                which rebuilds a session lost to a restart or eviction.
+            language, locale: The request's metadata; they pick the locale
+                keyword sets the detector runs for this turn.
+        """
+        with self._locks.lock_for(session_id):
+            result = self._process_locked(session_id, message_text, timestamp, sender, history, language, locale)
+        self._drain_evicted()
+        return result
+
+    def _defer_eviction(self, session: SessionState, reason: str) -> None:
+        # A persistent store only drops the in-memory copy on LRU/memory
+        # eviction; the session can still come back, so only flush on expiry.
+        if getattr(self.sessions, "persistent", False) and reason != EVICT_EXPIRED:
+            return
+        self._evicted.append((session, reason))
+
+    def _drain_evicted(self) -> None:
+        while self._evicted:
+            try:
+                session, reason = self._evicted.popleft()
+            except IndexError:
+                # Another thread drained it first
+                return
+            with self._locks.lock_for(session.sessionId):
+                try:
+                    self._flush_hook(session, reason)
+                except Exception as e:
+                    logger.error(f"Eviction hook failed for {session.sessionId}: {str(e)}")
+
+    def _ingest(
+        self,
+        session: SessionState,
+        message_text: str,
+        language: Optional[str] = None,
+        locale: Optional[str] = None
+    ) -> Dict[str, List[str]]:
+        """
+        Steps 1-3 for one scammer message; returns newly seen intelligence.
         """
-        session = self.get_session(session_id)
-        
         # 1. Update Session
-        session.messages.append(message_text)
+        session.add_message(message_text, self.max_recent_messages, self.archive_messages)
         session.totalTurns += 1
         
         # 2. Detect Scam (if not already confirmed)
@@ -71,18 +462,70 @@ class SessionManager:
         # Strategy: Evaluate current message. If high risk, mark session as confirmed scam.
         # Alternatively, accumulate score? The requirements say "riskScore >= 0.5".
         # Let's check the current message.
-        if not session.scamDetected:
-            analysis = self.scam_detector.analyze(message_text)
-            if analysis["scamDetected"]:
-                session.scamDetected = True
-                session.riskScore = analysis["riskScore"]
-                session.scamReasons.extend(analysis["scamReasons"])
-                logger.warning(f"SCAM DETECTED in session {session_id}! Score: {session.riskScore}")
+        # Detection and extraction share one analysis pass over the text.
+        analysis = analyze_message(
+            message_text, self.scam_detector, detect=not session.scamDetected, cache=self.detection_cache,
+            language=language, locale=locale
+        )
+        if analysis.scam_detected:
+            session.scamDetected = True
+            session.riskScore = analysis.assessment["riskScore"]
+            session.add_reasons(analysis.assessment["scamReasons"])
+            logger.warning(f"SCAM DETECTED in session {session.sessionId}! Score: {session.riskScore}")
+
+        if self.campaign_index is not None:
+            self._match_campaign(session, message_text, analysis.scam_detected)
 
         # 3. Extract Intelligence
-        new_intel = extract_intelligence(message_text)
-        self._aggregate_intelligence(session, new_intel)
-        
+        return self._aggregate_intelligence(session, analysis.intelligence)
+
+    def _process_locked(
+        self,
+        session_id: str,
+        message_text: str,
+        timestamp: Optional[int] = None,
+        sender: str = "scammer",
+        history: Optional[Sequence[Any]] = None,
+        language: Optional[str] = None,
+        locale: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Main pipeline (caller holds the session's lock):
+        0. Catch up on unseen conversationHistory
+        1. Update Session
+        2. Detect Scam
+        3. Extract Intelligence
+        4. Engage Agent
+        5. Check Callback Rules
+        """
+        session = self.get_session(session_id)
+
+        # 0. History past the watermark (normally nothing: the previous turn's
+        # message is the watermark, and our own replies are skipped)
+        added: Dict[str, List[str]] = {}
+        if history and session._watermark is None and session.totalTurns:
+            # Turns arrived without timestamps, so what the history repeats
+            # is unknown; take it as seen rather than count it twice.
+            last = history[-1]
+            session._watermark = (last.timestamp, message_digest(last.sender, last.text))
+        elif history:
+            for message in unseen_history(history, session._watermark):
+                digest = message_digest(message.sender, message.text)
+                if digest == session._untimed:
+                    session._untimed = None
+                elif message.sender not in OWN_SENDERS:
+                    for key, items in self._ingest(session, message.text, language, locale).items():
+                        added.setdefault(key, []).extend(items)
+                session._watermark = (message.timestamp, digest)
+
+        # 1-3. The current message
+        for key, items in self._ingest(session, message_text, language, locale).items():
+            added.setdefault(key, []).extend(items)
+        if timestamp is not None:
+            session._watermark = (timestamp, message_digest(sender, message_text))
+        else:
+            session._untimed = message_digest(sender, message_text)
+
         # 4. Determine Action
         response_text = None
         action = "ignore"
@@ -101,14 +544,27 @@ class SessionManager:
             # Engage Agent (Turns 1-15)
             if session.totalTurns <= 15:
                 action = "engage"
-                response_text = self.agent.generate_reply(session.totalTurns, message_text)
+                response_text = self.agent.generate_reply(session.totalTurns, message_text, session_id)
             
             # 5. Check Callback Rules
             # Rule: Scam=True, Turns>=10, CallbackSent=False
             if session.totalTurns >= 10 and not session.callbackSent:
                 should_send_callback = True
-                session.callbackSent = True
                 logger.info(f"Triggering Callback for session {session_id}")
+                with self._stats_lock:
+                    self.callbacks_triggered += 1
+                # Hand off first: the flag only flips once the sink (e.g. a
+                # durable outbox) has accepted the report. A refused report
+                # is tried again next turn, or flushed when evicted.
+                if self.callback_sink is None or self.callback_sink(session.to_dict()):
+                    session.callbackSent = True
+                else:
+                    logger.error(f"Callback for session {session_id} was not accepted")
+            elif session.callbackSent and added and self.callback_sink is not None:
+                # Late intelligence: send an updated report (the outbox
+                # coalesces these and rate-limits them per session)
+                logger.info(f"Updating callback for session {session_id}: new {', '.join(added)}")
+                self.callback_sink(session.to_dict())
         
         else:
             # Not a scam (yet)
@@ -118,6 +574,9 @@ class SessionManager:
             # The prompt says: "Activate HoneypotAgent ONLY if scamDetected = true"
             # So we return None.
 
+        # Re-measure the session now that it has grown
+        self.sessions.put(session_id, session)
+
         return {
             "sessionId": session_id,
             "status": "success",
@@ -127,13 +586,34 @@ class SessionManager:
             "intelligence": session.extractedIntelligence
         }
 
-    def _aggregate_intelligence(self, session: SessionState, new_data: Dict[str, List[str]]):
+    def _match_campaign(self, session: SessionState, message_text: str, is_scam: bool) -> None:
+        # Only the message's own verdict counts as a scam report: small talk
+        # in an already flagged session must not seed a "known scam" cluster
+        was_scam = session.scamDetected
+        campaign = self.campaign_index.assign(message_text, is_scam=is_scam)
+        if campaign is None:
+            return
+        if session.campaignId is None:
+            session.campaignId = campaign.campaignId
+        if not was_scam and self.campaign_index.is_known_scam(campaign):
+            session.scamDetected = True
+            session.riskScore = max(session.riskScore, CAMPAIGN_MATCH_RISK)
+            session.add_reasons([f"Matches known scam campaign #{campaign.campaignId} ({campaign.size} messages)"])
+            logger.warning(f"SCAM DETECTED in session {session.sessionId} via campaign #{campaign.campaignId}")
+
+    def _aggregate_intelligence(self, session: SessionState, new_data: Dict[str, List[str]]) -> Dict[str, List[str]]:
         """
         Merges new intelligence into the session state with deduplication.
+        Costs O(new items); returns the entities seen for the first time.
+        Every item also refreshes its entry in the indicator index.
         """
+        now = int(datetime.now().timestamp())
+        added = {}
         for key, items in new_data.items():
-            if key in session.extractedIntelligence:
-                # Use set for deduplication
-                current_set = set(session.extractedIntelligence[key])
-                current_set.update(items)
-                session.extractedIntelligence[key] = list(current_set)
+            if items:
+                if self.indicator_index is not None:
+                    self.indicator_index.record(session.sessionId, key, items, now)
+                fresh = session.add_intelligence(key, items, session.totalTurns, now)
+                if fresh:
+                    added[key] = fresh
+        return added
@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults sized for a single small pod; override per deployment.
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_IDLE_TTL = 30 * 60          # seconds without a message before a session expires
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Eviction reasons passed to the on_evict hook and counted in stats()
+EVICT_CAPACITY = "capacity"
+EVICT_EXPIRED = "expired"
+EVICT_MEMORY = "memory"
+
+
+class SessionStore:
+    """
+    Bounded in-memory session store with idle TTL and LRU eviction.
+
+    Sessions are kept in an OrderedDict in least-recently-used order, so the
+    entries that expire or get evicted first are always at the front and each
+    eviction is O(1).
+
+    Limits:
+    - max_sessions: hard cap on the number of live sessions.
+    - idle_ttl: seconds since the last get/put before a session expires.
+    - max_bytes: budget for the summed `sizeof(session)` estimates.
+
+    Evicted sessions are handed to `on_evict(session, reason)` after they are
+    removed, so the hook can flush them (e.g. send the final callback).
+
+    Thread-safe: one internal lock guards the index and is held only for the
+    O(1) bookkeeping of each call, never while the hook runs.
+    """
+    def __init__(
+        self,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        sizeof: Optional[Callable[[Any], int]] = None,
+        on_evict: Optional[Callable[[Any, str], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self.clock = clock
+
+        # {sessionId: (session, last_access, size)}
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = {EVICT_CAPACITY: 0, EVICT_EXPIRED: 0, EVICT_MEMORY: 0}
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Returns the live session (marking it recently used) or None."""
+        now = self.clock()
+        with self._lock:
+            evicted = self._expire(now)
+
+            entry = self._entries.get(session_id)
+            if entry is None:
+                self.misses += 1
+                session = None
+            else:
+                self.hits += 1
+                session, _, size = entry
+                self._entries[session_id] = (session, now, size)
+                self._entries.move_to_end(session_id)
+
+        self._notify(evicted)
+        return session
+
+    def put(self, session_id: str, session: Any) -> None:
+        """
+        Inserts or updates a session and re-measures its size. Call this after
+        mutating a session so the memory budget stays accurate.
+        """
+        now = self.clock()
+        size = self.sizeof(session) if self.sizeof is not None else 0
+
+        with self._lock:
+            old = self._entries.pop(session_id, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[session_id] = (session, now, size)
+            self._bytes += size
+
+            evicted = self._expire(now)
+            while len(self._entries) > self.max_sessions:
+                evicted.append(self._pop_oldest(EVICT_CAPACITY))
+            # Never evict the session being written, even if it alone is over budget
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                evicted.append(self._pop_oldest(EVICT_MEMORY))
+
+        self._notify(evicted)
+
+    def pop(self, session_id: str) -> Optional[Any]:
+        """Removes a session without running the eviction hook."""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[2]
+            return entry[0]
+
+    def evict_expired(self) -> int:
+        """Drops every idle session now; returns how many were evicted."""
+        now = self.clock()
+        with self._lock:
+            evicted = self._expire(now)
+        self._notify(evicted)
+        return len(evicted)
+
+    def _expire(self, now: float) -> List[Tuple[Any, str]]:
+        evicted = []
+        while self._entries:
+            _, last_access, _ = next(iter(self._entries.values()))
+            if now - last_access < self.idle_ttl:
+                break
+            evicted.append(self._pop_oldest(EVICT_EXPIRED))
+        return evicted
+
+    def _pop_oldest(self, reason: str) -> Tuple[Any, str]:
+        _, (session, _, size) = self._entries.popitem(last=False)
+        self._bytes -= size
+        self.evictions[reason] += 1
+        return session, reason
+
+    def _notify(self, evicted: List[Tuple[Any, str]]) -> None:
+        if self.on_evict is None:
+            return
+        for session, reason in evicted:
+            try:
+                self.on_evict(session, reason)
+            except Exception as e:
+                logger.error(f"Eviction hook failed ({reason}): {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": dict(self.evictions)
+            }
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._entries
+
+    def __getitem__(self, session_id: str) -> Any:
+        with self._lock:
+            return self._entries[session_id][0]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._entries))
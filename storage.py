@@ -0,0 +1,233 @@
+import logging
+import sqlite3
+from abc import ABC, abstractmethod
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 1.0    # seconds between write-behind flushes
+
+
+class SessionBackend(ABC):
+    """
+    Storage interface for serialized sessions. Records are opaque strings
+    (see session_manager.encode_session); backends only store them by id.
+    """
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[str]:
+        """The record stored for session_id, or None."""
+
+    @abstractmethod
+    def save_many(self, records: Iterable[Tuple[str, str]]) -> None:
+        """Stores (session_id, record) pairs, replacing existing ones."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Removes a session's record, if any."""
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryBackend(SessionBackend):
+    """Dict-backed backend; survives cache eviction but not a restart."""
+    def __init__(self):
+        self._records: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            return self._records.get(session_id)
+
+    def save_many(self, records: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            self._records.update(records)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+
+class SQLiteBackend(SessionBackend):
+    """
+    SQLite backend in WAL mode: the flusher thread writes batches through one
+    connection while request threads read through their own connections
+    without blocking on it.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
+        self._write_conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: a commit is durable across process crashes, and
+        # only the last transactions can be lost on power failure.
+        self._write_conn.execute("PRAGMA synchronous=NORMAL")
+        self._write_conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._write_conn.commit()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> Optional[str]:
+        row = self._reader().execute(
+            "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_many(self, records: Iterable[Tuple[str, str]]) -> None:
+        now = time.time()
+        with self._write_lock, self._write_conn:
+            self._write_conn.executemany(
+                "INSERT INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                [(session_id, data, now) for session_id, data in records]
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._write_lock, self._write_conn:
+            self._write_conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def prune(self, older_than: float) -> int:
+        """Deletes sessions not updated since `older_than` (epoch seconds)."""
+        with self._write_lock, self._write_conn:
+            cursor = self._write_conn.execute("DELETE FROM sessions WHERE updated_at < ?", (older_than,))
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._write_conn.close()
+
+
+class WriteBehindSessionStore(SessionStore):
+    """
+    SessionStore that keeps hot sessions in memory and persists them to a
+    SessionBackend in the background.
+
+    put() serializes the session (CPU only) and marks it dirty; a flusher
+    thread writes all dirty sessions in one batched transaction every
+    `flush_interval` seconds. The request path never waits on disk, except
+    for a cache miss that has to load a session back.
+
+    A session evicted from memory is not lost: its latest record stays in
+    the dirty/in-flight maps until written, and get() falls back to them and
+    then to the backend.
+    """
+    persistent = True
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        serialize: Optional[Callable[[Any], str]] = None,
+        deserialize: Optional[Callable[[str], Any]] = None,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.backend = backend
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.flush_interval = flush_interval
+
+        self._dirty: Dict[str, str] = {}
+        self._inflight: Dict[str, str] = {}
+        self._dirty_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self.loads = 0
+        self.flushes = 0
+        self.records_written = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, session_id: str) -> Optional[Any]:
+        session = super().get(session_id)
+        if session is not None:
+            return session
+
+        with self._dirty_lock:
+            record = self._dirty.get(session_id) or self._inflight.get(session_id)
+        if record is None:
+            record = self.backend.load(session_id)
+        if record is None:
+            return None
+
+        with self._dirty_lock:
+            self.loads += 1
+        session = self.deserialize(record)
+        super().put(session_id, session)
+        return session
+
+    def put(self, session_id: str, session: Any) -> None:
+        super().put(session_id, session)
+        record = self.serialize(session)
+        with self._dirty_lock:
+            self._dirty[session_id] = record
+
+    def flush(self) -> int:
+        """Writes every dirty session in one transaction; returns the count."""
+        with self._flush_lock:
+            with self._dirty_lock:
+                if not self._dirty:
+                    return 0
+                self._inflight, self._dirty = self._dirty, {}
+            batch = self._inflight
+            try:
+                self.backend.save_many(batch.items())
+            except Exception as e:
+                # Put the batch back (newer writes win) and retry next interval
+                logger.error(f"Session flush failed ({len(batch)} sessions): {str(e)}")
+                with self._dirty_lock:
+                    batch.update(self._dirty)
+                    self._dirty = batch
+                    self._inflight = {}
+                return 0
+            with self._dirty_lock:
+                self._inflight = {}
+                self.flushes += 1
+                self.records_written += len(batch)
+            return len(batch)
+
+    def start(self) -> None:
+        """Starts the background flusher thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="session-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the flusher and writes whatever is still dirty."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._dirty_lock:
+            stats["dirty"] = len(self._dirty)
+            stats["loads"] = self.loads
+            stats["flushes"] = self.flushes
+            stats["recordsWritten"] = self.records_written
+        return stats
@@ -0,0 +1,86 @@
+import asyncio
+
+from admission import AdmissionController, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.allow("s") for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5        # one token back
+    assert limiter.allow("s") and not limiter.allow("s")
+    # Other keys have their own bucket
+    assert limiter.allow("other")
+
+
+def test_rate_limiter_is_bounded():
+    limiter = RateLimiter(rate=1, burst=1, max_keys=100)
+    for i in range(1000):
+        limiter.allow(f"session-{i}")
+    assert len(limiter) == 100
+
+
+def test_admission_queues_then_sheds():
+    async def scenario():
+        admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+        assert await admission.acquire()
+
+        # One waiter fits in the queue; a second is shed at once
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert await admission.acquire() is False
+        assert admission.shed["queueFull"] == 1
+
+        # The queued one gets the slot when it is released
+        admission.release()
+        assert await waiter
+        # ...and the next waiter times out while it is held
+        assert await admission.acquire() is False
+        assert admission.shed["timeout"] == 1
+        admission.release()
+
+        stats = admission.stats()
+        assert stats["active"] == 0 and stats["waiting"] == 0
+        assert stats["admitted"] == 2 and stats["shed"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_endpoint_sheds_with_busy_reply():
+    from fastapi.testclient import TestClient
+    import main
+
+    main.use_callback_outbox()
+    client = TestClient(main.app)
+    headers = {"x-api-key": main.EXPECTED_API_KEY}
+    payload = {
+        "sessionId": "flood-1",
+        "message": {"sender": "scammer", "text": "hello", "timestamp": 1},
+        "metadata": {"channel": "SMS", "language": "en", "locale": "IN"}
+    }
+    before = main.admission.stats()["shedReasons"]["rateLimited"]
+    responses = [client.post("/api/honeypot", json=payload, headers=headers) for _ in range(30)]
+
+    assert all(r.status_code == 200 for r in responses)
+    busy = [r for r in responses if r.headers.get("retry-after")]
+    assert busy, "session burst should have been rate-limited"
+    assert set(busy[0].json()) == {"status", "reply"}
+
+    health = client.get("/health").json()
+    assert health["admission"]["shedReasons"]["rateLimited"] - before == len(busy)
+
+
+if __name__ == "__main__":
+    test_token_bucket_refills()
+    test_rate_limiter_is_bounded()
+    test_admission_queues_then_sheds()
+    test_endpoint_sheds_with_busy_reply()
+    print("Admission control tests passed.")
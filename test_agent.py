@@ -1,4 +1,7 @@
-from agent import HoneypotAgent
+import threading
+import time
+
+from agent import PHASES, HoneypotAgent, ReplyEngine, phase_for
 
 def test_honeypot_agent():
     agent = HoneypotAgent()
@@ -38,5 +41,84 @@ def test_honeypot_agent():
         print(f"Agent  : {reply}")
         print("-" * 50)
 
+
+def test_templates_do_not_repeat_within_a_session():
+    agent = HoneypotAgent()
+    for session_id in ("s1", "s2", "s3"):
+        replies = {}
+        for turn in range(1, 16):
+            phase, _ = phase_for(turn)
+            replies.setdefault(phase, []).append(agent.generate_reply(turn, "hello", session_id))
+        assert [name for name, _ in PHASES] == list(replies)
+        for phase, said in replies.items():
+            assert len(set(said)) == len(said), (session_id, phase, said)
+    # Same session, same turn: same template
+    assert agent.generate_reply(5, "hi", "s1") == agent.generate_reply(5, "hi", "s1")
+    print("[Test] Per-session template permutation OK.")
+
+
+class StandInEngine(ReplyEngine):
+    """A slow local generator: the first call per (phase, cue, variant) takes `delay`."""
+    name = "stand-in"
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate(self, phase, cue, last_message, variant):
+        self.calls += 1
+        if self.delay:
+            self.release.wait(self.delay)
+        if phase == "exit":
+            raise RuntimeError("model crashed")
+        return f"[{phase}/{cue}/{variant}] Sorry, what do you need?"
+
+
+def test_engine_runs_under_deadline_with_fallback():
+    fast = HoneypotAgent(engine=StandInEngine(0), budget=1.0)
+    reply = fast.generate_reply(1, "Share the OTP", "a")
+    assert reply.startswith("[concern/otp/")
+    assert fast.generate_reply(1, "Share the OTP", "a") == reply  # cached by (phase, cue)
+    assert fast.engine.calls == 1
+    assert fast.generate_reply(13, "bye", "a") in fast.exit_templates  # engine error
+    assert fast.stats()["engineErrors"] == 1
+
+    engine = StandInEngine(5.0)
+    slow = HoneypotAgent(engine=engine, budget=0.01)
+    started = time.perf_counter()
+    reply = slow.generate_reply(4, "Click the link", "b")
+    assert time.perf_counter() - started < 1.0
+    assert reply.endswith(tuple(slow.hesitation_templates))
+    # The missed generation still finishes and fills the cache
+    engine.release.set()
+    for _ in range(100):
+        if slow.generate_reply(4, "Click the link", "b").startswith("[hesitation/link/"):
+            break
+        time.sleep(0.01)
+    stats = slow.stats()
+    assert stats["deadlineMisses"] >= 1 and stats["fallbacks"] >= 1
+    assert stats["cacheHits"] + stats["engineReplies"] == 1 and engine.calls == 1
+    assert 0 < stats["deadlineHitRate"] < 1
+    print(f"[Test] Reply engine deadline/fallback OK: {stats}")
+
+
+def test_stats_count_every_reply_across_threads():
+    agent = HoneypotAgent()
+    threads = [
+        threading.Thread(target=lambda: [agent.generate_reply(turn % 12 + 1, "hello") for turn in range(2000)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = agent.stats()
+    assert stats["requests"] == stats["fallbacks"] == 16000
+
+
 if __name__ == "__main__":
     test_honeypot_agent()
+    test_templates_do_not_repeat_within_a_session()
+    test_engine_runs_under_deadline_with_fallback()
+    test_stats_count_every_reply_across_threads()
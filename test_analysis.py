@@ -0,0 +1,29 @@
+from scam_detector import ScamDetector
+from intelligence import extract_intelligence
+from analysis import analyze_message
+
+
+def test_fused_stage_matches_separate_calls():
+    detector = ScamDetector()
+    texts = [
+        "Your account is BLOCKED! Verify immediately.",
+        "Send OTP now. Pay to scam@ybl or call +91 9876543210",
+        "Hello, how are you?",
+    ]
+    for text in texts:
+        result = analyze_message(text, detector)
+        assert result.assessment == detector.analyze(text)
+        assert result.intelligence == extract_intelligence(text)
+
+
+def test_detection_can_be_skipped():
+    result = analyze_message("Pay to scam@ybl", ScamDetector(), detect=False)
+    assert result.assessment is None
+    assert not result.scam_detected
+    assert result.intelligence["upiIds"] == ["scam@ybl"]
+
+
+if __name__ == "__main__":
+    test_fused_stage_matches_separate_calls()
+    test_detection_can_be_skipped()
+    print("Analysis tests passed.")
@@ -1,7 +1,10 @@
 from fastapi.testclient import TestClient
-from main import app, session_manager, EXPECTED_API_KEY
+from starlette.websockets import WebSocketDisconnect
+from main import app, session_manager, stream_connections, use_callback_outbox, EXPECTED_API_KEY
 from unittest.mock import patch
 
+# Test sessions' callbacks stay out of ./callback_outbox.db
+use_callback_outbox()
 client = TestClient(app)
 
 def test_strict_response_structure():
@@ -38,7 +41,150 @@ def test_invalid_key_message():
     assert response.status_code == 401
     assert response.json()["detail"] == "Invalid API key"
 
+def test_never_422_on_malformed_bodies():
+    """Empty, non-JSON and non-conforming bodies still get a 200 JSON reply."""
+    headers = {"x-api-key": EXPECTED_API_KEY}
+    for body in [b"", b"not json", b"{}", b'{"foo": 1}', b"[1, 2]"]:
+        response = client.post("/api/honeypot", content=body, headers=headers)
+        assert response.status_code == 200
+        assert set(response.json()) == {"status", "reply"}
+
+def test_pipeline_runs_and_extracts_intelligence():
+    """Valid requests go through SessionManager; metadata may be missing."""
+    headers = {"x-api-key": EXPECTED_API_KEY}
+    payload = {
+        "sessionId": "pipeline_test_1",
+        "message": {"sender": "scammer", "text": "Your account is BLOCKED! Verify immediately and pay to fraud@ybl", "timestamp": 123}
+    }
+    response = client.post("/api/honeypot", json=payload, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["reply"]
+
+    session = session_manager.get_session("pipeline_test_1")
+    assert session.scamDetected
+    assert session.extractedIntelligence["upiIds"] == ["fraud@ybl"]
+
+def test_lenient_decode_keeps_watermark_and_history():
+    """A message without a timestamp neither rewinds the history watermark nor drops valid history."""
+    headers = {"x-api-key": EXPECTED_API_KEY}
+    metadata = {"channel": "SMS", "language": "en", "locale": "IN"}
+    first = {"sender": "scammer", "text": "Pay the fee to first@ybl", "timestamp": 1000}
+    client.post("/api/honeypot", json={"sessionId": "lenient_test", "message": first, "metadata": metadata}, headers=headers)
+    # No timestamp: decoded leniently; the valid history entry is kept, the broken one dropped
+    second = {"sender": "scammer", "text": "Or pay to second@ybl"}
+    client.post("/api/honeypot", json={
+        "sessionId": "lenient_test", "message": second,
+        "conversationHistory": [first, {"sender": "scammer"}]
+    }, headers=headers)
+    third = {"sender": "scammer", "text": "Hurry up", "timestamp": 3000}
+    client.post("/api/honeypot", json={
+        "sessionId": "lenient_test", "message": third,
+        "conversationHistory": [first, {**second, "timestamp": 2000}], "metadata": metadata
+    }, headers=headers)
+
+    session = session_manager.get_session("lenient_test")
+    assert session.totalTurns == 3
+    assert session.extractedIntelligence["upiIds"] == ["first@ybl", "second@ybl"]
+
+def test_lenient_decode_respects_the_model_types():
+    """Leniently decoded payloads still validate as InputFormat; valid metadata is kept."""
+    import json
+    from codec import decode_input
+    from models import InputFormat
+    metadata = {"channel": "SMS", "language": "hi", "locale": "IN"}
+    cases = [
+        ({"text": "hello", "timestamp": "soon"}, None, None, None),
+        ({"text": "hello"}, metadata, None, "hi"),
+        ({"text": "hello", "timestamp": 5}, {"channel": "SMS"}, 5, None),
+    ]
+    for message, meta, timestamp, language in cases:
+        body = {"sessionId": "types", "message": message, "conversationHistory": "none"}
+        if meta is not None:
+            body["metadata"] = meta
+        payload, reason = decode_input(json.dumps(body).encode())
+        assert reason is None
+        assert InputFormat.model_validate(payload.model_dump()) == payload
+        assert payload.message.timestamp == timestamp
+        assert (payload.metadata.language if payload.metadata else None) == language
+
+def test_rules_reload_reports_a_broken_pack_without_422():
+    """A bad rule pack is a 500 with the error and the reloader's stats; rules stay as they were."""
+    import os
+    import tempfile
+    import main
+    from rules import RulePackReloader
+    from scam_detector import ScamDetector
+
+    path = os.path.join(tempfile.mkdtemp(), "rules.json")
+    with open(path, "w") as f:
+        f.write('{"categories": {"scam": {"keywords": ["x"]}}}')
+    detector = ScamDetector()
+    with patch.object(main, "rules_reloader", RulePackReloader(detector, path)):
+        response = client.post("/api/rules/reload", headers={"x-api-key": EXPECTED_API_KEY})
+    assert response.status_code == 500
+    body = response.json()
+    assert body["detail"].startswith("Rule pack reload failed") and body["failures"] == 1
+    assert body["rulesVersion"] == detector.rules_version
+
+def test_intel_lookup_and_top():
+    """Indicators from /api/honeypot turns are queryable across sessions."""
+    headers = {"x-api-key": EXPECTED_API_KEY}
+    for session_id in ("intel_test_1", "intel_test_2"):
+        payload = {
+            "sessionId": session_id,
+            "message": {"sender": "scammer", "text": "Account BLOCKED. Call +91 9123456789 to verify", "timestamp": 123}
+        }
+        client.post("/api/honeypot", json=payload, headers=headers)
+
+    response = client.get("/api/intel/9123456789", params={"limit": 1}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["sessionCount"] == 2 and [s["sessionId"] for s in body["sessions"]] == ["intel_test_1"]
+
+    top = client.get("/api/intel/top", headers=headers).json()["indicators"]
+    assert "9123456789" in [t["indicator"] for t in top]
+    assert client.get("/api/intel/nobody@ybl", headers=headers).status_code == 404
+    assert client.get("/api/intel/top").status_code == 401
+
+def test_websocket_stream():
+    """One authenticated connection carries a whole conversation."""
+    url = "/ws/honeypot?sessionId=stream_test_1&language=en"
+    with client.websocket_connect(url, headers={"x-api-key": EXPECTED_API_KEY}) as ws:
+        ws.send_text("Hello, is this Ravi?")
+        assert ws.receive_json() == {"status": "success", "reply": None}
+        ws.send_text('{"text": "Your account is BLOCKED! Share OTP immediately", "timestamp": 1}')
+        assert ws.receive_json()["reply"]
+        ws.send_json({"text": "Pay to fraud.stream@ybl"})
+        assert ws.receive_json()["reply"]
+        ws.send_text('{"text": 5}')
+        assert ws.receive_json()["reply"] == "Invalid message frame"
+    session = session_manager.get_session("stream_test_1")
+    assert session.totalTurns == 3 and session.extractedIntelligence["upiIds"] == ["fraud.stream@ybl"]
+    assert stream_connections.open == 0
+
+    # The key is checked once, in the handshake
+    try:
+        with client.websocket_connect("/ws/honeypot?sessionId=stream_test_2&apiKey=bad-key"):
+            raise AssertionError("connected with a bad key")
+    except WebSocketDisconnect as e:
+        assert e.code == 1008
+
+    # Per-worker connection cap, idle timeout
+    with patch.object(stream_connections, "max_connections", 0):
+        with client.websocket_connect(url, headers={"x-api-key": EXPECTED_API_KEY}) as ws:
+            assert ws.receive()["code"] == 1013
+    with patch("main.STREAM_IDLE_TIMEOUT", 0.05):
+        with client.websocket_connect(f"{url}&apiKey={EXPECTED_API_KEY}") as ws:
+            message = ws.receive()
+            assert message["type"] == "websocket.close" and message["reason"] == "Idle timeout"
+    stats = client.get("/health").json()["streams"]
+    assert stats["rejected"] >= 1 and stats["idleClosed"] >= 1 and stats["open"] == 0
+
 if __name__ == "__main__":
     test_strict_response_structure()
     test_invalid_key_message()
+    test_never_422_on_malformed_bodies()
+    test_pipeline_runs_and_extracts_intelligence()
+    test_intel_lookup_and_top()
+    test_websocket_stream()
     print("\nStrict Deployment Tests Passed.")
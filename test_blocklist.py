@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+from blocklist import Blocklist, BloomFilter, build_filter, main, read_list
+from scam_detector import ScamDetector
+from session_manager import SessionManager
+
+
+def make_lists(directory):
+    txt = os.path.join(directory, "reported.txt")
+    with open(txt, "w") as f:
+        f.write("# reported UPI IDs and domains\nMule.Account@YBL\n\nscam-bank.example\n")
+    csv_path = os.path.join(directory, "numbers.csv")
+    with open(csv_path, "w") as f:
+        f.write("reported_at,phone\n2026-01-01,+91 98111 22233\n2026-01-02,\n")
+    return txt, csv_path
+
+
+def test_build_and_check_from_cli():
+    with tempfile.TemporaryDirectory() as directory:
+        txt, csv_path = make_lists(directory)
+        assert list(read_list(csv_path, "phone")) == ["9811122233"]
+        out = os.path.join(directory, "blocklist.bloom")
+        assert main(["build", out, txt]) == 0
+        assert main(["build", out, txt]) == 0  # rebuilding replaces the file
+        bloom = BloomFilter(out)
+        assert bloom.count == 2
+        assert "mule.account@ybl" in bloom and "scam-bank.example" in bloom
+        # 0.1% target false-positive rate: none expected in a small sample
+        assert not any(f"user{i}@ybl" in bloom for i in range(200))
+        assert main(["check", out, "nobody@ybl"]) == 1
+
+
+def test_blocklist_raises_risk_and_reloads():
+    with tempfile.TemporaryDirectory() as directory:
+        txt, csv_path = make_lists(directory)
+        path = os.path.join(directory, "blocklist.bloom")
+        blocklist = Blocklist(path)
+        assert not blocklist.stats()["loaded"]
+
+        build_filter(path, read_list(txt), 2)
+        blocklist.reload()
+        # Host and parent domains of a link are checked too
+        assert blocklist.matches({"phishingLinks": ["http://login.Scam-Bank.example/x"], "phoneNumbers": ["9811122233"]}) \
+            == ["http://login.Scam-Bank.example/x"]
+
+        # A rebuilt file is picked up at the next periodic check
+        build_filter(path, list(read_list(txt)) + list(read_list(csv_path, "phone")), 3)
+        blocklist._next_check = 0
+        assert blocklist.matches({"phoneNumbers": ["+91-9811122233"]}) == ["+91-9811122233"]
+        assert blocklist.stats()["reloads"] == 2
+
+        detector = ScamDetector(blocklist=blocklist)
+        quiet = detector.assess("hello, please send the money to mule.account@ybl")
+        assert not quiet["scamDetected"]
+        raised = detector.check_blocklist(quiet, {"upiIds": ["mule.account@ybl"]})
+        assert raised["scamDetected"] and raised["riskScore"] == 0.9
+        assert raised["scamReasons"][-1] == "Known scam indicator on blocklist: mule.account@ybl"
+        assert quiet["scamReasons"] == []
+
+        manager = SessionManager(blocklist=blocklist)
+        result = manager.process_message("blocked-upi", "hello, please send the money to mule.account@ybl")
+        assert manager.get_session("blocked-upi").scamDetected and result["reply"]
+
+
+if __name__ == "__main__":
+    test_build_and_check_from_cli()
+    test_blocklist_raises_risk_and_reloads()
+    print("Blocklist tests passed.")
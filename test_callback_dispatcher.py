@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from callback_dispatcher import CallbackDispatcher
+
+
+class StandInServer:
+    """Local stand-in for the evaluation endpoint; replies with scripted statuses."""
+    def __init__(self, statuses=None):
+        self.statuses = list(statuses or [])
+        self.received = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                server.received.append(json.loads(body))
+                status = server.statuses.pop(0) if server.statuses else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/callback"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def session(i=1):
+    return {
+        "sessionId": f"dispatch-{i}",
+        "scamDetected": True,
+        "totalTurns": 10,
+        "riskScore": 0.8,
+        "scamReasons": ["Urgency language detected: now"],
+        "extractedIntelligence": {"upiIds": ["scam@ybl"]}
+    }
+
+
+def run(server, submit_count, **kwargs):
+    async def scenario():
+        dispatcher = CallbackDispatcher(url=server.url, backoff_base=0.01, **kwargs)
+        await dispatcher.start()
+        # Submit from another thread, like the FastAPI threadpool would
+        threads = [threading.Thread(target=dispatcher.submit, args=(session(i),)) for i in range(submit_count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        await dispatcher.stop()
+        return dispatcher
+
+    try:
+        return asyncio.run(scenario())
+    finally:
+        server.close()
+
+
+def test_delivers_and_drains_on_shutdown():
+    server = StandInServer()
+    dispatcher = run(server, 20)
+    assert len(server.received) == 20
+    metrics = dispatcher.metrics()
+    assert metrics["delivered"] == 20
+    assert metrics["queueDepth"] == 0
+    assert metrics["deliveryLatencyMs"]["p99"] is not None
+    assert server.received[0]["extractedIntelligence"]["upiIds"] == ["scam@ybl"]
+
+
+def test_retries_with_backoff_then_succeeds():
+    server = StandInServer(statuses=[503, 503, 200])
+    dispatcher = run(server, 1)
+    assert dispatcher.counters["retries"] == 2
+    assert dispatcher.counters["delivered"] == 1
+    assert not dispatcher.dead_letters
+
+
+def test_permanent_failures_are_dead_lettered():
+    server = StandInServer(statuses=[400, 500, 500])
+    dispatcher = run(server, 2, workers=1, max_attempts=2)
+    assert dispatcher.counters["delivered"] == 0
+    assert [d["attempts"] for d in dispatcher.dead_letters] == [1, 2]
+
+
+def test_submit_skips_ineligible_and_requires_running():
+    dispatcher = CallbackDispatcher(url="http://127.0.0.1:9/unused")
+    assert dispatcher.submit({**session(), "totalTurns": 3}) is False
+    assert dispatcher.submit(session()) is False
+    assert dispatcher.dead_letters[0]["error"] == "dispatcher not running"
+
+
+if __name__ == "__main__":
+    test_delivers_and_drains_on_shutdown()
+    test_retries_with_backoff_then_succeeds()
+    test_permanent_failures_are_dead_lettered()
+    test_submit_skips_ineligible_and_requires_running()
+    print("Callback dispatcher tests passed.")
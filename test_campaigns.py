@@ -0,0 +1,98 @@
+import os
+
+from campaigns import DEFAULT_THRESHOLD, CampaignIndex, jaccard, shingles, signature, similarity
+from session_manager import SessionManager
+
+TEMPLATE = ("Dear {name}, your {bank} account ending {n} will be blocked today. "
+            "Update KYC immediately at http://kyc-{n}.example.in or call {phone}")
+LOTTERY = "Congratulations! You have won Rs {n} lakh in the lucky draw. Pay the processing fee to claim your prize"
+
+
+def copy(i, template=TEMPLATE):
+    names = ["Rahul", "Priya", "Amit"]
+    banks = ["SBI", "HDFC", "ICICI"]
+    return template.format(name=names[i % 3], bank=banks[i % 3], n=1000 + i, phone=9800000000 + i)
+
+
+def test_near_duplicates_share_a_campaign():
+    assert jaccard(frozenset(shingles(copy(1))), frozenset(shingles(copy(2)))) >= DEFAULT_THRESHOLD
+    # The signature estimates it; unrelated messages share nothing
+    assert similarity(signature(shingles(copy(1))), signature(shingles(copy(1, LOTTERY)))) < 0.2
+
+    index = CampaignIndex()
+    kyc = {index.assign(copy(i)).campaignId for i in range(50)}
+    lottery = {index.assign(copy(i, LOTTERY)).campaignId for i in range(50)}
+    assert len(kyc) == 1 and len(lottery) == 1 and kyc != lottery
+
+    top = index.top(2)
+    assert [c["size"] for c in top] == [50, 50]
+    assert top[0]["representative"].startswith("Dear Rahul")
+
+
+def test_unmatched_benign_messages_are_not_indexed():
+    index = CampaignIndex()
+    assert index.assign("hi, are we still meeting for lunch?", is_scam=False) is None
+    assert len(index) == 0
+
+
+def test_index_is_bounded():
+    import random
+    rng = random.Random(3)
+    index = CampaignIndex(max_clusters=10)
+    for i in range(100):
+        index.assign(" ".join("".join(rng.choice("abcdefghij") for _ in range(6)) for _ in range(10)))
+    stats = index.stats()
+    assert stats["campaigns"] == 10 and stats["evicted"] == 90
+    assert stats["buckets"] <= 10 * index.bins // index.rows
+
+
+def test_new_session_flagged_by_known_campaign():
+    manager = SessionManager(campaign_index=CampaignIndex(min_scam_reports=2))
+    # Two sessions confirmed by the detector seed the campaign
+    for i in (1, 4):
+        manager.process_message(f"seed-{i}", copy(i))
+    # A reworded copy scores below the detector's threshold on its own...
+    quiet = copy(7).replace("blocked", "held").replace("immediately", "soon")
+    assert not manager.scam_detector.analyze(quiet)["scamDetected"]
+
+    # ...but matches the campaign, so the new session is flagged at once
+    result = manager.process_message("fresh", quiet)
+    session = manager.get_session("fresh")
+    assert session.scamDetected and result["reply"]
+    assert session.campaignId == manager.get_session("seed-1").campaignId
+    assert any("known scam campaign" in reason for reason in session.scamReasons)
+
+
+def test_small_talk_in_scam_sessions_does_not_seed_campaigns():
+    manager = SessionManager(campaign_index=CampaignIndex(min_scam_reports=2))
+    for i in (1, 4):
+        manager.process_message(f"scam-{i}", copy(i))
+        manager.process_message(f"scam-{i}", "Hello, how are you doing today?")
+    assert manager.get_session("scam-1").scamDetected
+
+    manager.process_message("friend", "Hello, how are you doing today?")
+    session = manager.get_session("friend")
+    assert not session.scamDetected
+    assert not any("known scam campaign" in reason for reason in session.scamReasons)
+
+
+def test_shingles_are_stable_across_processes():
+    import subprocess
+    import sys
+    code = "from campaigns import shingles; print(shingles('Update KYC at http://x.in now'))"
+    runs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                       env={**os.environ, "PYTHONHASHSEED": seed}).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert len(runs) == 1 and str(shingles("Update KYC at http://x.in now")) in runs
+
+
+if __name__ == "__main__":
+    test_near_duplicates_share_a_campaign()
+    test_unmatched_benign_messages_are_not_indexed()
+    test_index_is_bounded()
+    test_new_session_flagged_by_known_campaign()
+    test_small_talk_in_scam_sessions_does_not_seed_campaigns()
+    test_shingles_are_stable_across_processes()
+    print("Campaign clustering tests passed.")
@@ -0,0 +1,68 @@
+import random
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from session_manager import SessionManager
+from session_store import SessionStore
+
+SESSIONS = 200
+TURNS = 12
+THREADS = 32
+
+
+def test_many_threads_many_sessions():
+    """
+    Hammers the manager with every turn of every session submitted in random
+    order from a thread pool. Each session must end up with exactly TURNS
+    turns and exactly one callback trigger.
+    """
+    manager = SessionManager(lock_stripes=16)
+    tasks = [f"stress-{i}" for i in range(SESSIONS) for _ in range(TURNS)]
+    random.Random(42).shuffle(tasks)
+
+    triggers = Counter()
+    triggers_lock = threading.Lock()
+
+    def run(session_id):
+        result = manager.process_message(session_id, "URGENT: your account is blocked, share OTP now")
+        if result["callbackTrigger"]:
+            with triggers_lock:
+                triggers[session_id] += 1
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(run, tasks))
+
+    assert len(manager.sessions) == SESSIONS
+    for i in range(SESSIONS):
+        session = manager.sessions[f"stress-{i}"]
+        assert session.totalTurns == TURNS
+        assert triggers[session.sessionId] == 1
+        assert session.callbackSent
+
+
+def test_every_eviction_is_flushed_once():
+    flushed = Counter()
+    flushed_lock = threading.Lock()
+
+    def flush(session, reason):
+        with flushed_lock:
+            flushed[session.sessionId] += 1
+
+    manager = SessionManager(store=SessionStore(max_sessions=20, on_evict=flush))
+
+    def run(i):
+        manager.process_message(f"evict-{i % 100}", "URGENT: verify your blocked account now")
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(run, range(2000)))
+
+    stats = manager.sessions.stats()
+    assert stats["sessions"] <= 20
+    assert sum(flushed.values()) == stats["evictions"]["capacity"]
+
+
+if __name__ == "__main__":
+    test_many_threads_many_sessions()
+    test_every_eviction_is_flushed_once()
+    print("Concurrency stress tests passed.")
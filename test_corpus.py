@@ -0,0 +1,46 @@
+import io
+from contextlib import redirect_stdout
+
+from bench_suite import compare
+from corpus import CorpusGenerator, parse_languages
+from scam_detector import ScamDetector
+
+
+def test_corpus_is_seeded_and_configurable():
+    first = [c.messages for c in CorpusGenerator(seed=5).conversations(50)]
+    assert first == [c.messages for c in CorpusGenerator(seed=5).conversations(50)]
+    assert first != [c.messages for c in CorpusGenerator(seed=6).conversations(50)]
+
+    conversations = list(CorpusGenerator(seed=1, languages=parse_languages("hi=1"), scam_share=1.0,
+                                         indicator_density=1.0, turns=(4, 4)).conversations(20))
+    assert all(c.language == "hi" and c.isScam and len(c.messages) == 4 for c in conversations)
+    # Every scam message carries an indicator at density 1.0
+    assert all(any(ch.isdigit() or "@" in ch for ch in text) for c in conversations for text in c.messages)
+
+    short = CorpusGenerator(seed=2, message_words=(0, 0)).conversation().messages
+    long = CorpusGenerator(seed=2, message_words=(30, 30)).conversation().messages
+    assert sum(map(len, long)) > sum(map(len, short))
+
+    # Labels line up with what the detector sees (it misses some scams, never flags chat)
+    detector = ScamDetector()
+    conversations = list(CorpusGenerator(seed=3).conversations(200))
+    flagged = {c.sessionId for c in conversations if any(detector.analyze(text)["scamDetected"] for text in c.messages)}
+    scams = [c for c in conversations if c.isScam]
+    assert sum(c.sessionId in flagged for c in scams) > len(scams) / 2
+    assert not any(c.sessionId in flagged for c in conversations if not c.isScam)
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"f": {"opsPerSec": 1000, "p50Us": 10.0, "p99Us": 50.0}, "sessionMemory": {"bytesPerSession": 1000}}}
+    same = {"results": {"f": {"opsPerSec": 950, "p50Us": 10.5, "p99Us": 52.0}, "sessionMemory": {"bytesPerSession": 1050}}}
+    slower = {"results": {"f": {"opsPerSec": 700, "p50Us": 14.0, "p99Us": 50.0}, "sessionMemory": {"bytesPerSession": 1500}}}
+    with redirect_stdout(io.StringIO()):
+        assert compare(baseline, same, 0.15) == []
+        regressions = compare(baseline, slower, 0.15)
+    assert [line.split(":")[0] for line in regressions] == ["f opsPerSec", "f p50Us", "sessionMemory bytesPerSession"]
+
+
+if __name__ == "__main__":
+    test_corpus_is_seeded_and_configurable()
+    test_compare_flags_regressions()
+    print("Corpus and benchmark suite tests passed.")
@@ -0,0 +1,80 @@
+import random
+
+from analysis import analyze_message
+from detection_cache import DetectionCache
+from rules import compile_rules, merge_pack
+from scam_detector import ScamDetector
+
+
+def entities(detector, text):
+    intel = analyze_message(text, detector, detect=False).intelligence
+    return intel["phishingLinks"] + intel["upiIds"]
+
+
+def test_campaign_copies_share_an_entry():
+    detector = ScamDetector()
+    cache = DetectionCache(detector)
+    for i, name in enumerate(["rahul", "priya", "amit"] * 3):
+        text = (f"Dear customer, your account {40000 + i} is blocked. Verify immediately "
+                f"at http://kyc-{i}.example.in/r/{i} or pay to {name}{i}@ybl. " * 3)
+        assert cache.assess(text.lower(), entities(detector, text)) == detector.assess(text.lower())
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 8
+
+
+def test_matches_detector_exactly():
+    """Keywords inside, straddling or next to masked links/handles/digits."""
+    texts = [
+        "share otp@ybl now",
+        "please verify@ybl immediately",
+        "http://verify-account.example/blocked and pay",
+        "otphttp://x.in/a legal action",
+        "call 9876543210now urgent",
+        "cvv123 send password",
+        "account http://a.in/ immediately.",
+        "-blocked@ybl. last chance",
+    ]
+    for boundary in ("none", "start", "both"):
+        detector = ScamDetector(boundary=boundary)
+        cache = DetectionCache(detector)
+        for text in texts:
+            padded = text + " " + "filler words here " * 10
+            for candidate in (text, padded):
+                expected = detector.assess(candidate.lower())
+                assert cache.assess(candidate.lower(), entities(detector, candidate)) == expected, (boundary, candidate)
+
+
+def test_randomized_equivalence():
+    rng = random.Random(7)
+    words = ["otp", "share", "verify", "now", "blocked", "x@ybl", "http://a.in/verify",
+             "9876543210", "legal", "action", "know", "cvv", "a1b2", ".", "-", "pay"]
+    detector = ScamDetector()
+    cache = DetectionCache(detector, max_entries=50)
+    for _ in range(2000):
+        text = rng.choice(["", " "]).join(rng.choice(words) for _ in range(rng.randint(1, 40)))
+        assert cache.assess(text, entities(detector, text)) == detector.assess(text), text
+
+
+def test_lru_bound_and_rule_change_invalidates():
+    detector = ScamDetector()
+    cache = DetectionCache(detector, max_entries=2)
+    for word in ("alpha", "beta", "gamma"):
+        cache.assess(f"{word} account blocked")
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+
+    detector.use_rules(compile_rules(merge_pack({
+        "categories": {"scam": {"keywords": ["alpha"], "weight": 0.3, "reason": "Scam keyword"}}
+    })))
+    result = cache.assess("alpha account blocked")
+    assert result == detector.assess("alpha account blocked")
+    stats = cache.stats()
+    assert stats["invalidations"] == 1 and stats["entries"] == 1
+    assert stats["rulesVersion"] == detector.rules_version
+
+
+if __name__ == "__main__":
+    test_campaign_copies_share_an_entry()
+    test_matches_detector_exactly()
+    test_randomized_equivalence()
+    test_lru_bound_and_rule_change_invalidates()
+    print("Detection cache tests passed.")
@@ -0,0 +1,82 @@
+from models import Message
+from session_manager import SessionManager, decode_session, encode_session, message_digest, unseen_history
+from storage import MemoryBackend, WriteBehindSessionStore
+
+SCRIPT = [
+    "Your account is BLOCKED! Verify immediately.",
+    "Pay the fee to scam@ybl",
+    "Or call 9876543210 now",
+    "Last chance: http://scam-bank.com/verify",
+]
+
+
+def converse(manager, session_id, turns):
+    """Plays a conversation the way the API sends it: full history every turn."""
+    history = []
+    for i, text in enumerate(turns):
+        message = Message(sender="scammer", text=text, timestamp=1000 + 10 * i)
+        result = manager.process_message(
+            session_id, text, timestamp=message.timestamp, sender="scammer", history=list(history)
+        )
+        history.append(message)
+        history.append(Message(sender="user", text=result["reply"] or "ok", timestamp=message.timestamp + 5))
+    return history
+
+
+def test_history_prefix_is_not_reingested():
+    manager = SessionManager()
+    converse(manager, "wm-1", SCRIPT)
+    session = manager.get_session("wm-1")
+    # Each scammer message counted once, despite every turn resending history
+    assert session.totalTurns == len(SCRIPT)
+    assert session.messages == SCRIPT
+    assert session.extractedIntelligence["upiIds"] == ["scam@ybl"]
+
+
+def test_session_rebuilt_from_history_after_loss():
+    manager = SessionManager()
+    history = converse(manager, "wm-2", SCRIPT[:3])
+
+    # Restarted process: a fresh manager only sees the next request
+    restarted = SessionManager()
+    restarted.process_message("wm-2", SCRIPT[3], timestamp=2000, history=history)
+    session = restarted.get_session("wm-2")
+    assert session.totalTurns == 4
+    assert session.scamDetected
+    intel = session.extractedIntelligence
+    assert intel["upiIds"] == ["scam@ybl"]
+    assert intel["phoneNumbers"] == ["9876543210"]
+    assert intel["phishingLinks"] == ["http://scam-bank.com/verify"]
+
+
+def test_same_timestamp_messages_use_content_hash():
+    history = [Message(sender="scammer", text=t, timestamp=5) for t in ("a", "b", "c")]
+    assert [m.text for m in unseen_history(history, (5, message_digest("scammer", "a")))] == ["b", "c"]
+    assert [m.text for m in unseen_history(history, (5, message_digest("scammer", "zzz")))] == []
+    assert [m.text for m in unseen_history(history, (4, "x"))] == ["a", "b", "c"]
+    assert len(unseen_history(history, None)) == 3
+
+
+def test_watermark_survives_persistence():
+    manager = SessionManager(store=WriteBehindSessionStore(MemoryBackend(), flush_interval=60))
+    history = converse(manager, "wm-3", SCRIPT[:2])
+    restored = decode_session(encode_session(manager.get_session("wm-3")))
+    assert restored._watermark == manager.get_session("wm-3")._watermark
+    assert list(unseen_history(history, restored._watermark)) == history[-1:]
+
+
+def test_history_without_watermark_is_not_double_counted():
+    manager = SessionManager()
+    manager.process_message("wm-4", SCRIPT[0])
+    history = [Message(sender="scammer", text=SCRIPT[0], timestamp=1000)]
+    manager.process_message("wm-4", SCRIPT[1], timestamp=1010, history=history)
+    assert manager.get_session("wm-4").totalTurns == 2
+
+
+if __name__ == "__main__":
+    test_history_prefix_is_not_reingested()
+    test_session_rebuilt_from_history_after_loss()
+    test_same_timestamp_messages_use_content_hash()
+    test_watermark_survives_persistence()
+    test_history_without_watermark_is_not_double_counted()
+    print("History watermark tests passed.")
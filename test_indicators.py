@@ -0,0 +1,60 @@
+from indicators import IndicatorIndex
+from intelligence import normalize_indicator
+from session_manager import SessionManager
+
+
+def test_normalize_indicator():
+    assert normalize_indicator("+91 9876543210") == "9876543210"
+    assert normalize_indicator("91-9876543210") == "9876543210"
+    # A bare 12-digit run may be a bank account: left alone
+    assert normalize_indicator("919876543210") == "919876543210"
+    assert normalize_indicator(" Fraud@YBL ") == "fraud@ybl"
+    assert normalize_indicator("HTTP://Scam-Bank.COM/Verify/.") == "http://scam-bank.com/Verify"
+
+
+def test_lookup_pages_sessions_in_first_seen_order():
+    clock = iter(range(100, 200))
+    index = IndicatorIndex(clock=lambda: next(clock))
+    for i in range(5):
+        index.record(f"s{i}", "upiIds", ["mule@ybl"])
+    index.record("s0", "upiIds", ["MULE@ybl"])
+
+    page = index.lookup("Mule@YBL", offset=1, limit=2)
+    assert page["sessionCount"] == 5 and page["types"] == ["upiIds"]
+    assert [s["sessionId"] for s in page["sessions"]] == ["s1", "s2"]
+    assert (page["firstSeen"], page["lastSeen"]) == (100, 105)
+    assert index.lookup("s0-never@ybl") is None
+    assert index.lookup("mule@ybl")["sessions"][0] == {"sessionId": "s0", "firstSeen": 100, "lastSeen": 105}
+
+
+def test_top_and_bounded_memory():
+    index = IndicatorIndex(max_indicators=3)
+    index.record("a", "phoneNumbers", ["9876543210", "9000000001"])
+    index.record("b", "bankAccounts", ["9876543210"])
+    index.record("c", "phoneNumbers", ["+91 98765 43210"])
+    index.record("c", "upiIds", ["solo@ybl"])
+
+    top = index.top(5)
+    assert [t["indicator"] for t in top] == ["9876543210"]
+    assert top[0]["sessionCount"] == 3 and set(top[0]["types"]) == {"phoneNumbers", "bankAccounts"}
+    assert len(index.top(5, min_sessions=1)) == 3
+
+    index.record("d", "upiIds", ["x@ybl"])
+    assert index.lookup("9000000001") is None
+    assert index.stats() == {"indicators": 3, "shared": 1, "recorded": 6, "evicted": 1}
+
+
+def test_sessions_feed_the_index():
+    manager = SessionManager(indicator_index=IndicatorIndex())
+    for session_id in ("victim-1", "victim-2"):
+        manager.process_message(session_id, "Your account is BLOCKED! Pay the fine to mule@ybl now")
+    shared = manager.indicator_index.lookup("mule@ybl")
+    assert [s["sessionId"] for s in shared["sessions"]] == ["victim-1", "victim-2"]
+
+
+if __name__ == "__main__":
+    test_normalize_indicator()
+    test_lookup_pages_sessions_in_first_seen_order()
+    test_top_and_bounded_memory()
+    test_sessions_feed_the_index()
+    print("Indicator index tests passed.")
@@ -1,5 +1,6 @@
-from intelligence import extract_intelligence
+from intelligence import extract_intelligence, get_extraction_stats
 import json
+import time
 
 def test_intelligence_extraction():
     test_cases = [
@@ -36,5 +37,34 @@ def test_intelligence_extraction():
         print(json.dumps(result, indent=2))
         print("-" * 50)
 
+def test_entities_split_across_chunks():
+    # Place entities right on a chunk boundary
+    for offset in range(990, 1010):
+        text = "x" * offset + " scam@ybl 9876543210 http://bad.example/pay " + "y" * 3000
+        result = extract_intelligence(text, chunk_size=1000)
+        assert result["upiIds"] == ["scam@ybl"], offset
+        assert result["phoneNumbers"] == ["9876543210"], offset
+        assert result["phishingLinks"] == ["http://bad.example/pay"], offset
+
+
+def test_huge_input_is_bounded():
+    before = get_extraction_stats()
+
+    # Long runs of handle characters used to backtrack quadratically
+    start = time.perf_counter()
+    extract_intelligence("a" * 200000 + "@")
+    extract_intelligence("x" * 2_000_000 + " scam@ybl")
+    assert time.perf_counter() - start < 1.0
+
+    after = get_extraction_stats()
+    assert after["truncated"] == before["truncated"] + 1
+    assert after["chunked"] == before["chunked"] + 2
+
+
+def test_link_stops_at_unsafe_characters():
+    result = extract_intelligence('<a href="http://bad.example/x">click</a>')
+    assert result["phishingLinks"] == ["http://bad.example/x"]
+
+
 if __name__ == "__main__":
     test_intelligence_extraction()
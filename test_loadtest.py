@@ -0,0 +1,45 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+from loadtest import BUCKETS_MS, histogram, main
+
+
+def test_histogram_buckets():
+    counts = histogram([0.0005, 0.0015, 0.003, 0.15, 5.0])
+    assert len(counts) == len(BUCKETS_MS) + 1
+    assert counts[0] == counts[1] == counts[2] == counts[-1] == 1
+    assert counts[BUCKETS_MS.index(200)] == 1
+
+
+def test_load_levels_report():
+    out = os.path.join(tempfile.mkdtemp(), "load.json")
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        assert main(["--levels", "2", "4", "--duration", "1.5", "--think", "0.02", "--out", out]) == 0
+    assert "SLO p99" in buffer.getvalue()
+
+    with open(out, encoding="utf-8") as f:
+        levels = json.load(f)["levels"]
+    assert [level["concurrency"] for level in levels] == [2, 4]
+    for level in levels:
+        assert level["turns"] > 0 and level["errorRate"] == 0.0
+        assert level["p99Ms"] >= level["p50Ms"] > 0
+        # Scripts run 10-16 turns; the turn-1 histogram counts every first turn
+        assert "1" in level["byTurn"] and sum(level["byTurn"]["1"]["histogram"]) > 0
+        assert level["callbacksTriggered"] >= 0
+
+    # Synthetic sessions went to a temporary outbox, never the working directory's
+    from main import callback_dispatcher
+    outbox = callback_dispatcher.outbox
+    assert os.path.dirname(os.path.abspath(outbox.path)) != os.getcwd()
+    # One pending row per triggered session (late updates coalesce into it)
+    assert outbox.stats()["pending"] == sum(level["callbacksTriggered"] for level in levels)
+
+
+if __name__ == "__main__":
+    test_histogram_buckets()
+    test_load_levels_report()
+    print("Load test harness checks passed.")
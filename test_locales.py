@@ -0,0 +1,64 @@
+from analysis import analyze_message
+from detection_cache import DetectionCache
+from matcher import KeywordMatcher
+from normalization import normalize_text, prepare
+from scam_detector import ScamDetector
+from session_manager import SessionManager
+
+HINDI = "आपका खाता ब्लॉक हो गया है। तुरंत ओटीपी बताएं, कॉल करें ९८७६५४३२१०"
+HINGLISH = "Aapka khata block ho gaya hai, turant OTP batao warna band ho jayega"
+
+
+def test_normalization():
+    ascii_text = "Call 9876543210 now"
+    assert normalize_text(ascii_text) is ascii_text
+    assert normalize_text("कॉल ९८७६५४३२१०") == "कॉल 9876543210"
+    assert normalize_text("ｃａｌｌ　９８７６５４３２１０") == "call 9876543210"
+    assert prepare("STRASSE Straße")[1] == "strasse strasse"
+
+
+def test_locale_sets_are_selected_by_metadata():
+    detector = ScamDetector()
+    hindi = analyze_message(HINDI, detector, language="hi", locale="IN")
+    assert hindi.scam_detected and hindi.assessment["rulesVersion"].endswith("+hi+hinglish")
+    assert "Sensitive information request detected: ओटीपी बताएं" in hindi.assessment["scamReasons"]
+    # Devanagari digits reach the ASCII extraction patterns
+    assert hindi.intelligence["phoneNumbers"] == ["9876543210"]
+
+    # Only the relevant sets run: English-only traffic never scans Hindi keywords
+    assert not analyze_message(HINDI, detector, language="en", locale="US").scam_detected
+    assert analyze_message(HINGLISH, detector, language="en", locale="IN").scam_detected
+    assert not analyze_message(HINGLISH, detector).scam_detected
+
+
+def test_indic_word_boundaries():
+    matcher = KeywordMatcher({"scam": ["खाता"]}, boundary="start")
+    assert matcher.scan_keywords("आपका खाता") == {"scam": ["खाता"]}
+    # A vowel sign is part of the word, not a boundary
+    assert matcher.scan_keywords("बहीखाता") == {"scam": []}
+
+
+def test_cache_keeps_locale_variants_apart():
+    detector = ScamDetector()
+    cache = DetectionCache(detector)
+    hindi = detector.rules_for("hi")
+    folded = prepare(HINDI)[1]
+    for rules in (hindi, detector.rules, hindi):
+        assert cache.assess(folded, [], rules) == detector.assess(folded, rules)
+    assert cache.stats()["entries"] == 2 and cache.stats()["hits"] == 1
+
+
+def test_session_uses_request_locale():
+    manager = SessionManager()
+    manager.process_message("hindi-1", HINDI, language="hi", locale="IN")
+    session = manager.get_session("hindi-1")
+    assert session.scamDetected and session.extractedIntelligence["phoneNumbers"] == ["9876543210"]
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_locale_sets_are_selected_by_metadata()
+    test_indic_word_boundaries()
+    test_cache_keeps_locale_variants_apart()
+    test_session_uses_request_locale()
+    print("Locale tests passed.")
@@ -0,0 +1,178 @@
+import asyncio
+import os
+import tempfile
+
+from callback_dispatcher import CallbackDispatcher
+from outbox import CallbackOutbox
+from session_manager import SessionManager
+from test_callback_dispatcher import StandInServer, session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def payload(upis, i=1):
+    return {"sessionId": f"dispatch-{i}", "extractedIntelligence": {"upiIds": upis}}
+
+
+def test_coalescing_and_rate_limited_updates():
+    with tempfile.TemporaryDirectory() as tmp:
+        clock = FakeClock()
+        outbox = CallbackOutbox(os.path.join(tmp, "outbox.db"), update_interval=60, clock=clock)
+
+        outbox.add(payload(["a@ybl"]))
+        outbox.add(payload(["a@ybl", "b@ybl"]))
+        due = outbox.due()
+        assert len(due) == 1
+        session_id, version, latest = due[0]
+        assert version == 2 and latest["extractedIntelligence"]["upiIds"] == ["a@ybl", "b@ybl"]
+        assert outbox.stats()["coalesced"] == 1
+
+        outbox.mark_delivered(session_id, version)
+        assert outbox.get(session_id)["status"] == "delivered"
+
+        # A late update waits out the interval since the last send
+        outbox.add(payload(["a@ybl", "b@ybl", "c@ybl"]))
+        assert outbox.due() == []
+        clock.now += 61
+        assert outbox.due()[0][1] == 3
+        outbox.close()
+
+
+def test_stale_delivery_keeps_newer_version_pending():
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = CallbackOutbox(os.path.join(tmp, "outbox.db"), update_interval=0)
+        outbox.add(payload(["a@ybl"]))
+        outbox.add(payload(["a@ybl", "b@ybl"]))
+        outbox.mark_delivered("dispatch-1", 1)
+        outbox.mark_dead("dispatch-1", 1, "stale")
+        record = outbox.get("dispatch-1")
+        assert record["status"] == "pending" and record["version"] == 2
+        outbox.close()
+
+
+def test_pending_callbacks_replay_after_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "outbox.db")
+        server = StandInServer()
+
+        # "Crash": triggered while nothing was delivering
+        before = CallbackDispatcher(url=server.url, outbox=CallbackOutbox(path))
+        assert before.submit(session(1)) is True
+        assert before.submit(session(2)) is True
+        before.outbox.close()
+
+        async def restart():
+            dispatcher = CallbackDispatcher(url=server.url, outbox=CallbackOutbox(path), poll_interval=0.05)
+            await dispatcher.start()
+            for _ in range(100):
+                if dispatcher.counters["delivered"] == 2:
+                    break
+                await asyncio.sleep(0.02)
+            await dispatcher.stop()
+            return dispatcher
+
+        try:
+            dispatcher = asyncio.run(restart())
+        finally:
+            server.close()
+        assert sorted(p["sessionId"] for p in server.received) == ["dispatch-1", "dispatch-2"]
+        assert dispatcher.outbox.stats()["delivered"] == 2
+        dispatcher.outbox.close()
+
+
+def test_manager_sends_late_intelligence_updates():
+    sent = []
+    manager = SessionManager(callback_sink=lambda data: sent.append(data) or True)
+    manager.process_message("late", "Your account is BLOCKED! Verify immediately.")
+    for _ in range(9):
+        manager.process_message("late", "ok")
+    assert len(sent) == 1 and manager.get_session("late").callbackSent
+
+    manager.process_message("late", "nothing new")
+    manager.process_message("late", "Pay to late@ybl")
+    assert len(sent) == 2
+    assert sent[1]["extractedIntelligence"]["upiIds"] == ["late@ybl"]
+
+
+def test_callback_flag_not_set_when_sink_fails():
+    def failing_sink(data):
+        raise RuntimeError("outbox unavailable")
+
+    manager = SessionManager(callback_sink=failing_sink)
+    manager.process_message("fail", "Your account is BLOCKED! Verify immediately.")
+    for _ in range(8):
+        manager.process_message("fail", "ok")
+    try:
+        manager.process_message("fail", "ok")
+    except RuntimeError:
+        pass
+    assert not manager.get_session("fail").callbackSent
+
+
+def test_callback_flag_not_set_when_sink_refuses():
+    reports = []
+
+    def refusing_sink(data):
+        reports.append(data["sessionId"])
+        return len(reports) > 1
+
+    manager = SessionManager(callback_sink=refusing_sink)
+    manager.process_message("refused", "Your account is BLOCKED! Verify immediately.")
+    for _ in range(9):
+        manager.process_message("refused", "ok")
+    # Turn 10 triggered the report, and the sink returned False
+    assert reports == ["refused"] and not manager.get_session("refused").callbackSent
+
+    # Turn 11 tries again and is accepted
+    manager.process_message("refused", "ok")
+    assert reports == ["refused", "refused"] and manager.get_session("refused").callbackSent
+
+
+def test_submit_counts_every_report_across_threads():
+    import threading
+    with tempfile.TemporaryDirectory() as tmp:
+        dispatcher = CallbackDispatcher(outbox=CallbackOutbox(os.path.join(tmp, "outbox.db")))
+        threads = [
+            threading.Thread(target=lambda t=t: [dispatcher.submit(session(t * 1000 + i)) for i in range(100)])
+            for t in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert dispatcher.metrics()["submitted"] == 800
+        dispatcher.outbox.close()
+
+
+def test_importing_the_app_opens_no_outbox():
+    import subprocess
+    import sys
+    repo = os.path.dirname(os.path.abspath(__file__))
+    code = (
+        "import main; assert main.callback_dispatcher.outbox is None; "
+        "outbox = main.use_callback_outbox(); assert not outbox.path.startswith('.')"
+    )
+    with tempfile.TemporaryDirectory() as cwd:
+        env = {**os.environ, "PYTHONPATH": repo}
+        env.pop("CALLBACK_OUTBOX_PATH", None)
+        result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+        assert os.listdir(cwd) == []
+
+
+if __name__ == "__main__":
+    test_coalescing_and_rate_limited_updates()
+    test_stale_delivery_keeps_newer_version_pending()
+    test_pending_callbacks_replay_after_restart()
+    test_manager_sends_late_intelligence_updates()
+    test_callback_flag_not_set_when_sink_fails()
+    test_callback_flag_not_set_when_sink_refuses()
+    test_submit_counts_every_report_across_threads()
+    test_importing_the_app_opens_no_outbox()
+    print("Callback outbox tests passed.")
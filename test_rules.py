@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from analysis import analyze_message
+from rules import DEFAULT_RULES, RulePackError, RulePackReloader, compile_rules, load_rule_pack
+from scam_detector import ScamDetector
+
+YAML_PACK = """
+version: "2026-10.1"
+threshold: 0.4
+categories:
+  lottery:
+    keywords: [lottery, prize, "processing fee"]
+    weight: 0.2
+    reason: Lottery bait detected
+patterns: {}
+intelligence:
+  upiIds:
+    pattern: '[\\w.-]+@(?:ybl|paytm)'
+"""
+
+
+def write(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def test_builtin_pack_matches_the_old_scoring():
+    result = ScamDetector().analyze("Your account is BLOCKED! Verify immediately at http://x.example")
+    assert result["riskScore"] == 0.85 and result["scamDetected"]
+    assert result["scamReasons"] == [
+        "Multiple scam keywords detected: verify, blocked, account",
+        "Urgency language detected: immediately",
+        "Suspicious URL format detected"
+    ]
+
+
+def test_yaml_pack_replaces_rules_and_extraction():
+    with tempfile.TemporaryDirectory() as directory:
+        rules = compile_rules(load_rule_pack(write(directory, "rules.yaml", YAML_PACK)))
+    detector = ScamDetector(rules=rules)
+    text = "You won the lottery prize! Pay the processing fee to lucky@ybl or boss@axis"
+    analysis = analyze_message(text, detector)
+    assert analysis.assessment["riskScore"] == 0.2 and not analysis.assessment["scamDetected"]
+    assert analysis.assessment["scamReasons"] == ["Lottery bait detected: lottery, prize, processing fee"]
+    assert analysis.assessment["rulesVersion"].startswith("2026-10.1@")
+    assert analysis.intelligence["upiIds"] == ["lucky@ybl"]
+    # Keys the pack leaves out keep their defaults
+    assert rules.keywords("lottery") and rules.matcher.boundary == DEFAULT_RULES["boundary"]
+
+
+def test_reloader_swaps_and_survives_a_broken_pack():
+    with tempfile.TemporaryDirectory() as directory:
+        path = write(directory, "rules.json", json.dumps({"version": "v1", "threshold": 0.2}))
+        detector = ScamDetector()
+        reloader = RulePackReloader(detector, path, check_interval=0.01)
+        asyncio.run(reloader.reload())
+        first = detector.rules_version
+        assert first.startswith("v1@") and detector.analyze("urgent: verify your account")["scamDetected"]
+
+        # Same declared version, different content: still a new rules version
+        write(directory, "rules.json", json.dumps({"version": "v1", "threshold": 0.9}))
+        asyncio.run(reloader.reload())
+        assert detector.rules_version not in (first, "") and detector.rules_version.startswith("v1@")
+
+        write(directory, "rules.json", '{"categories": {"scam": {"keywords": ["x"]}}}')
+        try:
+            reloader.load()
+            assert False, "missing weight should not compile"
+        except RulePackError:
+            pass
+        assert detector.rules.threshold == 0.9 and reloader.stats()["failures"] == 1
+
+        async def watch():
+            task = asyncio.create_task(reloader.run())
+            write(directory, "rules.json", json.dumps({"version": "v2"}))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if detector.rules_version.startswith("v2@"):
+                    break
+            task.cancel()
+        asyncio.run(watch())
+        assert detector.rules_version.startswith("v2@")
+
+
+if __name__ == "__main__":
+    test_builtin_pack_matches_the_old_scoring()
+    test_yaml_pack_replaces_rules_and_extraction()
+    test_reloader_swaps_and_survives_a_broken_pack()
+    print("Rule pack tests passed.")
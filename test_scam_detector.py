@@ -0,0 +1,96 @@
+import random
+import re
+from scam_detector import ScamDetector
+from matcher import KeywordMatcher
+
+SAMPLES = [
+    "Your account is BLOCKED! Verify immediately.",
+    "Share OTP now or face legal action and penalty.",
+    "Send password and cvv, last chance before it will expire.",
+    "Click http://scam-bank.com/verify to avoid suspension",
+    "Hello, how are you?",
+    "Pay via UPI, your account will be suspended",
+]
+
+
+def legacy_analyze(detector, text):
+    """Reference implementation: one substring check per keyword."""
+    text_lower = text.lower()
+    hits = {
+        "scam": [kw for kw in detector.scam_keywords if kw in text_lower],
+        "urgency": [p for p in detector.urgency_patterns if p in text_lower],
+        "threat": [p for p in detector.threat_patterns if p in text_lower],
+        "sensitive": [p for p in detector.sensitive_patterns if p in text_lower],
+    }
+    has_url = re.search(detector.url_pattern, text_lower) is not None
+    return hits, has_url
+
+
+def test_matches_legacy_output_without_boundaries():
+    detector = ScamDetector(boundary="none")
+    for text in SAMPLES:
+        expected_hits, expected_url = legacy_analyze(detector, text)
+        hits = detector.matcher.scan(text.lower())
+        for category, keywords in expected_hits.items():
+            assert hits[category] == keywords, (text, category)
+        assert ("url" in hits) == expected_url
+
+
+def test_analyze_output_shape():
+    result = ScamDetector().analyze(SAMPLES[0])
+    assert set(result) == {"riskScore", "scamDetected", "scamReasons", "suspiciousKeywords", "rulesVersion"}
+    assert result["rulesVersion"].startswith("builtin@")
+    assert result["scamDetected"]
+    assert "Multiple scam keywords detected: verify, blocked, account" in result["scamReasons"]
+
+
+def test_word_boundary_skips_embedded_keywords():
+    detector = ScamDetector()
+    result = detector.analyze("I know the plan")
+    assert "now" not in result["suspiciousKeywords"]
+
+    # "start" still accepts inflected forms, "both" requires whole words
+    assert "expire" in detector.analyze("card expired")["suspiciousKeywords"]
+    strict = ScamDetector(boundary="both")
+    assert "expire" not in strict.analyze("card expired")["suspiciousKeywords"]
+
+
+def test_overlapping_and_shared_keywords():
+    # substring_max=0 forces the trie path, whose overlap recovery is under test
+    for substring_max in (0, 48):
+        matcher = KeywordMatcher(
+            {"a": ["otp", "cvv"], "b": ["share otp", "cvv", "share"]},
+            boundary="both",
+            substring_max=substring_max
+        )
+        hits = matcher.scan("please share otp and cvv")
+        assert hits["a"] == ["otp", "cvv"]
+        assert hits["b"] == ["share otp", "cvv", "share"]
+
+        # "otp now" starts inside the "share otp" match and runs past its end
+        matcher = KeywordMatcher({"a": ["share otp", "otp now", "now"]}, substring_max=substring_max)
+        assert matcher.scan("share otp now")["a"] == ["share otp", "otp now", "now"]
+
+
+def test_substring_and_trie_paths_agree():
+    rng = random.Random(3)
+    pool = ["ab", "abc", "bca", "ca", "a b", "otp", "share otp", "b_c", "नमस्ते", "स्ते", "खाता", "बही"]
+    pieces = ["ab", "c", " ", "otp", "share ", "_", "1", "नम", "स्ते", "बहीखाता", " खाता", "।"]
+    for boundary in ("none", "start", "both"):
+        for _ in range(100):
+            keywords = rng.sample(pool, 7)
+            categories = {"x": keywords[:3], "y": keywords[3:]}
+            substring = KeywordMatcher(categories, boundary=boundary)
+            trie = KeywordMatcher(categories, boundary=boundary, substring_max=0)
+            for _ in range(10):
+                text = "".join(rng.choice(pieces) for _ in range(8))
+                assert substring.scan_keywords(text) == trie.scan_keywords(text), (boundary, keywords, text)
+
+
+if __name__ == "__main__":
+    test_matches_legacy_output_without_boundaries()
+    test_analyze_output_shape()
+    test_word_boundary_skips_embedded_keywords()
+    test_overlapping_and_shared_keywords()
+    test_substring_and_trie_paths_agree()
+    print("Scam detector tests passed.")
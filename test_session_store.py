@@ -0,0 +1,118 @@
+import os
+import tempfile
+from functools import partial
+
+from callback_dispatcher import CallbackDispatcher
+from outbox import CallbackOutbox
+from session_store import SessionStore
+from session_manager import SessionManager, SessionState, flush_evicted_session
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_capacity_eviction():
+    evicted = []
+    store = SessionStore(max_sessions=2, on_evict=lambda s, reason: evicted.append((s, reason)))
+    store.put("a", "A")
+    store.put("b", "B")
+    store.get("a")          # "b" is now least recently used
+    store.put("c", "C")
+
+    assert "b" not in store
+    assert evicted == [("B", "capacity")]
+    assert store.stats()["evictions"]["capacity"] == 1
+
+
+def test_idle_ttl_and_counters():
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=10, clock=clock)
+    store.put("a", "A")
+    assert store.get("a") == "A"
+
+    clock.now = 11
+    assert store.get("a") is None
+
+    stats = store.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["evictions"]["expired"] == 1
+
+
+def test_memory_budget():
+    store = SessionStore(max_bytes=100, sizeof=len)
+    store.put("a", "x" * 60)
+    store.put("b", "y" * 60)
+    assert "a" not in store and "b" in store
+    assert store.stats()["bytes"] == 60
+
+
+def test_manager_flushes_evicted_scam_sessions():
+    # A real sink: the dispatcher's durable outbox (nothing is sent)
+    outbox = CallbackOutbox(os.path.join(tempfile.mkdtemp(), "outbox.db"))
+    dispatcher = CallbackDispatcher(outbox=outbox)
+    manager = SessionManager(store=SessionStore(
+        max_sessions=1,
+        on_evict=partial(flush_evicted_session, send=dispatcher.submit)
+    ))
+    manager.process_message("s1", "Your account is BLOCKED! Verify immediately at a@ybl")
+    evicted = manager.sessions["s1"]
+    manager.process_message("s2", "Hello")
+
+    # Evicted after one turn, well short of the usual 10-turn minimum
+    row = outbox.get("s1")
+    assert row is not None and row["status"] == "pending"
+    assert row["payload"]["totalMessagesExchanged"] == 1
+    assert row["payload"]["extractedIntelligence"]["upiIds"] == ["a@ybl"]
+    assert evicted.callbackSent
+    assert isinstance(manager.sessions["s2"], SessionState)
+    outbox.close()
+
+
+def test_rejected_flush_leaves_session_unsent():
+    session = SessionState(sessionId="lost", scamDetected=True)
+    flush_evicted_session(session, "capacity", send=lambda data, final=False: False)
+    assert not session.callbackSent
+
+
+def test_session_ring_buffer_and_archive():
+    session = SessionState(sessionId="ring")
+    for i in range(20):
+        session.add_message(f"m{i}", max_recent=4, archive=True)
+    session.add_reasons(["a", "b"])
+    session.add_reasons(["a"])
+
+    assert session.messages == ["m16", "m17", "m18", "m19"]
+    assert session.archived_messages() == [f"m{i}" for i in range(16)]
+    assert session.scamReasons == ["a", "b"]
+    assert session.to_model().messages == session.messages
+
+
+def test_intelligence_is_ordered_and_incremental():
+    manager = SessionManager()
+    manager.process_message("intel", "Pay to b@ybl or a@ybl")
+    manager.process_message("intel", "Again a@ybl, or c@ybl")
+
+    session = manager.sessions["intel"]
+    assert session.extractedIntelligence["upiIds"] == ["b@ybl", "a@ybl", "c@ybl"]
+
+    first_seen = session.intelligence_first_seen()["upiIds"]
+    assert first_seen["a@ybl"]["turn"] == 1
+    assert first_seen["c@ybl"]["turn"] == 2
+    assert session.add_intelligence("upiIds", ["a@ybl"], 3, 0) == []
+
+
+if __name__ == "__main__":
+    test_lru_capacity_eviction()
+    test_idle_ttl_and_counters()
+    test_memory_budget()
+    test_manager_flushes_evicted_scam_sessions()
+    test_rejected_flush_leaves_session_unsent()
+    test_session_ring_buffer_and_archive()
+    test_intelligence_is_ordered_and_incremental()
+    print("Session store tests passed.")
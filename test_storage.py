@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from session_manager import SessionManager
+from storage import SQLiteBackend, SessionBackend, WriteBehindSessionStore, MemoryBackend
+
+
+def make_manager(backend, **kwargs):
+    return SessionManager(store=WriteBehindSessionStore(backend, flush_interval=60, **kwargs))
+
+
+def test_sessions_survive_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+
+        manager = make_manager(SQLiteBackend(path))
+        manager.process_message("persist-1", "Your account is BLOCKED! Verify immediately.")
+        manager.process_message("persist-1", "Pay to scam@ybl")
+        # Nothing is written until the flusher runs
+        assert manager.sessions.stats()["dirty"] == 1
+        manager.sessions.stop()
+        manager.sessions.backend.close()
+
+        restarted = make_manager(SQLiteBackend(path))
+        session = restarted.get_session("persist-1")
+        assert session.totalTurns == 2
+        assert session.scamDetected
+        assert session.extractedIntelligence["upiIds"] == ["scam@ybl"]
+        assert restarted.sessions.stats()["loads"] == 1
+        restarted.sessions.backend.close()
+
+
+def test_evicted_dirty_session_is_not_lost():
+    manager = make_manager(MemoryBackend(), max_sessions=1)
+    manager.process_message("a", "Pay to first@ybl")
+    manager.process_message("b", "hello")      # evicts "a" before any flush
+
+    assert "a" not in manager.sessions
+    assert manager.get_session("a").extractedIntelligence["upiIds"] == ["first@ybl"]
+
+
+def test_flush_batches_writes():
+    manager = make_manager(MemoryBackend())
+    for i in range(50):
+        manager.process_message(f"batch-{i}", "hello")
+    assert manager.sessions.flush() == 50
+    assert manager.sessions.flush() == 0
+    assert manager.sessions.stats()["flushes"] == 1
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoDelete(SessionBackend):
+        def load(self, session_id):
+            return None
+
+        def save_many(self, records):
+            pass
+
+    try:
+        NoDelete()
+        assert False, "a backend without delete() should not instantiate"
+    except TypeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_sessions_survive_restart()
+    test_evicted_dirty_session_is_not_lost()
+    test_flush_batches_writes()
+    test_incomplete_backend_fails_at_construction()
+    print("Storage tests passed.")
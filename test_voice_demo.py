@@ -0,0 +1,60 @@
+import os
+import tempfile
+import wave
+
+from voice_demo import HoneypotClient, fixture_capture, offline_recognize, run_pipeline
+
+
+class FakeHTTP:
+    """Stands in for requests.Session: records calls, answers after a delay."""
+    def __init__(self):
+        self.posts = []
+
+    def post(self, url, json, headers):
+        self.posts.append(json["message"]["text"])
+
+        class Response:
+            status_code = 200
+
+            @staticmethod
+            def json():
+                return {"status": "success", "reply": f"reply to {json['message']['text']}"}
+        return Response()
+
+
+def test_replay_pipeline_from_text_and_wav():
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "call.txt")
+        with open(script, "w") as f:
+            f.write("Your account is blocked\n\nShare the OTP now\n")
+        recording = os.path.join(directory, "turn3.wav")
+        with wave.open(recording, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(b"\0\0" * 800)
+        with open(os.path.join(directory, "turn3.txt"), "w") as f:
+            f.write("Pay to fraud@ybl\n")
+        stop_script = os.path.join(directory, "end.txt")
+        with open(stop_script, "w") as f:
+            f.write("ok bye\nnever sent\n")
+
+        http = FakeHTTP()
+        spoken = []
+        turns = run_pipeline(
+            fixture_capture([script, recording, stop_script]),
+            offline_recognize,
+            HoneypotClient("http://test/api/honeypot", "key", "voice-test", http),
+            lambda: spoken.append
+        )
+
+    # One keep-alive client for every turn; the exit word ends the call
+    assert http.posts == ["Your account is blocked", "Share the OTP now", "Pay to fraud@ybl"]
+    assert spoken == [f"reply to {text}" for text in http.posts]
+    assert [t.index for t in turns] == [0, 1, 2]
+    assert all(t.captured <= t.recognized <= t.answered <= t.spoken for t in turns)
+    print("[Test] Voice replay pipeline OK.")
+
+
+if __name__ == "__main__":
+    test_replay_pipeline_from_text_and_wav()
@@ -0,0 +1,146 @@
+"""
+Trains the second-stage classifier (classifier.py) offline, on CPU.
+
+The corpus is JSONL, one labeled message per line:
+
+    {"text": "Your account is blocked, share OTP now", "label": 1}
+    {"text": "Are we still meeting at 5?", "label": 0}
+
+Labels may be 0/1, booleans or "scam"/"ham". A held-out share of the
+corpus is scored after training:
+
+    python train_classifier.py corpus.jsonl scam_classifier.npz --epochs 5
+
+Point the API at the model with SCAM_CLASSIFIER_PATH.
+"""
+import argparse
+import json
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from classifier import CHAR_NGRAMS, DEFAULT_DIMS, LinearClassifier, featurize
+from normalization import fold, normalize_text
+
+_LABELS = {"scam": 1, "spam": 1, "ham": 0, "benign": 0, "legit": 0}
+
+
+def parse_label(value) -> int:
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in _LABELS:
+            return _LABELS[value]
+        return int(value)
+    return int(bool(value))
+
+
+def read_corpus(path: str) -> Tuple[List[str], List[int]]:
+    """Case-folded texts and 0/1 labels of a JSONL corpus."""
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                texts.append(fold(normalize_text(record["text"])))
+                labels.append(parse_label(record["label"]))
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number}: bad record ({e})") from None
+    return texts, labels
+
+
+def train(
+    texts: List[str],
+    labels: List[int],
+    dims: int = DEFAULT_DIMS,
+    epochs: int = 5,
+    learning_rate: float = 2.0,
+    l2: float = 1e-6,
+    batch_size: int = 256,
+    seed: int = 0
+) -> LinearClassifier:
+    """
+    Logistic regression by mini-batch SGD over the sparse hashed features.
+
+    Why featurize once? Hashing the n-grams is the slow (Python) part; the
+    rows are kept as flat arrays with row offsets, so each mini-batch is a
+    few slices and numpy gather/scatter calls.
+    """
+    rows, indices, values = featurize(texts, dims, CHAR_NGRAMS)
+    offsets = np.searchsorted(rows, np.arange(len(texts) + 1))
+    y = np.asarray(labels, dtype=np.float64)
+    model = LinearClassifier(np.zeros(dims, dtype=np.float32), 0.0, CHAR_NGRAMS)
+    weights = model.weights
+    rng = np.random.default_rng(seed)
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(texts))
+        loss = 0.0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            spans = [np.arange(offsets[r], offsets[r + 1]) for r in batch]
+            entries = np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+            local = np.repeat(np.arange(len(batch)), [len(span) for span in spans])
+            logits = model.decision(local, indices[entries], values[entries], len(batch))
+            p = 1.0 / (1.0 + np.exp(-logits))
+            target = y[batch]
+            loss += float(-np.sum(target * np.log(p + 1e-12) + (1 - target) * np.log(1 - p + 1e-12)))
+            error = (p - target) / len(batch)
+            if l2:
+                weights *= np.float32(1 - learning_rate * l2)
+            np.add.at(weights, indices[entries], (-learning_rate * error[local] * values[entries]).astype(np.float32))
+            model.bias -= learning_rate * float(error.sum())
+        print(f"epoch {epoch + 1}: log loss {loss / max(len(texts), 1):.4f}")
+    return model
+
+
+def evaluate(model: LinearClassifier, texts: List[str], labels: List[int], threshold: float = 0.5) -> dict:
+    if not texts:
+        return {}
+    predicted = model.predict(texts) >= threshold
+    actual = np.asarray(labels, dtype=bool)
+    tp = int(np.sum(predicted & actual))
+    fp = int(np.sum(predicted & ~actual))
+    fn = int(np.sum(~predicted & actual))
+    return {
+        "accuracy": round(float(np.mean(predicted == actual)), 4),
+        "precision": round(tp / (tp + fp), 4) if tp + fp else 0.0,
+        "recall": round(tp / (tp + fn), 4) if tp + fn else 0.0
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train the hashed n-gram scam classifier.")
+    parser.add_argument("corpus", help="labeled JSONL corpus")
+    parser.add_argument("output", help="model file to write (.npz)")
+    parser.add_argument("--dims", type=int, default=DEFAULT_DIMS)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--learning-rate", type=float, default=2.0)
+    parser.add_argument("--l2", type=float, default=1e-6)
+    parser.add_argument("--holdout", type=float, default=0.1, help="share of the corpus kept for evaluation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    texts, labels = read_corpus(args.corpus)
+    order = np.random.default_rng(args.seed).permutation(len(texts))
+    held = order[:int(len(texts) * args.holdout)]
+    kept = order[len(held):]
+    started = time.perf_counter()
+    model = train(
+        [texts[i] for i in kept], [labels[i] for i in kept], args.dims,
+        args.epochs, args.learning_rate, args.l2, seed=args.seed
+    )
+    print(f"Trained on {len(kept)} messages in {time.perf_counter() - started:.1f}s")
+    if len(held):
+        print(f"Held out {len(held)}: {evaluate(model, [texts[i] for i in held], [labels[i] for i in held])}")
+    model.save(args.output)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
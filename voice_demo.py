@@ -1,89 +1,335 @@
-import requests
-import speech_recognition as sr
-import pyttsx3
+"""
+Voice scam-call simulation against the honeypot API.
+
+Capture, recognition, the API call and speech run as a pipeline: one
+worker thread per stage, connected by queues. The next utterance is
+captured while the previous one is still being recognized, answered and
+spoken. A scammer then waits for the slowest stage instead of the sum of
+all four. Ambient-noise calibration runs once per call, and the API is
+called through one keep-alive HTTP session.
+
+    python voice_demo.py                       # microphone + speakers
+    python voice_demo.py --replay call1.txt call2.wav
+
+Replay mode needs neither a microphone nor a network. It feeds text
+fixtures (one utterance per line) or WAV recordings (transcribed from a
+sidecar .txt of the same name) through an offline recognizer stand-in.
+It calls the app in-process unless --api-url is given, prints the
+replies instead of speaking them (unless --speak), and reports per-turn
+latency.
+"""
+import argparse
+import os
+import queue
+import statistics
+import sys
+import threading
 import time
-import uuid
+import wave
+from typing import Any, Callable, Iterator, List, Optional
 
 # Configuration
 API_URL = "http://127.0.0.1:8000/api/honeypot"
 API_KEY = "secret-hackathon-key"
 SESSION_ID = f"voice-session-{int(time.time())}"
 
-# Initialize Text-to-Speech Engine
-engine = pyttsx3.init()
-engine.setProperty('rate', 160) # Speed of speech
+# Queued turns between stages; a stage that falls behind blocks the one before it
+STAGE_QUEUE_SIZE = 4
+EXIT_WORDS = ("exit", "bye")
 
-def speak(text):
-    print(f"🤖 Agent: {text}")
-    engine.say(text)
-    engine.runAndWait()
+_STOP = object()
+
+
+class Turn:
+    """One utterance as it moves through the pipeline, with stage timestamps."""
+    __slots__ = ("index", "audio", "text", "reply", "captured", "recognized", "answered", "spoken")
+
+    def __init__(self, index: int, audio: Any):
+        self.index = index
+        self.audio = audio
+        self.text: Optional[str] = None
+        self.reply: Optional[str] = None
+        self.captured = time.perf_counter()
+        self.recognized = self.answered = self.spoken = 0.0
+
+    @property
+    def latency(self) -> float:
+        """End of the utterance to the end of the reply."""
+        return self.spoken - self.captured
+
+
+# --- Capture -------------------------------------------------------------
+
+def microphone_capture(stop: threading.Event) -> Iterator[Any]:
+    """Utterances from the default microphone, calibrated once."""
+    import speech_recognition as sr
 
-def listen():
     recognizer = sr.Recognizer()
     with sr.Microphone() as source:
-        print("\n🎤 Listening... (Speak now)")
+        print("Calibrating for ambient noise (once)...")
+        recognizer.adjust_for_ambient_noise(source, duration=1)
+        while not stop.is_set():
+            print("\n🎤 Listening... (Speak now)")
+            try:
+                yield recognizer.listen(source, timeout=5)
+            except sr.WaitTimeoutError:
+                continue
+
+
+def fixture_capture(paths: List[str], pace: float = 0.0) -> Callable[[threading.Event], Iterator[Any]]:
+    """
+    Replay "capture": each line of a .txt fixture, or each .wav recording,
+    `pace` seconds apart (as if spoken).
+    """
+    def capture(stop: threading.Event) -> Iterator[Any]:
+        for path in paths:
+            if path.endswith(".wav"):
+                items = [path]
+            else:
+                with open(path, encoding="utf-8") as f:
+                    items = [line.strip() for line in f if line.strip()]
+            for item in items:
+                if stop.is_set():
+                    return
+                if pace:
+                    time.sleep(pace)
+                yield item
+    return capture
+
+
+# --- Recognition ---------------------------------------------------------
+
+def google_recognizer() -> Callable[[Any], Optional[str]]:
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+
+    def recognize(audio: Any) -> Optional[str]:
         try:
-            # Adjust for ambient noise
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = recognizer.listen(source, timeout=5)
-            print("Processing audio...")
-            text = recognizer.recognize_google(audio)
-            print(f"👤 You said: {text}")
-            return text
+            return recognizer.recognize_google(audio)
         except sr.UnknownValueError:
             print("Could not understand audio.")
-            return None
         except sr.RequestError:
             print("Could not request results (Offline?)")
-            return None
-        except Exception as e:
-            print(f"Error: {e}")
-            return None
-
-def send_to_api(text):
-    payload = {
-        "sessionId": SESSION_ID,
-        "message": {
-            "sender": "scammer",
-            "text": text,
-            "timestamp": int(time.time() * 1000)
-        },
-        "conversationHistory": [],
-        "metadata": {"channel": "voice", "language": "en", "locale": "US"}
-    }
-    headers = {"x-api-key": API_KEY}
-    
-    try:
-        response = requests.post(API_URL, json=payload, headers=headers)
-        if response.status_code == 200:
-            return response.json().get("reply")
-        else:
+        return None
+    return recognize
+
+
+def offline_recognize(item: str) -> Optional[str]:
+    """
+    Recognizer stand-in for replay: text fixtures pass through; a WAV file
+    is read (so its I/O is in the timing) and its sidecar transcript used.
+    """
+    if not item.endswith(".wav"):
+        return item
+    with wave.open(item, "rb") as recording:
+        recording.readframes(recording.getnframes())
+    transcript = os.path.splitext(item)[0] + ".txt"
+    if not os.path.exists(transcript):
+        print(f"No transcript for {item}")
+        return None
+    with open(transcript, encoding="utf-8") as f:
+        return f.read().strip() or None
+
+
+# --- API -----------------------------------------------------------------
+
+class HoneypotClient:
+    """
+    Posts utterances to the API over one keep-alive session (requests.Session,
+    or any client with the same post(); replay passes an in-process one).
+    """
+    def __init__(self, url: str = API_URL, api_key: str = API_KEY, session_id: str = SESSION_ID, http=None):
+        if http is None:
+            import requests
+            http = requests.Session()
+        self.http = http
+        self.url = url
+        self.session_id = session_id
+        self.headers = {"x-api-key": api_key}
+
+    def send(self, text: str) -> Optional[str]:
+        payload = {
+            "sessionId": self.session_id,
+            "message": {
+                "sender": "scammer",
+                "text": text,
+                "timestamp": int(time.time() * 1000)
+            },
+            "conversationHistory": [],
+            "metadata": {"channel": "voice", "language": "en", "locale": "US"}
+        }
+        try:
+            response = self.http.post(self.url, json=payload, headers=self.headers)
+            if response.status_code == 200:
+                return response.json().get("reply")
             print(f"API Error: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        print(f"Connection Error: {e}")
+        except Exception as e:
+            print(f"Connection Error: {e}")
         return None
 
-def main():
-    print(f"--- 📞 Starting Voice Scam Call Simulation ---\nSession ID: {SESSION_ID}")
-    print("Ensure the API server is running in another terminal!")
-    
-    while True:
-        # 1. Listen to Mic
-        user_text = listen()
-        if not user_text:
-            continue
-            
-        if "exit" in user_text.lower() or "bye" in user_text.lower():
+
+def in_process_client(session_id: str = SESSION_ID) -> HoneypotClient:
+    """A client calling the app in this process (no server, no network)."""
+    from fastapi.testclient import TestClient
+    import main as app_module
+
+    # Keep replayed sessions' callbacks out of the real outbox
+    app_module.use_callback_outbox()
+    return HoneypotClient("/api/honeypot", app_module.EXPECTED_API_KEY, session_id, TestClient(app_module.app))
+
+
+# --- Speech --------------------------------------------------------------
+
+def tts_speaker() -> Callable[[str], None]:
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    engine.setProperty('rate', 160)  # Speed of speech
+
+    def speak(text: str) -> None:
+        print(f"🤖 Agent: {text}")
+        engine.say(text)
+        engine.runAndWait()
+    return speak
+
+
+def print_speaker(text: str) -> None:
+    print(f"🤖 Agent: {text}")
+
+
+# --- Pipeline ------------------------------------------------------------
+
+def _stage(name: str, inbox: queue.Queue, outbox: Optional[queue.Queue], work: Callable[[Turn], bool]) -> threading.Thread:
+    # One worker: takes turns from inbox, runs work(turn) and forwards the
+    # turn if work returned True; _STOP passes through and ends the worker.
+    def run() -> None:
+        while True:
+            turn = inbox.get()
+            if turn is _STOP:
+                break
+            try:
+                forward = work(turn)
+            except Exception as e:
+                print(f"{name} failed: {e}")
+                forward = False
+            if forward and outbox is not None:
+                outbox.put(turn)
+        if outbox is not None:
+            outbox.put(_STOP)
+    return threading.Thread(target=run, name=f"voice-{name}", daemon=True)
+
+
+def run_pipeline(
+    capture: Callable[[threading.Event], Iterator[Any]],
+    recognize: Callable[[Any], Optional[str]],
+    client: HoneypotClient,
+    make_speaker: Callable[[], Callable[[str], None]]
+) -> List[Turn]:
+    """
+    Runs capture -> recognize -> API -> speak until the capture ends or an
+    exit word is heard. Returns the completed turns.
+    """
+    stop = threading.Event()
+    audio_q: queue.Queue = queue.Queue(STAGE_QUEUE_SIZE)
+    text_q: queue.Queue = queue.Queue(STAGE_QUEUE_SIZE)
+    reply_q: queue.Queue = queue.Queue(STAGE_QUEUE_SIZE)
+    done: List[Turn] = []
+
+    def recognize_turn(turn: Turn) -> bool:
+        if stop.is_set():
+            # Captured after the exit word, before capture noticed
+            return False
+        turn.text = recognize(turn.audio)
+        turn.recognized = time.perf_counter()
+        if not turn.text:
+            return False
+        print(f"👤 Scammer: {turn.text}")
+        if any(word in turn.text.lower() for word in EXIT_WORDS):
             print("Exiting...")
-            break
+            stop.set()
+            return False
+        return True
+
+    def answer_turn(turn: Turn) -> bool:
+        turn.reply = client.send(turn.text)
+        turn.answered = time.perf_counter()
+        return True
+
+    speaker: List[Callable[[str], None]] = []
+
+    def speak_turn(turn: Turn) -> bool:
+        # The TTS engine is created on, and only used from, this thread
+        if not speaker:
+            speaker.append(make_speaker())
+        if turn.reply:
+            speaker[0](turn.reply)
+        turn.spoken = time.perf_counter()
+        done.append(turn)
+        return False
+
+    workers = [
+        _stage("recognize", audio_q, text_q, recognize_turn),
+        _stage("api", text_q, reply_q, answer_turn),
+        _stage("speak", reply_q, None, speak_turn)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for index, audio in enumerate(capture(stop)):
+            if stop.is_set():
+                break
+            audio_q.put(Turn(index, audio))
+    except KeyboardInterrupt:
+        print("Interrupted.")
+    finally:
+        audio_q.put(_STOP)
+        for worker in workers:
+            worker.join()
+    return done
 
-        # 2. Send to Honeypot API
-        agent_reply = send_to_api(user_text)
 
-        # 3. Speak the Reply
-        if agent_reply:
-            speak(agent_reply)
+def report(turns: List[Turn]) -> None:
+    if not turns:
+        print("No completed turns.")
+        return
+    print(f"\n--- {len(turns)} turns ---")
+    for name, values in (
+        ("recognize", [t.recognized - t.captured for t in turns]),
+        ("api", [t.answered - t.recognized for t in turns]),
+        ("speak", [t.spoken - t.answered for t in turns]),
+        ("turn latency", [t.latency for t in turns])
+    ):
+        values.sort()
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        print(f"{name:<13} p50 {statistics.median(values) * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Voice scam-call simulation against the honeypot API.")
+    parser.add_argument("--replay", nargs="+", metavar="FIXTURE", help="replay .txt/.wav fixtures instead of the microphone")
+    parser.add_argument("--api-url", help=f"API endpoint (default: {API_URL}; in-process when replaying)")
+    parser.add_argument("--speak", action="store_true", help="speak replies when replaying")
+    parser.add_argument("--pace", type=float, default=0.0, help="seconds between replayed utterances")
+    args = parser.parse_args(argv)
+
+    print(f"--- 📞 Starting Voice Scam Call Simulation ---\nSession ID: {SESSION_ID}")
+    if args.replay:
+        client = HoneypotClient(args.api_url) if args.api_url else in_process_client()
+        turns = run_pipeline(
+            fixture_capture(args.replay, args.pace),
+            offline_recognize,
+            client,
+            tts_speaker if args.speak else (lambda: print_speaker)
+        )
+        report(turns)
+        return 0
+
+    print("Ensure the API server is running in another terminal!")
+    turns = run_pipeline(microphone_capture, google_recognizer(), HoneypotClient(args.api_url or API_URL), tts_speaker)
+    report(turns)
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())